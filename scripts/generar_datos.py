@@ -0,0 +1,366 @@
+"""
+Generador determinístico de datos sintéticos a gran escala para el sistema de recomendación
+
+Produce N estudiantes, M profesores y C cursos con las distribuciones de init_db.
+Los estudiantes y sus aprobaciones se generan por shards en varios procesos; cada
+shard tiene su propia semilla derivada de la semilla base, así que el resultado es
+el mismo sin importar el número de procesos.
+
+Uso:
+    python -m scripts.generar_datos --estudiantes 100000 --profesores 2000 --cursos 1000 --salida neo4j
+    python -m scripts.generar_datos --estudiantes 100000 --salida csv --directorio datos_csv
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from faker import Faker
+
+from src.models.estudiante import Estudiante
+from src.models.profesor import Profesor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.join(RAIZ, "src") not in sys.path:
+    sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+# Mismo PBKDF2 que la API; los módulos de src/utils importan sin el prefijo src
+from utils.seguridad import hashear_password
+
+SEMILLA = 2025
+TAMANO_SHARD = 10000
+
+# Contraseña de todos los estudiantes generados (se guarda solo su hash)
+PASSWORD_ESTUDIANTES = "password123"
+
+ESTILOS_APRENDIZAJE = ["mixto", "practico", "teorico"]
+ESTILOS_CLASE = ["con_tecnologia", "sin_tecnologia", "mixto"]
+GRADOS = ["Primer año", "Segundo año", "Tercer año", "Cuarto año", "Quinto año", "Sexto año"]
+CARRERAS = ["Ingeniería en Ciencias de la Computación", "Matemática Aplicada", "Física", "Ingeniería Mecánica",
+            "Ingeniería Industrial", "Ingeniería civil arquitectónica", "Ingeniería química", "Ingeniería biomédica",
+            "Bioquímica y microbiología", "Química", "Química Farmacéutica", "Arquitectura", "Ingeniería electrónica"]
+DEPARTAMENTOS = {"MAT": "Matemáticas", "FIS": "Física", "QUI": "Química", "CC": "Ciencias de la Computación"}
+
+# Encabezados en el formato de neo4j-admin database import
+ENCABEZADOS_CSV = {
+    "cursos": ["codigo:ID(Curso)", "nombre", "departamento", "creditos:int", ":LABEL"],
+    "profesores": ["nombre:ID(Profesor)", "estilo_enseñanza", "estilo_clase", "años_experiencia:int",
+                   "evaluacion_docente:float", "porcentaje_aprobados:float", "disponibilidad:int",
+                   "puntuacion_total:int", ":LABEL"],
+    "estudiantes": ["carnet:ID(Estudiante)", "nombre", "carrera", "pensum:int", "email", "password",
+                    "estilo_aprendizaje", "estilo_clase", "promedio:float", "grado", "carga_maxima:int",
+                    "cursos_zona_minima:int", "asistencias:int", "veces_curso:int", "puntuacion_total:int",
+                    "role", ":LABEL"],
+    "imparte": [":START_ID(Profesor)", ":END_ID(Curso)", ":TYPE"],
+    "aprobo_con": [":START_ID(Estudiante)", ":END_ID(Curso)", "nota:int", ":TYPE"]
+}
+
+@lru_cache(maxsize=None)
+def hash_password_estudiantes():
+    """Hash de PASSWORD_ESTUDIANTES, derivado una vez por proceso y compartido por todos los estudiantes"""
+    return hashear_password(PASSWORD_ESTUDIANTES)
+
+def semilla_shard(semilla, shard):
+    """Semilla independiente y reproducible para cada shard"""
+    return semilla * 1_000_003 + shard
+
+def generar_catalogo(num_profesores, num_cursos, semilla=SEMILLA):
+    """
+    Genera cursos, profesores y las relaciones IMPARTE
+
+    Args:
+        num_profesores: Número de profesores
+        num_cursos: Número de cursos
+        semilla: Semilla base
+
+    Returns:
+        dict: cursos, profesores e imparte (profesor_nombre, curso_codigo)
+    """
+    rng = random.Random(semilla)
+    fake = Faker("es_ES")
+    fake.seed_instance(semilla)
+
+    prefijos = list(DEPARTAMENTOS)
+    cursos = []
+    for i in range(num_cursos):
+        prefijo = prefijos[i % len(prefijos)]
+        cursos.append({
+            "nombre": f"{DEPARTAMENTOS[prefijo]} {i // len(prefijos) + 1}",
+            "codigo": f"{prefijo}{i:05d}",
+            "departamento": DEPARTAMENTOS[prefijo],
+            "creditos": rng.randint(3, 5)
+        })
+
+    profesores = []
+    for i in range(num_profesores):
+        profesor = Profesor(
+            nombre=f"{fake.name()} P{i:05d}",
+            estilo_enseñanza=rng.choice(ESTILOS_APRENDIZAJE),
+            estilo_clase=rng.choice(ESTILOS_CLASE),
+            años_experiencia=rng.randint(2, 20),
+            evaluacion_docente=round(rng.uniform(3.6, 4.9), 1),
+            porcentaje_aprobados=rng.randint(65, 92),
+            disponibilidad=rng.randint(2, 5)
+        )
+        profesor.calcular_puntuacion()
+        profesores.append(profesor.dict())
+
+    # Cada curso lo imparten entre 1 y 3 profesores
+    imparte = []
+    for curso in cursos:
+        for profesor in rng.sample(profesores, min(len(profesores), rng.randint(1, 3))):
+            imparte.append({"profesor_nombre": profesor["nombre"], "curso_codigo": curso["codigo"]})
+
+    return {"cursos": cursos, "profesores": profesores, "imparte": imparte}
+
+def generar_shard(shard, inicio, fin, catalogo, semilla=SEMILLA):
+    """
+    Genera los estudiantes [inicio, fin) con sus aprobaciones
+
+    Returns:
+        dict: estudiantes, aprobaciones (carnet, codigo_curso, profesor_nombre, nota)
+    """
+    rng = random.Random(semilla_shard(semilla, shard))
+    fake = Faker("es_ES")
+    fake.seed_instance(semilla_shard(semilla, shard))
+
+    profesores_por_curso = {}
+    for fila in catalogo["imparte"]:
+        profesores_por_curso.setdefault(fila["curso_codigo"], []).append(fila["profesor_nombre"])
+    cursos = [curso["codigo"] for curso in catalogo["cursos"] if curso["codigo"] in profesores_por_curso]
+
+    estudiantes = []
+    aprobaciones = []
+    for i in range(inicio, fin):
+        carnet = f"{i:07d}"
+        estudiante = Estudiante(
+            nombre=f"{fake.name()} {carnet}",
+            carnet=carnet,
+            carrera=rng.choice(CARRERAS),
+            pensum=rng.choice([2020, 2022, 2024, 2025]),
+            email=f"estudiante{carnet}@uvg.edu.gt",
+            password=hash_password_estudiantes(),
+            estilo_aprendizaje=rng.choice(ESTILOS_APRENDIZAJE),
+            estilo_clase=rng.choice(ESTILOS_CLASE),
+            promedio=rng.randint(45, 95),
+            grado=rng.choice(GRADOS),
+            carga_maxima=rng.randint(4, 6),
+            cursos_zona_minima=rng.randint(0, 3),
+            asistencias=rng.randint(0, 5),
+            veces_curso=rng.randint(0, 5)
+        )
+        estudiante.calcular_puntuacion()
+        estudiantes.append(estudiante.dict())
+
+        for codigo in rng.sample(cursos, min(len(cursos), rng.randint(3, 5))):
+            nota = rng.randint(70, 95) if rng.random() < 0.8 else rng.randint(60, 69)
+            aprobaciones.append({
+                "carnet": carnet,
+                "codigo_curso": codigo,
+                "profesor_nombre": rng.choice(profesores_por_curso[codigo]),
+                "nota": nota
+            })
+
+    return {"estudiantes": estudiantes, "aprobaciones": aprobaciones}
+
+def rangos_shards(num_estudiantes, tamano_shard=TAMANO_SHARD):
+    """Divide los estudiantes en shards de tamaño fijo: [(shard, inicio, fin), ...]"""
+    return [
+        (shard, inicio, min(inicio + tamano_shard, num_estudiantes))
+        for shard, inicio in enumerate(range(0, num_estudiantes, tamano_shard))
+    ]
+
+def generar_dataset(num_estudiantes, num_profesores, num_cursos, semilla=SEMILLA,
+                    procesos=1, tamano_shard=TAMANO_SHARD):
+    """
+    Genera el conjunto de datos completo en memoria
+
+    Returns:
+        dict: cursos, profesores, imparte, estudiantes y aprobaciones
+    """
+    catalogo = generar_catalogo(num_profesores, num_cursos, semilla)
+    datos = dict(catalogo, estudiantes=[], aprobaciones=[])
+    for shard in _ejecutar_shards(generar_shard, num_estudiantes, catalogo, semilla, procesos, tamano_shard):
+        datos["estudiantes"].extend(shard["estudiantes"])
+        datos["aprobaciones"].extend(shard["aprobaciones"])
+    return datos
+
+def _ejecutar_shards(funcion, num_estudiantes, catalogo, semilla, procesos, tamano_shard, *args):
+    rangos = rangos_shards(num_estudiantes, tamano_shard)
+    if procesos <= 1:
+        for shard, inicio, fin in rangos:
+            yield funcion(shard, inicio, fin, catalogo, semilla, *args)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        futuros = [executor.submit(funcion, shard, inicio, fin, catalogo, semilla, *args) for shard, inicio, fin in rangos]
+        for futuro in futuros:
+            yield futuro.result()
+
+def limpiar_en_lotes(driver, tamano_lote=10000):
+    """Elimina todos los nodos en transacciones acotadas"""
+    while driver.execute_write(
+        "MATCH (n) WITH n LIMIT $limite DETACH DELETE n RETURN count(*) AS borrados", limite=tamano_lote
+    )[0]["borrados"]:
+        pass
+
+def preparar_esquema(driver):
+    """Aplica las migraciones del esquema para que los MERGE de la carga usen índices"""
+    from src.database.migraciones import aplicar_migraciones
+
+    aplicar_migraciones(driver)
+    driver.execute_write("CALL db.awaitIndexes()")
+
+def cargar_catalogo(driver, catalogo, tamano_lote):
+    """Escribe cursos, profesores e IMPARTE en lotes"""
+    from scripts.init_db import escribir_en_lotes
+
+    escribir_en_lotes(driver, """
+        UNWIND $filas AS f
+        MERGE (c:Curso {codigo: f.codigo})
+        SET c += f
+        RETURN count(*) AS total
+    """, catalogo["cursos"], tamano_lote)
+    escribir_en_lotes(driver, """
+        UNWIND $filas AS f
+        MERGE (p:Profesor {nombre: f.nombre})
+        SET p += f
+        RETURN count(*) AS total
+    """, catalogo["profesores"], tamano_lote)
+    escribir_en_lotes(driver, """
+        UNWIND $filas AS f
+        MATCH (p:Profesor {nombre: f.profesor_nombre})
+        MATCH (c:Curso {codigo: f.curso_codigo})
+        MERGE (p)-[:IMPARTE]->(c)
+        RETURN count(*) AS total
+    """, catalogo["imparte"], tamano_lote)
+
+def cargar_shard(driver, shard, tamano_lote):
+    """Escribe estudiantes y APROBÓ_CON de un shard en lotes"""
+    from scripts.init_db import escribir_en_lotes
+
+    escribir_en_lotes(driver, """
+        UNWIND $filas AS f
+        MERGE (e:Estudiante {carnet: f.carnet})
+        SET e += f
+        RETURN count(*) AS total
+    """, shard["estudiantes"], tamano_lote)
+    escribir_en_lotes(driver, """
+        UNWIND $filas AS f
+        MATCH (e:Estudiante {carnet: f.carnet})
+        MATCH (c:Curso {codigo: f.codigo_curso})
+        MERGE (e)-[:APROBÓ_CON {nota: f.nota}]->(c)
+        RETURN count(*) AS total
+    """, shard["aprobaciones"], tamano_lote)
+
+def _escribir_csv(ruta, filas, columnas):
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        for fila in filas:
+            escritor.writerow(columnas(fila))
+
+def escribir_encabezados_csv(directorio):
+    """Escribe un archivo *_header.csv por tipo para neo4j-admin"""
+    os.makedirs(directorio, exist_ok=True)
+    for nombre, encabezado in ENCABEZADOS_CSV.items():
+        with open(os.path.join(directorio, f"{nombre}_header.csv"), "w", newline="", encoding="utf-8") as archivo:
+            csv.writer(archivo).writerow(encabezado)
+
+def escribir_catalogo_csv(directorio, catalogo):
+    _escribir_csv(os.path.join(directorio, "cursos.csv"), catalogo["cursos"], lambda c: [
+        c["codigo"], c["nombre"], c["departamento"], c["creditos"], "Curso"
+    ])
+    _escribir_csv(os.path.join(directorio, "profesores.csv"), catalogo["profesores"], lambda p: [
+        p["nombre"], p["estilo_enseñanza"], p["estilo_clase"], p["años_experiencia"], p["evaluacion_docente"],
+        p["porcentaje_aprobados"], p["disponibilidad"], p["puntuacion_total"], "Profesor"
+    ])
+    _escribir_csv(os.path.join(directorio, "imparte.csv"), catalogo["imparte"], lambda r: [
+        r["profesor_nombre"], r["curso_codigo"], "IMPARTE"
+    ])
+
+def generar_shard_csv(shard, inicio, fin, catalogo, semilla, directorio):
+    """Genera un shard y lo escribe directamente a CSV desde el proceso trabajador"""
+    datos = generar_shard(shard, inicio, fin, catalogo, semilla)
+    sufijo = f"{shard:05d}"
+    _escribir_csv(os.path.join(directorio, f"estudiantes_{sufijo}.csv"), datos["estudiantes"], lambda e: [
+        e["carnet"], e["nombre"], e["carrera"], e["pensum"], e["email"], e["password"], e["estilo_aprendizaje"],
+        e["estilo_clase"], e["promedio"], e["grado"], e["carga_maxima"], e["cursos_zona_minima"],
+        e["asistencias"], e["veces_curso"], e["puntuacion_total"], "Estudiante"
+    ])
+    _escribir_csv(os.path.join(directorio, f"aprobo_con_{sufijo}.csv"), datos["aprobaciones"], lambda a: [
+        a["carnet"], a["codigo_curso"], a["nota"], "APROBÓ_CON"
+    ])
+    return {"estudiantes": len(datos["estudiantes"]), "aprobaciones": len(datos["aprobaciones"])}
+
+def comando_importacion(directorio, num_shards):
+    """Devuelve el comando de neo4j-admin para importar los CSV generados"""
+    def partes(nombre):
+        archivos = [f"{nombre}_header.csv"] + [f"{nombre}_{shard:05d}.csv" for shard in range(num_shards)]
+        return ",".join(os.path.join(directorio, archivo) for archivo in archivos)
+
+    return (
+        "neo4j-admin database import full neo4j"
+        f" --nodes={os.path.join(directorio, 'cursos_header.csv')},{os.path.join(directorio, 'cursos.csv')}"
+        f" --nodes={os.path.join(directorio, 'profesores_header.csv')},{os.path.join(directorio, 'profesores.csv')}"
+        f" --nodes={partes('estudiantes')}"
+        f" --relationships={os.path.join(directorio, 'imparte_header.csv')},{os.path.join(directorio, 'imparte.csv')}"
+        f" --relationships={partes('aprobo_con')}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos reproducibles")
+    parser.add_argument("--estudiantes", type=int, default=1000, help="Número de estudiantes")
+    parser.add_argument("--profesores", type=int, default=20, help="Número de profesores")
+    parser.add_argument("--cursos", type=int, default=12, help="Número de cursos")
+    parser.add_argument("--semilla", type=int, default=SEMILLA, help="Semilla base")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="Procesos para generar los shards")
+    parser.add_argument("--tamano-shard", type=int, default=TAMANO_SHARD, help="Estudiantes por shard")
+    parser.add_argument("--salida", choices=["neo4j", "csv"], default="neo4j", help="Destino de los datos")
+    parser.add_argument("--directorio", default="datos_generados", help="Directorio de salida para CSV")
+    parser.add_argument("--lote", type=int, default=5000, help="Filas por transacción al escribir en Neo4j")
+    parser.add_argument("--limpiar", action="store_true", help="Elimina todos los nodos antes de cargar en Neo4j")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    catalogo = generar_catalogo(args.profesores, args.cursos, args.semilla)
+    num_shards = len(rangos_shards(args.estudiantes, args.tamano_shard))
+    print(f"📚 Catálogo: {len(catalogo['cursos'])} cursos, {len(catalogo['profesores'])} profesores, "
+          f"{len(catalogo['imparte'])} relaciones IMPARTE")
+
+    if args.salida == "csv":
+        escribir_encabezados_csv(args.directorio)
+        escribir_catalogo_csv(args.directorio, catalogo)
+        totales = {"estudiantes": 0, "aprobaciones": 0}
+        for resultado in _ejecutar_shards(generar_shard_csv, args.estudiantes, catalogo, args.semilla,
+                                          args.procesos, args.tamano_shard, args.directorio):
+            totales["estudiantes"] += resultado["estudiantes"]
+            totales["aprobaciones"] += resultado["aprobaciones"]
+        print(f"✅ {totales['estudiantes']} estudiantes y {totales['aprobaciones']} aprobaciones en {num_shards} shards "
+              f"({time.perf_counter() - inicio:.1f} s)")
+        print(f"Para importar:\n{comando_importacion(args.directorio, num_shards)}")
+        return
+
+    from src.database.neo4jdriver import Neo4jDriver
+
+    driver = Neo4jDriver()
+    try:
+        if args.limpiar:
+            limpiar_en_lotes(driver)
+        preparar_esquema(driver)
+        cargar_catalogo(driver, catalogo, args.lote)
+        totales = {"estudiantes": 0, "aprobaciones": 0}
+        for shard in _ejecutar_shards(generar_shard, args.estudiantes, catalogo, args.semilla,
+                                      args.procesos, args.tamano_shard):
+            cargar_shard(driver, shard, args.lote)
+            totales["estudiantes"] += len(shard["estudiantes"])
+            totales["aprobaciones"] += len(shard["aprobaciones"])
+            print(f"   {totales['estudiantes']}/{args.estudiantes} estudiantes cargados")
+        print(f"✅ Carga completa en {time.perf_counter() - inicio:.1f} s")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
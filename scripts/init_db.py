@@ -4,18 +4,50 @@ para el sistema de recomendación de profesores
 """
 import random
 from faker import Faker
-from datetime import datetime
 import sys
+import argparse
 from typing import List
 
 from src.database.neo4jdriver import Neo4jDriver
+from src.database.migraciones import aplicar_migraciones
 from src.models.estudiante import Estudiante
 from src.models.profesor import Profesor
 from src.models.curso import Curso
 import os
 
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.join(RAIZ, "src") not in sys.path:
+    sys.path.insert(0, os.path.join(RAIZ, "src"))
+
+# Mismo PBKDF2 que la API; los módulos de src/utils importan sin el prefijo src
+from utils.seguridad import hashear_password
+
+# Semilla fija para que cada ejecución produzca los mismos datos
+SEMILLA = int(os.getenv("SEED", "2025"))
 fake = Faker("es_ES")
-random.seed(datetime.now().timestamp())
+
+# Filas por transacción en las escrituras con UNWIND
+TAMANO_LOTE = int(os.getenv("SEED_BATCH_SIZE", "1000"))
+
+# Contraseña de los estudiantes generados (y del usuario de prueba)
+PASSWORD_ESTUDIANTES = "password123"
+
+def escribir_en_lotes(driver: Neo4jDriver, query: str, filas: list, tamano_lote: int = TAMANO_LOTE) -> int:
+    """Ejecuta una consulta UNWIND $filas en lotes, reutilizando una sola sesión.
+    La consulta debe terminar con RETURN count(*) AS total"""
+    total = 0
+    session = driver.get_session()
+    try:
+        for inicio in range(0, len(filas), tamano_lote):
+            lote = filas[inicio:inicio + tamano_lote]
+            try:
+                result = session.run(query, filas=lote)
+                total += result.single()["total"]
+            except Exception as e:
+                print(f"🔥 Error en lote {inicio // tamano_lote + 1} ({len(lote)} filas): {str(e)}")
+    finally:
+        session.close()
+    return total
 
 def limpiar_base_datos(driver: Neo4jDriver):
     """Elimina todos los nodos y relaciones de la base de datos"""
@@ -23,22 +55,12 @@ def limpiar_base_datos(driver: Neo4jDriver):
     print("Base de datos limpiada correctamente")
 
 def crear_restricciones(driver: Neo4jDriver):
-    """Crea las restricciones de unicidad en la base de datos"""
-    constraints = driver.execute_read("SHOW CONSTRAINTS")
-    
-    if not any("estudiante_nombre" in str(c).lower() for c in constraints):
-        driver.execute_write("CREATE CONSTRAINT estudiante_nombre IF NOT EXISTS FOR (e:Estudiante) REQUIRE e.nombre IS UNIQUE")
-    
-    if not any("profesor_nombre" in str(c).lower() for c in constraints):
-        driver.execute_write("CREATE CONSTRAINT profesor_nombre IF NOT EXISTS FOR (p:Profesor) REQUIRE p.nombre IS UNIQUE")
-    
-    if not any("curso_codigo" in str(c).lower() for c in constraints):
-        driver.execute_write("CREATE CONSTRAINT curso_codigo IF NOT EXISTS FOR (c:Curso) REQUIRE c.codigo IS UNIQUE")
-    
-    print("Restricciones creadas correctamente")
+    """Crea las restricciones e índices del esquema con las migraciones versionadas"""
+    version = aplicar_migraciones(driver)
+    print(f"Restricciones creadas correctamente (esquema v{version})")
 
 """Se crean los cursos a utilizarse en el sistema de recomendación según los datos recopilados"""
-def crear_cursos(driver: Neo4jDriver) -> list:
+def crear_cursos(driver: Neo4jDriver, tamano_lote: int = TAMANO_LOTE) -> list:
     cursos_data=[
         Curso(
             nombre="Cálculo 1",
@@ -113,35 +135,22 @@ def crear_cursos(driver: Neo4jDriver) -> list:
             creditos=3
         )
     ]
-    cursos_creados = []
-    
-    for curso in cursos_data:
-        try:
-            result = driver.execute_write(
-                """
-                CREATE (c:Curso {
-                    nombre: $nombre,
-                    codigo: $codigo,
-                    departamento: $departamento,
-                    creditos: $creditos
-                })
-                RETURN c.nombre AS nombre, c.codigo AS codigo
-                """,
-                nombre=curso.nombre,
-                codigo=curso.codigo,
-                departamento=curso.departamento,
-                creditos=curso.creditos
-            )
-            
-            if result:
-                cursos_creados.append(curso)
-                print(f"✅ Curso creado: {curso.codigo}")
-            else:
-                print(f"❌ Falló al crear curso: {curso.codigo}")
-        except Exception as e:
-            print(f"🔥 Error crítico al crear curso {curso.codigo}: {str(e)}")
+    total = escribir_en_lotes(
+        driver,
+        """
+        UNWIND $filas AS f
+        MERGE (c:Curso {codigo: f.codigo})
+        SET c.nombre = f.nombre,
+            c.departamento = f.departamento,
+            c.creditos = f.creditos
+        RETURN count(*) AS total
+        """,
+        [curso.dict() for curso in cursos_data],
+        tamano_lote
+    )
+    print(f"✅ Cursos creados: {total}/{len(cursos_data)}")
     
-    return cursos_creados
+    return cursos_data
 
 """Genera los profesores a utilizarse en el sistema de recomendación según los datos recopilados
 Estos profesores se crean manualmente ya que se utilizan datos reales obtenidos
@@ -149,7 +158,7 @@ por parte de consultas a distintos estudiantes del departamento de matemáticas
 Todos los nombres de los catedráticos a quienes se realizaron las consultas fueron reemplazados por nombres ficticios
 para proteger la privacidad de los mismos"""
 
-def crear_profesores(driver: Neo4jDriver) -> list:
+def crear_profesores(driver: Neo4jDriver, tamano_lote: int = TAMANO_LOTE) -> list:
     profesores_data = [
         {
             "nombre": "Carlos Martínez",
@@ -333,40 +342,34 @@ def crear_profesores(driver: Neo4jDriver) -> list:
         }
     ]
     profesores_creados = []
+    filas = []
     for profesor_data in profesores_data:
         try:
             profesor = Profesor(**profesor_data)
-            puntuacion = profesor.calcular_puntuacion()
-            result = driver.execute_write(
-                """
-                CREATE (p:Profesor {
-                    nombre: $nombre,
-                    estilo_enseñanza: $estilo_enseñanza,
-                    estilo_clase: $estilo_clase,
-                    años_experiencia: $años_experiencia,
-                    evaluacion_docente: $evaluacion_docente,
-                    porcentaje_aprobados: $porcentaje_aprobados,
-                    disponibilidad: $disponibilidad,
-                    puntuacion_total: $puntuacion_total
-                })
-                RETURN p.nombre AS nombre
-                """,
-                nombre=profesor.nombre,
-                estilo_enseñanza=profesor.estilo_enseñanza,
-                estilo_clase=profesor.estilo_clase,
-                años_experiencia=profesor.años_experiencia,
-                evaluacion_docente=profesor.evaluacion_docente,
-                porcentaje_aprobados=profesor.porcentaje_aprobados,
-                disponibilidad=profesor.disponibilidad,
-                puntuacion_total=puntuacion
-            )
-            if result:
-                profesores_creados.append(profesor)
-                print(f"✅ Profesor creado: {profesor.nombre}")
-            else:
-                print(f"❌ Falló al crear profesor: {profesor.nombre}")
+            profesor.calcular_puntuacion()
+            profesores_creados.append(profesor)
+            filas.append(profesor.dict())
         except Exception as e:
-            print(f"🔥 Error al crear profesor {profesor_data.get('nombre', '')}: {str(e)}")
+            print(f"🔥 Error al validar profesor {profesor_data.get('nombre', '')}: {str(e)}")
+    
+    total = escribir_en_lotes(
+        driver,
+        """
+        UNWIND $filas AS f
+        MERGE (p:Profesor {nombre: f.nombre})
+        SET p.estilo_enseñanza = f.estilo_enseñanza,
+            p.estilo_clase = f.estilo_clase,
+            p.años_experiencia = f.años_experiencia,
+            p.evaluacion_docente = f.evaluacion_docente,
+            p.porcentaje_aprobados = f.porcentaje_aprobados,
+            p.disponibilidad = f.disponibilidad,
+            p.puntuacion_total = f.puntuacion_total
+        RETURN count(*) AS total
+        """,
+        filas,
+        tamano_lote
+    )
+    print(f"✅ Profesores creados: {total}/{len(profesores_data)}")
     
     return profesores_creados
         
@@ -389,20 +392,20 @@ def comprobar_conexion(driver: Neo4jDriver):
 """Se crean los estudiantes a utilizarse en el sistema de recomendación según los datos recopilados
 Se consideró crer estudiantes de forma al azar pero con valores lógicos ya que dentro de una institución educativa existen
 estudiantes de todo tipo, de esta manear no utilizamos datos idóneos para el sistema de recomendación"""
-def crear_estudiantes(driver=None) -> list:
+def crear_estudiantes(driver=None, tamano_lote: int = TAMANO_LOTE, num_estudiantes: int = 98) -> list:
     """Genera los estudiantes en el sistema sin fecha_registro"""
     carreras = ["Ingeniería en Ciencias de la Computación", "Matemática Aplicada", "Física", "Ingeniería Mecánica", "Ingeniería Industrial",
                 "Ingeniería civil arquitectónica", "Ingeniería química", "Ingeniería biomédica", "Bioquímica y microbiología", "Química", "Química Farmacéutica",
                 "Arquitectura", "Ingeniería electrónica"]
     estudiantes = []
-    for i in range(1, 99):
+    for i in range(1, num_estudiantes + 1):
         estudiantes.append({
             "nombre": fake.name(),
             "carnet": f"25{str(i).zfill(3)}",
             "carrera": random.choice(carreras),
             "pensum": 2025,
             "email": f"estudiante{i}@uvg.edu.gt",
-            "password": f"pass{i*123}",
+            "password": PASSWORD_ESTUDIANTES,
             "estilo_aprendizaje": random.choice(["mixto", "practico", "teorico"]),
             "estilo_clase": random.choice(["con_tecnologia", "sin_tecnologia", "mixto"]),
             "promedio": random.randint(45, 95),
@@ -421,7 +424,7 @@ def crear_estudiantes(driver=None) -> list:
             "carrera": random.choice(carreras),
             "pensum": 2025,
             "email": "estudiante@uvg.edu.gt",
-            "password": "password123",
+            "password": PASSWORD_ESTUDIANTES,
             "estilo_aprendizaje": "mixto",
             "estilo_clase": "con_tecnologia",
             "promedio": 73,
@@ -451,49 +454,47 @@ def crear_estudiantes(driver=None) -> list:
         }
     ])
     
+    # Se guarda el hash, nunca el texto plano; una sola derivación PBKDF2 por contraseña
+    hashes = {}
+    for e_data in estudiantes:
+        if e_data["password"] not in hashes:
+            hashes[e_data["password"]] = hashear_password(e_data["password"])
+        e_data["password"] = hashes[e_data["password"]]
+    
     estudiantes_creados = []
+    filas = []
+    nombres_usados = set()
     for e_data in estudiantes:
         try:
+            # Faker puede repetir nombres y Estudiante.nombre es único
+            if e_data["nombre"] in nombres_usados:
+                print(f"⚠️ Nombre repetido, se omite el estudiante {e_data['carnet']}")
+                continue
             estudiante = Estudiante(**e_data)
-            puntuacion = estudiante.calcular_puntuacion()
-            
-            result = driver.execute_write(
-                """
-                CREATE (e:Estudiante {
-                    nombre: $nombre,
-                    carnet: $carnet,
-                    carrera: $carrera,
-                    pensum: $pensum,
-                    email: $email,
-                    password: $password,
-                    estilo_aprendizaje: $estilo_aprendizaje,
-                    estilo_clase: $estilo_clase,
-                    promedio: $promedio,
-                    grado: $grado,
-                    carga_maxima: $carga_maxima,
-                    cursos_zona_minima: $cursos_zona_minima,
-                    asistencias: $asistencias,
-                    veces_curso: $veces_curso,
-                    puntuacion_total: $puntuacion_total,
-                    role: $role
-                })
-                RETURN e
-                """,
-                **estudiante.dict(exclude={"puntuacion_total"}),
-                puntuacion_total=puntuacion
-            )
-            
-            if result:
-                estudiantes_creados.append(estudiante)
-                print(f"✅ Estudiante creado: {estudiante.carnet}")
-            else:
-                print(f"❌ Falló al crear estudiante: {estudiante.carnet}")
+            estudiante.calcular_puntuacion()
+            nombres_usados.add(estudiante.nombre)
+            estudiantes_creados.append(estudiante)
+            filas.append(estudiante.dict())
         except Exception as e:
-            print(f"🔥 Error al crear estudiante {e_data.get('carnet', '')}: {str(e)}")
+            print(f"🔥 Error al validar estudiante {e_data.get('carnet', '')}: {str(e)}")
+    
+    total = escribir_en_lotes(
+        driver,
+        """
+        UNWIND $filas AS f
+        MERGE (e:Estudiante {carnet: f.carnet})
+        SET e += f
+        RETURN count(*) AS total
+        """,
+        filas,
+        tamano_lote
+    )
+    print(f"✅ Estudiantes creados: {total}/{len(estudiantes)}")
     
     return estudiantes_creados
 
-def crear_relaciones(driver: Neo4jDriver, cursos: List[Curso],profesores: List[Profesor], estudiantes: List[Estudiante]):
+def crear_relaciones(driver: Neo4jDriver, cursos: List[Curso],profesores: List[Profesor], estudiantes: List[Estudiante],
+                     tamano_lote: int = TAMANO_LOTE):
     """Crea todas las relaciones entre nodos en la base de datos"""
     asignaciones_profesor_curso = [
         ("Carlos Martínez", "MAT101"), ("Carlos Martínez", "MAT104"),
@@ -517,70 +518,66 @@ def crear_relaciones(driver: Neo4jDriver, cursos: List[Curso],profesores: List[P
         ]
     
     print("\nCreando relaciones PROFESOR-IMPARTE-CURSO...")
-    for profesor_nombre, curso_codigo in asignaciones_profesor_curso:
-        try:
-            result = driver.execute_write(
-                """
-                MATCH (p:Profesor {nombre: $profesor_nombre})
-                MATCH (c:Curso {codigo: $curso_codigo})
-                MERGE (p)-[r:IMPARTE]->(c)
-                RETURN r
-                """,
-                profesor_nombre=profesor_nombre,
-                curso_codigo=curso_codigo
-            )
-            print(f"Relación IMPARTE creada: {profesor_nombre} -> {curso_codigo}: {'Éxito' if result else 'Falló'}")
-        except Exception as e:
-            print(f"Error al crear relación IMPARTE {profesor_nombre} -> {curso_codigo}: {str(e)}")
+    total = escribir_en_lotes(
+        driver,
+        """
+        UNWIND $filas AS f
+        MATCH (p:Profesor {nombre: f.profesor_nombre})
+        MATCH (c:Curso {codigo: f.curso_codigo})
+        MERGE (p)-[:IMPARTE]->(c)
+        RETURN count(*) AS total
+        """,
+        [
+            {"profesor_nombre": profesor_nombre, "curso_codigo": curso_codigo}
+            for profesor_nombre, curso_codigo in asignaciones_profesor_curso
+        ],
+        tamano_lote
+    )
+    print(f"Relaciones IMPARTE creadas: {total}/{len(asignaciones_profesor_curso)}")
+    
+    # Un profesor por curso, cargado una sola vez en lugar de consultarlo por cada estudiante
+    profesor_por_curso = {
+        record["codigo_curso"]: record["profesor_nombre"]
+        for record in driver.execute_read(
+            """
+            MATCH (p:Profesor)-[:IMPARTE]->(c:Curso)
+            RETURN c.codigo AS codigo_curso, collect(p.nombre)[0] AS profesor_nombre
+            """
+        )
+    }
     
-    print("\nCreando relaciones ESTUDIANTE-APROBÓ_CON-CURSO y RECOMENDACIONES...")
+    print("\nCreando relaciones ESTUDIANTE-APROBÓ_CON-CURSO...")
+    filas = []
     for estudiante in estudiantes:
-        try:
-            cursos_aprobados = random.sample(cursos, random.randint(3, 5))
+        cursos_aprobados = random.sample(cursos, random.randint(3, 5))
+        
+        for curso in cursos_aprobados:
+            profesor_nombre = profesor_por_curso.get(curso.codigo)
+            if not profesor_nombre:
+                print(f"⚠️ No se encontró profesor para el curso {curso.codigo}")
+                continue
             
-            for curso in cursos_aprobados:
-
-                profesor_result = driver.execute_read(
-                    """
-                    MATCH (p:Profesor)-[:IMPARTE]->(c:Curso {codigo: $codigo_curso})
-                    RETURN p.nombre as profesor_nombre LIMIT 1
-                    """,
-                    codigo_curso=curso.codigo
-                )
-                
-                if profesor_result:
-                    profesor_nombre = profesor_result[0]["profesor_nombre"]
-                    nota = random.randint(70, 95) if random.random() < 0.8 else random.randint(60, 69)
-                    
-                    # Crear relación APROBÓ_CON
-                    driver.execute_write(
-                        """
-                        MATCH (e:Estudiante {carnet: $carnet})
-                        MATCH (c:Curso {codigo: $codigo_curso})
-                        MERGE (e)-[r:APROBÓ_CON {nota: $nota}]->(c)
-                        RETURN r
-                        """,
-                        carnet=estudiante.carnet,
-                        codigo_curso=curso.codigo,
-                        nota=nota
-                    )
-                    
-                    # Crear relación RECOMENDACION
-                    driver.execute_write(
-                        """
-                        MATCH (e:Estudiante {carnet: $carnet})
-                        MATCH (p:Profesor {nombre: $profesor_nombre})
-                        MERGE (e)-[r:RECOMENDACION]->(p)
-                        RETURN r
-                        """,
-                        carnet=estudiante.carnet,
-                        profesor_nombre=profesor_nombre
-                    )
-                    print(f"Relaciones creadas para {estudiante.carnet} con curso {curso.codigo}")
-                else:
-                    print(f"⚠️ No se encontró profesor para el curso {curso.codigo}")
-        except Exception as e:
-            print(f"🔥 Error al procesar estudiante {getattr(estudiante, 'carnet', '')}: {str(e)}")
+            nota = random.randint(70, 95) if random.random() < 0.8 else random.randint(60, 69)
+            filas.append({
+                "carnet": estudiante.carnet,
+                "codigo_curso": curso.codigo,
+                "profesor_nombre": profesor_nombre,
+                "nota": nota
+            })
+    
+    total = escribir_en_lotes(
+        driver,
+        """
+        UNWIND $filas AS f
+        MATCH (e:Estudiante {carnet: f.carnet})
+        MATCH (c:Curso {codigo: f.codigo_curso})
+        MERGE (e)-[:APROBÓ_CON {nota: f.nota}]->(c)
+        RETURN count(*) AS total
+        """,
+        filas,
+        tamano_lote
+    )
+    print(f"Relaciones APROBÓ_CON creadas: {total}/{len(filas)}")
 
     """Comprueba la conexión con Neo4j"""
 def comprobar_conexion(driver:Neo4jDriver) -> bool:
@@ -634,6 +631,15 @@ def verificar_insercion(driver:Neo4jDriver):
 
 """Funcion principal para inicializar la base de datos"""
 def main():
+    parser = argparse.ArgumentParser(description="Inicializa la base de datos con datos de prueba")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por transacción en las escrituras")
+    parser.add_argument("--semilla", type=int, default=SEMILLA, help="Semilla para datos reproducibles")
+    parser.add_argument("--estudiantes", type=int, default=98, help="Número de estudiantes generados al azar")
+    args = parser.parse_args()
+
+    random.seed(args.semilla)
+    fake.seed_instance(args.semilla)
+    
     driver = Neo4jDriver()
     print("Inicializando la base de datos...")
     if not comprobar_conexion(driver):
@@ -645,16 +651,16 @@ def main():
         crear_restricciones(driver)
         
         print("\n=== Creando Cursos ===")
-        cursos = crear_cursos(driver)
+        cursos = crear_cursos(driver, args.lote)
         
         print("\n=== Creando Profesores ===")
-        profesores = crear_profesores(driver)
+        profesores = crear_profesores(driver, args.lote)
         
         print("\n=== Creando Estudiantes ===")
-        estudiantes = crear_estudiantes(driver)
+        estudiantes = crear_estudiantes(driver, args.lote, args.estudiantes)
         
         print("\n=== Creando Relaciones ===")
-        crear_relaciones(driver, cursos, profesores, estudiantes)
+        crear_relaciones(driver, cursos, profesores, estudiantes, args.lote)
         
         print("\n=== Verificación Final ===")
         verificar_insercion(driver)
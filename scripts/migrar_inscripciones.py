@@ -0,0 +1,84 @@
+"""
+Migra las relaciones INSCRITO heredadas a la relación canónica INSCRITO_EN
+
+INSCRITO_EN guarda en una sola arista el profesor, la nota final, si aprobó y el
+estado de la inscripción. Cada lote reescribe hasta --lote relaciones en su propia
+transacción y elimina las INSCRITO ya migradas, así que el script se puede
+interrumpir y volver a ejecutar: continúa con las que falten.
+
+Uso:
+    poetry run python -m scripts.migrar_inscripciones
+    poetry run python -m scripts.migrar_inscripciones --lote 5000
+    poetry run python -m scripts.migrar_inscripciones --solo-contar
+"""
+import argparse
+import os
+import time
+
+from src.database.neo4jdriver import Neo4jDriver
+
+TAMANO_LOTE = int(os.getenv("MIGRATION_BATCH_SIZE", "2000"))
+
+# Si ya existe INSCRITO_EN para el par se conservan sus valores y solo se completan los vacíos.
+# Sin profesor registrado se usa el único profesor que imparte el curso, si lo hay.
+QUERY_MIGRAR_LOTE = """
+MATCH (e:Estudiante)-[viejo:INSCRITO]->(c:Curso)
+WITH e, c, viejo LIMIT $limite
+OPTIONAL MATCH (p:Profesor)-[:IMPARTE]->(c)
+WITH e, c, viejo, collect(p.nombre) AS profesores
+MERGE (e)-[r:INSCRITO_EN]->(c)
+ON CREATE SET r.fecha_inscripcion = coalesce(viejo.fecha_inscripcion, datetime()),
+              r.estado = 'activo'
+SET r.profesor = coalesce(r.profesor, viejo.profesor, CASE WHEN size(profesores) = 1 THEN profesores[0] END),
+    r.nota_final = coalesce(r.nota_final, viejo.nota_final),
+    r.aprobado = coalesce(r.aprobado, viejo.aprobado)
+DELETE viejo
+RETURN count(*) AS migradas
+"""
+
+def contar_pendientes(driver: Neo4jDriver) -> int:
+    """Número de relaciones INSCRITO que faltan por migrar"""
+    return driver.execute_read("MATCH ()-[r:INSCRITO]->() RETURN count(r) AS total")[0]["total"]
+
+def migrar_inscripciones(driver: Neo4jDriver, tamano_lote: int = TAMANO_LOTE) -> int:
+    """
+    Reescribe las relaciones INSCRITO como INSCRITO_EN en lotes acotados
+
+    Args:
+        driver: Instancia de Neo4jDriver
+        tamano_lote: Relaciones por transacción
+
+    Returns:
+        int: Total de relaciones migradas en esta ejecución
+    """
+    total = 0
+    lote = 0
+    while True:
+        migradas = driver.execute_write(QUERY_MIGRAR_LOTE, limite=tamano_lote)[0]["migradas"]
+        if not migradas:
+            break
+        total += migradas
+        lote += 1
+        print(f"🔁 Lote {lote}: {migradas} inscripciones migradas ({total} en total)")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra INSCRITO a la relación canónica INSCRITO_EN")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Relaciones por transacción")
+    parser.add_argument("--solo-contar", action="store_true", help="Solo muestra cuántas relaciones faltan")
+    args = parser.parse_args()
+
+    driver = Neo4jDriver()
+    try:
+        pendientes = contar_pendientes(driver)
+        print(f"📋 {pendientes} relaciones INSCRITO pendientes")
+        if args.solo_contar or not pendientes:
+            return
+        inicio = time.perf_counter()
+        total = migrar_inscripciones(driver, args.lote)
+        print(f"✅ {total} inscripciones migradas a INSCRITO_EN ({time.perf_counter() - inicio:.1f} s)")
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
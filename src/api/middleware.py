@@ -0,0 +1,122 @@
+import time
+
+from fastapi import Request
+
+from config import DB_QUERY_BUDGET, DB_TIME_BUDGET_MS
+from database.neo4jdriver import iniciar_conteo_consultas, finalizar_conteo_consultas
+from utils.helpers import token_admin_valido
+from utils.perfilador import almacen_perfiles
+from utils.serializacion import iniciar_formato, finalizar_formato
+from utils.metricas import (
+    solicitudes_http_total, duracion_solicitudes_http, solicitudes_en_curso,
+    consultas_por_solicitud, presupuesto_consultas_excedido
+)
+
+# Plantilla completa (prefijo del router + ruta) por id de cada ruta incluida
+_plantillas = {}
+
+def registrar_plantillas(router, prefijo):
+    """
+    Guarda la plantilla completa de las rutas de un router incluido con `prefijo`.
+    scope["route"] solo trae la ruta relativa al router, sin el prefijo.
+    """
+    for ruta in router.routes:
+        _plantillas[id(ruta)] = prefijo + getattr(ruta, "path_format", ruta.path)
+
+def plantilla_ruta(request: Request):
+    """
+    Obtiene la plantilla de la ruta atendida (p. ej. /api/v1/estudiantes/{carnet})
+    para no generar una serie de métricas por cada valor de parámetro
+    """
+    ruta = request.scope.get("route")
+    if ruta is None:
+        return "sin_ruta"
+    return _plantillas.get(id(ruta)) or getattr(ruta, "path_format", None) or "sin_ruta"
+
+async def medir_solicitudes(request: Request, call_next):
+    """Registra conteo, latencia y solicitudes en curso por ruta"""
+    solicitudes_en_curso.inc()
+    inicio = time.perf_counter()
+    estado = 500
+    try:
+        response = await call_next(request)
+        estado = response.status_code
+        return response
+    finally:
+        duracion = time.perf_counter() - inicio
+        ruta = plantilla_ruta(request)
+        solicitudes_en_curso.dec()
+        solicitudes_http_total.inc(metodo=request.method, ruta=ruta, estado=estado)
+        duracion_solicitudes_http.observe(duracion, metodo=request.method, ruta=ruta)
+
+async def contar_consultas(request: Request, call_next):
+    """
+    Cuenta las consultas a Neo4j y el tiempo de BD de cada solicitud, los agrega
+    como headers X-DB-Queries / X-DB-Time-Ms y avisa cuando se supera el presupuesto
+    """
+    conteo, token = iniciar_conteo_consultas()
+    try:
+        response = await call_next(request)
+    finally:
+        finalizar_conteo_consultas(token)
+
+    ruta = plantilla_ruta(request)
+    consultas_por_solicitud.observe(conteo["consultas"], ruta=ruta)
+
+    if conteo["consultas"] > DB_QUERY_BUDGET or conteo["tiempo_ms"] > DB_TIME_BUDGET_MS:
+        presupuesto_consultas_excedido.inc(ruta=ruta)
+        print(
+            f"⚠️ Posible N+1 en {request.method} {ruta}: {conteo['consultas']} consultas, "
+            f"{conteo['tiempo_ms']:.1f} ms de BD (presupuesto: {DB_QUERY_BUDGET} consultas, {DB_TIME_BUDGET_MS:.0f} ms)"
+        )
+
+    response.headers["X-DB-Queries"] = str(conteo["consultas"])
+    response.headers["X-DB-Time-Ms"] = f"{conteo['tiempo_ms']:.2f}"
+    return response
+
+def solicita_perfil(request: Request):
+    """El perfil se pide con el header X-Profile o el parámetro ?perfilar=true, y requiere X-Admin-Token"""
+    pedido = (
+        request.headers.get("X-Profile", "").lower() in ("1", "true")
+        or request.query_params.get("perfilar", "").lower() in ("1", "true")
+    )
+    return pedido and token_admin_valido(request.headers.get("X-Admin-Token"))
+
+async def perfilar_solicitud(request: Request, call_next):
+    """
+    Ejecuta la solicitud bajo cProfile cuando un administrador lo pide y
+    devuelve el identificador del perfil en el header X-Profile-Id
+    """
+    if not solicita_perfil(request):
+        return await call_next(request)
+
+    perfil = almacen_perfiles.intentar_iniciar()
+    if perfil is None:
+        response = await call_next(request)
+        response.headers["X-Profile-Id"] = "ocupado"
+        return response
+
+    inicio = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        almacen_perfiles.detener(perfil)
+
+    id_perfil = almacen_perfiles.guardar(
+        perfil, request.method, request.url.path, time.perf_counter() - inicio
+    )
+    response.headers["X-Profile-Id"] = id_perfil
+    return response
+
+async def negociar_formato(request: Request, call_next):
+    """
+    Elige JSON o MessagePack (Accept: application/msgpack) para las rutas que responden
+    con responder() y agrega Vary: Accept para que los caches distingan ambos formatos
+    """
+    token = iniciar_formato(request.headers.get("accept"))
+    try:
+        response = await call_next(request)
+    finally:
+        finalizar_formato(token)
+    response.headers.add_vary_header("Accept")
+    return response
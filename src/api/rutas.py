@@ -1,13 +1,21 @@
-from database.neo4jdriver import Neo4jDriver
+from database.neo4jdriver import Neo4jDriver, estado_conexion
+from database.migraciones import verificar_esquema
 from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
+from datetime import datetime
+import asyncio
 
-from services.algoritmo_de_recomendacion import AlgoritmoRecomendacion
+from services.algoritmo_de_recomendacion import AlgoritmoRecomendacion, huellas_recomendacion
 from utils.helpers import create_response
+from utils.cache_http import version_catalogo
+from utils.seguridad import cache_principales
+from utils.metricas import tasas_acierto_cache
+from utils.serializacion import RespuestaJSON, responder
+from models.respuestas import RespuestaRecomendaciones, RespuestaCompatibilidad
 
 router = APIRouter()
 
-@router.get("/recomendaciones/{nombre_estudiante}")
+@router.get("/recomendaciones/{nombre_estudiante}", response_model=RespuestaRecomendaciones, response_class=RespuestaJSON)
 async def obtener_recomendaciones(
     nombre_estudiante: str,
     curso: Optional[str] = Query(None, description="Código del curso para filtrar recomendaciones"),
@@ -57,11 +65,13 @@ async def obtener_recomendaciones(
             }
         }
             
-        return create_response(
+        return responder(create_response(
             data=respuesta_data,
             message=f"Se encontraron {len(recomendaciones)} recomendaciones para {nombre_estudiante}" + 
                    (f" en el curso {curso}" if curso else "")
-        )
+        ))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener recomendaciones: {str(e)}")
 
@@ -135,6 +145,8 @@ async def registrar_aprobacion(
         )
         
         if resultado:
+            # La relación IMPARTE cambia /cursos/{codigo}/profesores
+            version_catalogo.incrementar()
             return create_response(
                 data={
                     "estudiante": nombre_estudiante,
@@ -225,40 +237,76 @@ async def obtener_porcentaje_recomendacion(
 @router.get("/health")
 async def health_check():
     """
-    Verifica el estado de la API y del algoritmo de recomendación
+    Verifica la conexión con Neo4j y el esquema
     
     Returns:
-        Estado de la API y componentes
+        Estado de la base de datos y del esquema
     """
     try:
         # Verificar conexión con Neo4j
         driver = Neo4jDriver()
         connection_test = driver.execute_read("RETURN 1 as test")
         
-        # Verificar algoritmo
-        algoritmo = AlgoritmoRecomendacion()
+        # Verificar restricciones e índices del esquema
+        esquema = verificar_esquema(driver)
         
         return create_response(
             data={
                 "database": "conectada" if connection_test else "desconectada",
-                "algoritmo": "operativo",
-                "timestamp": "datetime().isoString()",
+                "timestamp": datetime.now().isoformat(),
                 "componentes": {
-                    "neo4j_driver": "ok",
-                    "algoritmo_recomendacion": "ok",
-                    "algoritmo_estudiante": "ok",
-                    "algoritmo_profesor": "ok"
-                }
+                    "neo4j_driver": "ok" if connection_test else "error",
+                    "esquema": "ok" if not esquema["faltantes"] else "incompleto"
+                },
+                "esquema": esquema
             },
-            message="API funcionando correctamente"
+            message="API funcionando correctamente" if not esquema["faltantes"]
+                    else f"API funcionando con {len(esquema['faltantes'])} índices faltantes"
         )
     except Exception as e:
         raise HTTPException(status_code=503, detail=f"Error de conexión: {str(e)}")
 
-@router.get("/compatibilidad/{nombre_estudiante}")
+@router.get("/health/live")
+async def liveness():
+    """
+    Sonda de liveness: solo confirma que el proceso responde, sin tocar Neo4j
+    
+    Returns:
+        Estado del proceso
+    """
+    return create_response(data={"estado": "vivo"}, message="Proceso activo")
+
+@router.get("/health/ready")
+async def readiness():
+    """
+    Sonda de readiness: usa el pool compartido y el último estado conocido de Neo4j
+    (se verifica como mucho una vez cada HEALTH_CACHE_TTL_S segundos)
+    
+    Returns:
+        Estado de la base de datos, del pool y de los caches; 503 si Neo4j no está disponible
+    """
+    estado = await asyncio.to_thread(estado_conexion.obtener)
+    if not estado["conectada"]:
+        raise HTTPException(status_code=503, detail=f"Neo4j no disponible: {estado['error']}")
+    
+    return create_response(
+        data={
+            "database": estado,
+            "pool": Neo4jDriver.estado_pool(),
+            "caches": {
+                "principales": len(cache_principales),
+                "huellas_recomendacion": len(huellas_recomendacion),
+                "tasas_acierto": tasas_acierto_cache()
+            }
+        },
+        message="Servicio listo"
+    )
+
+@router.get("/compatibilidad/{nombre_estudiante}", response_model=RespuestaCompatibilidad, response_class=RespuestaJSON)
 async def obtener_matriz_compatibilidad(
     nombre_estudiante: str,
-    incluir_todos: Optional[bool] = Query(False, description="Incluir todos los profesores aunque no tengan cursos")
+    incluir_todos: Optional[bool] = Query(False, description="Incluir todos los profesores aunque no tengan cursos"),
+    summary_only: bool = Query(False, description="Devolver solo los nombres de los profesores por rango y los conteos")
 ):
     """
     Obtiene una matriz de compatibilidad completa para un estudiante
@@ -267,6 +315,7 @@ async def obtener_matriz_compatibilidad(
     Args:
         nombre_estudiante: Nombre del estudiante
         incluir_todos: Si incluir todos los profesores
+        summary_only: Si es True, cada rango lista solo nombres de profesores
         
     Returns:
         Matriz de compatibilidad organizada
@@ -300,7 +349,10 @@ async def obtener_matriz_compatibilidad(
             else:
                 matriz["bajo"].append(rec)
         
-        return create_response(
+        if summary_only:
+            matriz = {rango: [rec["profesor"] for rec in recs] for rango, recs in matriz.items()}
+        
+        return responder(create_response(
             data={
                 "matriz_compatibilidad": matriz,
                 "resumen": {
@@ -314,7 +366,7 @@ async def obtener_matriz_compatibilidad(
                 "estudiante": nombre_estudiante
             },
             message=f"Matriz de compatibilidad generada para {nombre_estudiante}"
-        )
+        ))
     except HTTPException:
         raise
     except Exception as e:
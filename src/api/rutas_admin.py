@@ -0,0 +1,166 @@
+from fastapi import APIRouter, HTTPException, Query, Header, Depends
+from fastapi.responses import FileResponse
+from typing import Optional
+import asyncio
+import os
+
+from utils.helpers import create_response, token_admin_valido
+from utils.perfilador import almacen_perfiles
+from services.compactacion import compactar_recomendaciones, contar_relaciones_por_tipo
+from database.neo4jdriver import Neo4jDriver, estadisticas_consultas
+from config import RECOMMENDATION_MAX_AGE_DAYS, RECOMMENDATION_TOP_N
+
+async def verificar_admin(x_admin_token: Optional[str] = Header(None)):
+    """Rechaza la solicitud si no trae un X-Admin-Token válido"""
+    if not token_admin_valido(x_admin_token):
+        raise HTTPException(status_code=403, detail="Se requiere un token de administración válido")
+
+router = APIRouter(dependencies=[Depends(verificar_admin)])
+
+@router.get("/perfiles")
+async def listar_perfiles():
+    """
+    Lista los perfiles de solicitudes capturados
+
+    Returns:
+        Metadatos de los perfiles guardados
+    """
+    perfiles = almacen_perfiles.listar()
+    return create_response(
+        data=perfiles,
+        message=f"Se encontraron {len(perfiles)} perfiles"
+    )
+
+@router.get("/perfiles/{id_perfil}")
+async def obtener_perfil(
+    id_perfil: str,
+    limite: Optional[int] = Query(50, description="Número máximo de funciones a devolver"),
+    filtro: Optional[str] = Query(None, description="Texto a buscar en la función o archivo (p. ej. algoritmo_de_recomendacion)"),
+    ordenar_por: Optional[str] = Query("tiempo_acumulado_ms", description="tiempo_acumulado_ms, tiempo_propio_ms o llamadas")
+):
+    """
+    Obtiene el tiempo acumulado por función de un perfil
+
+    Args:
+        id_perfil: Identificador devuelto en el header X-Profile-Id
+        limite: Número máximo de funciones a devolver
+        filtro: Texto a buscar en la función o archivo
+        ordenar_por: Campo por el cual ordenar de mayor a menor
+
+    Returns:
+        Perfil con las funciones más costosas
+    """
+    campos_validos = ["tiempo_acumulado_ms", "tiempo_propio_ms", "llamadas"]
+    if ordenar_por not in campos_validos:
+        raise HTTPException(status_code=400, detail=f"ordenar_por debe ser uno de: {campos_validos}")
+
+    perfil = almacen_perfiles.obtener(id_perfil, limite=limite, filtro=filtro, ordenar_por=ordenar_por)
+    if perfil is None:
+        raise HTTPException(status_code=404, detail=f"No se encontró el perfil {id_perfil}")
+
+    return create_response(
+        data=perfil,
+        message=f"Perfil {id_perfil} de {perfil['metodo']} {perfil['ruta']}"
+    )
+
+@router.get("/perfiles/{id_perfil}/descargar")
+async def descargar_perfil(id_perfil: str):
+    """
+    Descarga el archivo .prof de un perfil para analizarlo con pstats o snakeviz
+
+    Args:
+        id_perfil: Identificador del perfil
+
+    Returns:
+        Archivo en formato pstats
+    """
+    perfil = almacen_perfiles.obtener(id_perfil, limite=0)
+    if perfil is None or not perfil["archivo"] or not os.path.exists(perfil["archivo"]):
+        raise HTTPException(status_code=404, detail=f"No se encontró el archivo del perfil {id_perfil}")
+
+    return FileResponse(perfil["archivo"], media_type="application/octet-stream", filename=f"{id_perfil}.prof")
+
+@router.get("/relaciones")
+async def conteo_relaciones():
+    """
+    Cuenta las relaciones del grafo por tipo
+
+    Returns:
+        Cantidad de relaciones de cada tipo y el total
+    """
+    try:
+        conteos = contar_relaciones_por_tipo(Neo4jDriver())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al contar relaciones: {str(e)}")
+
+    return create_response(
+        data={"por_tipo": conteos, "total": sum(conteos.values())},
+        message=f"Se encontraron {len(conteos)} tipos de relación"
+    )
+
+@router.post("/recomendaciones/compactar")
+async def compactar(
+    max_dias: Optional[int] = Query(RECOMMENDATION_MAX_AGE_DAYS, ge=0, description="Antigüedad máxima en días (0 sin límite)"),
+    top_n: Optional[int] = Query(RECOMMENDATION_TOP_N, ge=0, description="Recomendaciones conservadas por estudiante (0 sin límite)")
+):
+    """
+    Ejecuta la compactación de recomendaciones sin esperar al ciclo en segundo plano
+
+    Args:
+        max_dias: Antigüedad máxima de una relación RECOMENDADO
+        top_n: Número de recomendaciones conservadas por estudiante
+
+    Returns:
+        Relaciones eliminadas por motivo
+    """
+    try:
+        resultado = await asyncio.to_thread(compactar_recomendaciones, Neo4jDriver(), max_dias, top_n)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al compactar recomendaciones: {str(e)}")
+
+    eliminadas = resultado["antiguas"] + resultado["excedentes"] + resultado["heredadas"]
+    return create_response(
+        data=resultado,
+        message=f"Se eliminaron {eliminadas} relaciones de recomendación"
+    )
+
+@router.get("/metricas/consultas")
+async def obtener_metricas_consultas(
+    ordenar_por: Optional[str] = Query("tiempo_total_ms", description="Campo por el cual ordenar las consultas"),
+    limite: Optional[int] = Query(20, description="Número máximo de consultas a devolver")
+):
+    """
+    Obtiene las métricas de ejecución de consultas Cypher agrupadas por huella
+
+    Args:
+        ordenar_por: tiempo_total_ms, ejecuciones, tiempo_max_ms, tiempo_promedio_ms o filas_totales
+        limite: Número máximo de consultas a devolver
+
+    Returns:
+        Métricas por consulta y registro de consultas lentas
+    """
+    campos_validos = ["tiempo_total_ms", "ejecuciones", "tiempo_max_ms", "tiempo_promedio_ms", "filas_totales", "errores"]
+    if ordenar_por not in campos_validos:
+        raise HTTPException(status_code=400, detail=f"ordenar_por debe ser uno de: {campos_validos}")
+
+    consultas = estadisticas_consultas.obtener(ordenar_por=ordenar_por, limite=limite)
+
+    return create_response(
+        data={
+            "consultas": consultas,
+            "consultas_lentas": estadisticas_consultas.consultas_lentas(),
+            "umbral_lenta_ms": estadisticas_consultas.umbral_lenta_ms
+        },
+        message=f"Métricas de {len(consultas)} consultas"
+    )
+
+@router.delete("/metricas/consultas")
+async def reiniciar_metricas_consultas():
+    """
+    Reinicia las métricas de consultas acumuladas
+
+    Returns:
+        Confirmación del reinicio
+    """
+    estadisticas_consultas.reiniciar()
+    return create_response(message="Métricas de consultas reiniciadas")
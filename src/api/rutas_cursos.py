@@ -1,10 +1,16 @@
-from fastapi import APIRouter, HTTPException, Body
-from typing import List, Optional
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Body, Query, Request
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
 
 from models.curso import Curso
+from models.respuestas import RespuestaLista
 from database.neo4jdriver import Neo4jDriver
-from utils.helpers import create_response
+from utils.serializacion import RespuestaJSON, responder
+from utils.cache_http import version_catalogo, calcular_etag, encabezados_cache, no_modificado
+from api.rutas_estudiantes import ERRORES_INSCRIPCION, QUERY_INSCRIBIR
+from utils.helpers import (
+    create_response, construir_actualizacion, eliminar_en_cascada, resolver_campos, decodificar_cursor, paginar, proyectar
+)
 
 router = APIRouter()
 
@@ -14,6 +20,20 @@ class CursoUpdate(BaseModel):
     departamento: Optional[str] = None
     creditos: Optional[int] = None
 
+# Modelo para inscripciones masivas
+class InscripcionMasiva(BaseModel):
+    carnets: List[str]
+    nombre_profesor: Optional[str] = None  # Profesor para todos los carnets sin asignación propia
+    asignaciones: Optional[Dict[str, str]] = None  # carnet -> nombre del profesor
+
+# Modelos para la carga masiva de notas
+class NotaEstudiante(BaseModel):
+    carnet: str
+    nota_final: float = Field(..., ge=0, le=100)
+
+class NotasMasivas(BaseModel):
+    notas: List[NotaEstudiante]
+
 @router.post("/", status_code=201)
 async def crear_curso(curso: Curso):
     """
@@ -63,6 +83,7 @@ async def crear_curso(curso: Curso):
             # Preparar respuesta
             datos_respuesta = dict(nuevo_curso["c"])
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": "Curso creado exitosamente",
@@ -77,43 +98,62 @@ async def crear_curso(curso: Curso):
         print(f"Error detallado: {str(e)}")  # Para debugging
         raise HTTPException(status_code=500, detail=f"Error al crear curso: {str(e)}")
 
-@router.get("/")
-async def listar_cursos(departamento: Optional[str] = None):
+@router.get("/", response_model=RespuestaLista, response_class=RespuestaJSON)
+async def listar_cursos(
+    request: Request,
+    departamento: Optional[str] = None,
+    limite: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en paginacion.siguiente_cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas")
+):
     """
-    Lista todos los cursos, opcionalmente filtrados por departamento
+    Lista los cursos ordenados por código, opcionalmente filtrados por departamento y paginados por cursor
     
     Args:
         departamento: Filtrar por departamento
+        limite: Tamaño de página
+        cursor: Cursor de la página siguiente
+        fields: Campos a devolver separados por comas
         
     Returns:
-        Lista de cursos
+        Página de cursos y cursor de la siguiente
     """
+    # El catálogo no cambió desde la copia del cliente: 304 sin consultar Neo4j
+    etag = calcular_etag(request)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    
+    try:
+        campos = resolver_campos("Curso", fields)
+        despues = decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
             # Construir la consulta con filtros opcionales
-            query = "MATCH (c:Curso)"
-            params = {}
+            query = "MATCH (c:Curso) WHERE c.codigo > $despues"
+            params = {"despues": despues, "campos": campos, "limite": limite + 1}
             
             if departamento:
-                query += " WHERE c.departamento = $departamento"
+                query += " AND c.departamento = $departamento"
                 params["departamento"] = departamento
                 
-            query += " RETURN c ORDER BY c.nombre"
+            query += " RETURN c.codigo AS clave, [campo IN $campos | c[campo]] AS valores ORDER BY c.codigo LIMIT $limite"
             
             result = session.run(query, **params)
-            cursos = []
-            
-            for record in result:
-                curso_data = dict(record["c"])
-                cursos.append(curso_data)
+            pagina, siguiente = paginar(result, limite)
+            cursos = [proyectar(campos, record["valores"]) for record in pagina]
             
-            return {
+            return responder({
                 "success": True,
                 "message": f"Se encontraron {len(cursos)} cursos",
-                "data": cursos
-            }
+                "data": cursos,
+                "paginacion": {"limite": limite, "siguiente_cursor": siguiente}
+            }, headers=encabezados_cache(etag))
         finally:
             session.close()
     
@@ -175,59 +215,40 @@ async def actualizar_curso(
     Returns:
         Datos del curso actualizado
     """
+    try:
+        # Convertir a diccionario y filtrar campos None
+        query_update, props = construir_actualizacion("Curso", datos_actualizados.dict(exclude_none=True))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el curso existe
-            query_existe = """
-            MATCH (c:Curso {codigo: $codigo})
-            RETURN c
-            """
-            result = session.run(query_existe, codigo=codigo)
-            curso_existente = result.single()
-            
-            if not curso_existente:
-                raise HTTPException(status_code=404, detail=f"No se encontró el curso con código {codigo}")
-            
-            # Convertir a diccionario y filtrar campos None
-            update_data = datos_actualizados.dict(exclude_none=True)
-            
-            # Construir la consulta para actualizar solo los campos proporcionados
-            if not update_data:
-                curso_data = dict(curso_existente["c"])
+            if not props:
+                query_existe = """
+                MATCH (c:Curso {codigo: $codigo})
+                RETURN c
+                """
+                curso_existente = session.run(query_existe, codigo=codigo).single()
+                if not curso_existente:
+                    raise HTTPException(status_code=404, detail=f"No se encontró el curso con código {codigo}")
                 return {
                     "success": True,
                     "message": "No se proporcionaron campos para actualizar",
-                    "data": curso_data
+                    "data": dict(curso_existente["c"])
                 }
             
-            update_fields = []
-            params = {"codigo": codigo}
-            
-            for key, value in update_data.items():
-                update_fields.append(f"c.{key} = ${key}")
-                params[key] = value
-            
-            # Ejecutar la actualización
-            query_update = f"""
-            MATCH (c:Curso {{codigo: $codigo}})
-            SET {', '.join(update_fields)}
-            RETURN c
-            """
-            
-            print(f"Query de actualización: {query_update}")  # Debug
-            print(f"Parámetros: {params}")  # Debug
-            
-            result_update = session.run(query_update, **params)
-            updated_record = result_update.single()
+            # Actualizar solo los campos proporcionados; sin resultado el curso no existe
+            updated_record = session.run(query_update, clave=codigo, props=props).single()
             
             if not updated_record:
-                raise HTTPException(status_code=500, detail="Error al actualizar el curso")
+                raise HTTPException(status_code=404, detail=f"No se encontró el curso con código {codigo}")
             
             # Preparar respuesta
-            curso_data = dict(updated_record["c"])
+            curso_data = dict(updated_record["n"])
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": f"Curso {codigo} actualizado exitosamente",
@@ -239,7 +260,6 @@ async def actualizar_curso(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error en actualizar_curso: {str(e)}")  # Debug
         raise HTTPException(status_code=500, detail=f"Error al actualizar curso: {str(e)}")
 
 @router.delete("/{codigo}")
@@ -257,31 +277,16 @@ async def eliminar_curso(codigo: str):
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el curso existe
-            query_existe = """
-            MATCH (c:Curso {codigo: $codigo})
-            RETURN c
-            """
-            result = session.run(query_existe, codigo=codigo)
-            if not result.single():
+            # Una sola sentencia: relaciones en lotes y luego el curso
+            resultado = eliminar_en_cascada(session, "Curso", codigo)
+            if resultado is None:
                 raise HTTPException(status_code=404, detail=f"No se encontró el curso con código {codigo}")
             
-            # Eliminar el curso y todas sus relaciones automáticamente
-            # Neo4j elimina automáticamente las relaciones cuando eliminas un nodo
-            query_delete = """
-            MATCH (c:Curso {codigo: $codigo})
-            DETACH DELETE c
-            RETURN COUNT(c) as deleted_count
-            """
-            result_delete = session.run(query_delete, codigo=codigo)
-            deleted = result_delete.single()
-            
-            if deleted["deleted_count"] == 0:
-                raise HTTPException(status_code=500, detail="Error al eliminar el curso")
-            
+            version_catalogo.incrementar()
             return {
                 "success": True,
-                "message": f"Curso {codigo} eliminado exitosamente junto con todas sus relaciones"
+                "message": f"Curso {codigo} eliminado exitosamente junto con {resultado['relaciones_eliminadas']} relaciones",
+                **resultado
             }
         finally:
             session.close()
@@ -291,8 +296,8 @@ async def eliminar_curso(codigo: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al eliminar curso: {str(e)}")
 
-@router.get("/{codigo}/profesores")
-async def obtener_profesores_curso(codigo: str):
+@router.get("/{codigo}/profesores", response_model=RespuestaLista, response_class=RespuestaJSON)
+async def obtener_profesores_curso(codigo: str, request: Request):
     """
     Obtiene todos los profesores que imparten un curso
     
@@ -302,6 +307,11 @@ async def obtener_profesores_curso(codigo: str):
     Returns:
         Lista de profesores del curso
     """
+    etag = calcular_etag(request)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
@@ -329,11 +339,11 @@ async def obtener_profesores_curso(codigo: str):
                 profesor_data = dict(record["p"])
                 profesores.append(profesor_data)
             
-            return {
+            return responder({
                 "success": True,
                 "message": f"Se encontraron {len(profesores)} profesores para el curso {codigo}",
                 "data": profesores
-            }
+            }, headers=encabezados_cache(etag))
         finally:
             session.close()
     
@@ -342,17 +352,31 @@ async def obtener_profesores_curso(codigo: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener profesores del curso: {str(e)}")
 
-@router.get("/{codigo}/estudiantes")
-async def obtener_estudiantes_curso(codigo: str):
+@router.get("/{codigo}/estudiantes", response_model=RespuestaLista, response_class=RespuestaJSON)
+async def obtener_estudiantes_curso(
+    codigo: str,
+    limite: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en paginacion.siguiente_cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas")
+):
     """
-    Obtiene todos los estudiantes inscritos en un curso
+    Obtiene los estudiantes inscritos en un curso, ordenados por nombre y paginados por cursor
     
     Args:
         codigo: Código del curso
+        limite: Tamaño de página
+        cursor: Cursor de la página siguiente
+        fields: Campos del estudiante a devolver separados por comas
         
     Returns:
-        Lista de estudiantes del curso
+        Página de estudiantes del curso y cursor de la siguiente
     """
+    try:
+        campos = resolver_campos("Estudiante", fields)
+        despues = decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
@@ -368,27 +392,34 @@ async def obtener_estudiantes_curso(codigo: str):
             
             # Obtener estudiantes del curso
             query_estudiantes = """
-            MATCH (e:Estudiante)-[r:INSCRITO]->(c:Curso {codigo: $codigo})
-            RETURN e, r.fecha_inscripcion as fecha_inscripcion, r.nota_final as nota_final, r.aprobado as aprobado
+            MATCH (e:Estudiante)-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
+            WHERE e.nombre > $despues
+            RETURN e.nombre AS clave, [campo IN $campos | e[campo]] AS valores,
+                   r.fecha_inscripcion as fecha_inscripcion, r.profesor as profesor, r.estado as estado,
+                   r.nota_final as nota_final, r.aprobado as aprobado
             ORDER BY e.nombre
+            LIMIT $limite
             """
             
-            result = session.run(query_estudiantes, codigo=codigo)
+            result = session.run(query_estudiantes, codigo=codigo, despues=despues, campos=campos, limite=limite + 1)
+            pagina, siguiente = paginar(result, limite)
             estudiantes = []
             
-            for record in result:
-                estudiante_data = dict(record["e"])
-                estudiante_data.pop("password", None)  # No incluir password
+            for record in pagina:
+                estudiante_data = proyectar(campos, record["valores"])
                 estudiante_data["fecha_inscripcion"] = record["fecha_inscripcion"]
+                estudiante_data["profesor"] = record["profesor"]
+                estudiante_data["estado"] = record["estado"]
                 estudiante_data["nota_final"] = record["nota_final"]
                 estudiante_data["aprobado"] = record["aprobado"]
                 estudiantes.append(estudiante_data)
             
-            return {
+            return responder({
                 "success": True,
                 "message": f"Se encontraron {len(estudiantes)} estudiantes para el curso {codigo}",
-                "data": estudiantes
-            }
+                "data": estudiantes,
+                "paginacion": {"limite": limite, "siguiente_cursor": siguiente}
+            })
         finally:
             session.close()
     
@@ -398,77 +429,183 @@ async def obtener_estudiantes_curso(codigo: str):
         raise HTTPException(status_code=500, detail=f"Error al obtener estudiantes del curso: {str(e)}")
 
 @router.post("/{codigo}/estudiantes/{carnet}")
-async def inscribir_estudiante_curso(codigo: str, carnet: str):
+async def inscribir_estudiante_curso(
+    codigo: str,
+    carnet: str,
+    nombre_profesor: Optional[str] = Query(None, description="Profesor con el que se inscribe (obligatorio)")
+):
     """
-    Inscribe un estudiante a un curso (crea relación INSCRITO)
+    Inscribe un estudiante a un curso con un profesor (crea relación INSCRITO_EN)
     
     Args:
         codigo: Código del curso
         carnet: Carnet del estudiante
+        nombre_profesor: Profesor que imparte el curso
         
     Returns:
         Confirmación de la inscripción
     """
+    # Una inscripción sin profesor no se puede calificar ni mostrar como APROBÓ_CON
+    if not nombre_profesor:
+        raise HTTPException(status_code=400, detail="Se requiere el nombre del profesor")
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el curso existe
-            query_curso = """
-            MATCH (c:Curso {codigo: $codigo})
-            RETURN c
-            """
-            result_curso = session.run(query_curso, codigo=codigo)
-            if not result_curso.single():
-                raise HTTPException(status_code=404, detail=f"No se encontró el curso {codigo}")
-            
-            # Verificar que el estudiante existe
-            query_estudiante = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            RETURN e
-            """
-            result_estudiante = session.run(query_estudiante, carnet=carnet)
-            if not result_estudiante.single():
-                raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
-            
-            # Verificar si ya existe la relación
-            query_relacion = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO]->(c:Curso {codigo: $codigo})
-            RETURN r
-            """
-            result_relacion = session.run(query_relacion, carnet=carnet, codigo=codigo)
-            if result_relacion.single():
-                raise HTTPException(status_code=400, detail=f"El estudiante {carnet} ya está inscrito en el curso {codigo}")
-            
-            # Crear la relación
-            query_crear_relacion = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            MATCH (c:Curso {codigo: $codigo})
-            CREATE (e)-[r:INSCRITO {fecha_inscripcion: datetime(), nota_final: null, aprobado: null}]->(c)
-            RETURN r
+            # Misma validación e inscripción en una sola escritura que asignar-curso
+            inscripcion = session.run(
+                QUERY_INSCRIBIR,
+                carnet=carnet,
+                codigo_curso=codigo,
+                nombre_profesor=nombre_profesor
+            ).single()
+        finally:
+            session.close()
+        
+        if not inscripcion:
+            raise HTTPException(status_code=500, detail="Error al crear la inscripción")
+        
+        if inscripcion["estado"] != "inscrito":
+            status_code, detalle = ERRORES_INSCRIPCION[inscripcion["estado"]]
+            raise HTTPException(
+                status_code=status_code,
+                detail=detalle.format(
+                    carnet=carnet,
+                    codigo_curso=codigo,
+                    nombre_profesor=nombre_profesor,
+                    profesor_actual=inscripcion["profesor_actual"]
+                )
+            )
+        
+        return {
+            "success": True,
+            "message": f"Se inscribió al estudiante {carnet} en el curso {codigo} con el profesor {nombre_profesor}"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al inscribir estudiante: {str(e)}")
+
+@router.post("/{codigo}/inscripciones")
+async def inscribir_estudiantes_masivo(
+    codigo: str,
+    inscripcion: InscripcionMasiva = Body(...)
+):
+    """
+    Inscribe varios estudiantes en un curso en una sola transacción (relación INSCRITO_EN)
+    
+    Args:
+        codigo: Código del curso
+        inscripcion: Carnets, profesor por defecto y asignaciones de profesor por carnet
+        
+    Returns:
+        Resultado de la inscripción de cada estudiante
+    """
+    if not inscripcion.carnets:
+        raise HTTPException(status_code=400, detail="Se requiere al menos un carnet")
+    
+    asignaciones = inscripcion.asignaciones or {}
+    filas = [
+        {"carnet": carnet, "profesor": asignaciones.get(carnet, inscripcion.nombre_profesor)}
+        for carnet in dict.fromkeys(inscripcion.carnets)
+    ]
+    
+    try:
+        driver = Neo4jDriver()
+        session = driver.get_session()
+        try:
+            # Validar e inscribir a todos los estudiantes con una sola consulta. Como en
+            # QUERY_INSCRIBIR, MERGE evita duplicar INSCRITO_EN si asignar-curso inscribe
+            # al mismo estudiante a la vez, y la marca nueva indica si esta consulta la creó
+            query = """
+            OPTIONAL MATCH (c:Curso {codigo: $codigo})
+            WITH c
+            UNWIND $filas AS f
+            OPTIONAL MATCH (e:Estudiante {carnet: f.carnet})
+            OPTIONAL MATCH (p:Profesor {nombre: f.profesor})
+            WITH f, e, c, CASE
+                WHEN c IS NULL THEN 'sin_curso'
+                WHEN e IS NULL THEN 'sin_estudiante'
+                WHEN f.profesor IS NOT NULL AND p IS NULL THEN 'sin_profesor'
+                WHEN f.profesor IS NOT NULL AND NOT EXISTS { (p)-[:IMPARTE]->(c) } THEN 'no_imparte'
+                ELSE 'valida'
+            END AS validacion
+            FOREACH (_ IN CASE WHEN validacion = 'valida' THEN [1] ELSE [] END |
+                MERGE (e)-[r:INSCRITO_EN]->(c)
+                ON CREATE SET r.fecha_inscripcion = datetime(),
+                              r.profesor = f.profesor,
+                              r.estado = 'activo',
+                              r.nueva = true
+            )
+            WITH f, e, c, validacion
+            CALL {
+                WITH e, c
+                OPTIONAL MATCH (e)-[r:INSCRITO_EN]->(c)
+                WITH r, coalesce(r.nueva, false) AS creada
+                ORDER BY creada DESC
+                LIMIT 1
+                REMOVE r.nueva
+                RETURN creada, r.profesor AS profesor_actual
+            }
+            RETURN f.carnet AS carnet, f.profesor AS profesor, CASE
+                WHEN validacion <> 'valida' THEN validacion
+                WHEN creada THEN 'inscrito'
+                ELSE 'ya_inscrito'
+            END AS estado, profesor_actual
             """
             
-            result = session.run(query_crear_relacion, carnet=carnet, codigo=codigo)
-            
-            if not result.single():
-                raise HTTPException(status_code=500, detail="Error al crear la inscripción")
-            
-            return {
-                "success": True,
-                "message": f"Se inscribió al estudiante {carnet} en el curso {codigo}"
-            }
+            registros = list(session.run(query, codigo=codigo, filas=filas))
         finally:
             session.close()
+        
+        if any(record["estado"] == "sin_curso" for record in registros):
+            raise HTTPException(status_code=404, detail=f"No se encontró el curso {codigo}")
+        
+        # Un resultado por carnet en el orden de la solicitud
+        por_carnet = {record["carnet"]: record for record in registros}
+        resultados = []
+        for carnet in inscripcion.carnets:
+            record = por_carnet.pop(carnet, None)
+            if record is None:
+                resultados.append({"carnet": carnet, "profesor": None, "estado": "repetido",
+                                   "detalle": f"El carnet {carnet} está repetido en la solicitud"})
+                continue
+            detalle = None
+            if record["estado"] != "inscrito":
+                detalle = ERRORES_INSCRIPCION[record["estado"]][1].format(
+                    carnet=carnet,
+                    codigo_curso=codigo,
+                    nombre_profesor=record["profesor"],
+                    profesor_actual=record["profesor_actual"]
+                )
+            resultados.append({
+                "carnet": carnet,
+                "profesor": record["profesor"],
+                "estado": record["estado"],
+                "detalle": detalle
+            })
+        
+        inscritos = sum(1 for r in resultados if r["estado"] == "inscrito")
+        return create_response(
+            data={
+                "inscritos": inscritos,
+                "rechazados": len(resultados) - inscritos,
+                "resultados": resultados
+            },
+            message=f"Se inscribieron {inscritos} de {len(inscripcion.carnets)} estudiantes en el curso {codigo}"
+        )
     
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al inscribir estudiante: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error al inscribir estudiantes: {str(e)}")
 
 @router.delete("/{codigo}/estudiantes/{carnet}")
 async def desinscribir_estudiante_curso(codigo: str, carnet: str):
     """
-    Desinscribe un estudiante de un curso (elimina relación INSCRITO)
+    Desinscribe un estudiante de un curso (elimina relación INSCRITO_EN)
     
     Args:
         codigo: Código del curso
@@ -483,7 +620,7 @@ async def desinscribir_estudiante_curso(codigo: str, carnet: str):
         try:
             # Verificar que existe la relación
             query_relacion = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO]->(c:Curso {codigo: $codigo})
+            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
             RETURN r
             """
             result_relacion = session.run(query_relacion, carnet=carnet, codigo=codigo)
@@ -492,7 +629,7 @@ async def desinscribir_estudiante_curso(codigo: str, carnet: str):
             
             # Eliminar la relación
             query_eliminar = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO]->(c:Curso {codigo: $codigo})
+            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
             DELETE r
             RETURN COUNT(r) as deleted_count
             """
@@ -548,7 +685,7 @@ async def actualizar_nota_estudiante(
         try:
             # Verificar que existe la relación
             query_relacion = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO]->(c:Curso {codigo: $codigo})
+            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
             RETURN r
             """
             result_relacion = session.run(query_relacion, carnet=carnet, codigo=codigo)
@@ -557,7 +694,7 @@ async def actualizar_nota_estudiante(
             
             # Actualizar la nota
             query_actualizar = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO]->(c:Curso {codigo: $codigo})
+            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
             SET r.nota_final = $nota_final, r.aprobado = $aprobado
             RETURN r
             """
@@ -585,4 +722,91 @@ async def actualizar_nota_estudiante(
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error al actualizar nota: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error al actualizar nota: {str(e)}")
+
+@router.put("/{codigo}/notas")
+async def actualizar_notas_masivo(
+    codigo: str,
+    datos_notas: NotasMasivas = Body(...)
+):
+    """
+    Actualiza las notas de varios estudiantes de un curso en una sola transacción.
+    Las notas aprobadas crean o actualizan la relación APROBÓ_CON con el profesor
+    de la inscripción; una nota reprobada elimina una APROBÓ_CON anterior
+    
+    Args:
+        codigo: Código del curso
+        datos_notas: Lista de carnet y nota_final
+        
+    Returns:
+        Resultado de la actualización de cada estudiante
+    """
+    if not datos_notas.notas:
+        raise HTTPException(status_code=400, detail="Se requiere al menos una nota")
+    
+    # Si un carnet se repite se usa su última nota
+    filas = {}
+    for nota in datos_notas.notas:
+        filas[nota.carnet] = {
+            "carnet": nota.carnet,
+            "nota_final": nota.nota_final,
+            "aprobado": nota.nota_final >= 61
+        }
+    
+    try:
+        driver = Neo4jDriver()
+        session = driver.get_session()
+        try:
+            query = """
+            UNWIND $filas AS f
+            OPTIONAL MATCH (e:Estudiante {carnet: f.carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo})
+            WITH f, e, c, collect(r) AS inscripciones
+            FOREACH (i IN inscripciones | SET i.nota_final = f.nota_final, i.aprobado = f.aprobado)
+            WITH f, e, c, inscripciones, [i IN inscripciones WHERE i.profesor IS NOT NULL | i.profesor][0] AS profesor
+            FOREACH (_ IN CASE WHEN size(inscripciones) > 0 AND f.aprobado THEN [1] ELSE [] END |
+                MERGE (e)-[a:APROBÓ_CON]->(c)
+                SET a.nota = f.nota_final, a.profesor = profesor, a.fecha_aprobacion = datetime()
+            )
+            WITH f, e, c, inscripciones, profesor
+            OPTIONAL MATCH (e)-[previa:APROBÓ_CON]->(c)
+            FOREACH (x IN CASE WHEN previa IS NOT NULL AND NOT f.aprobado THEN [previa] ELSE [] END | DELETE x)
+            RETURN DISTINCT f.carnet AS carnet, size(inscripciones) > 0 AS inscrito, profesor
+            """
+            
+            registros = list(session.run(query, codigo=codigo, filas=list(filas.values())))
+        finally:
+            session.close()
+        
+        por_carnet = {record["carnet"]: record for record in registros}
+        resultados = []
+        for carnet, fila in filas.items():
+            record = por_carnet.get(carnet)
+            if not record or not record["inscrito"]:
+                resultados.append({
+                    "carnet": carnet,
+                    "estado": "sin_inscripcion",
+                    "detalle": f"No existe inscripción entre estudiante {carnet} y curso {codigo}"
+                })
+                continue
+            resultados.append({
+                "carnet": carnet,
+                "estado": "actualizado",
+                "nota_final": fila["nota_final"],
+                "aprobado": fila["aprobado"],
+                "profesor": record["profesor"]
+            })
+        
+        actualizados = sum(1 for r in resultados if r["estado"] == "actualizado")
+        return create_response(
+            data={
+                "actualizados": actualizados,
+                "rechazados": len(resultados) - actualizados,
+                "resultados": resultados
+            },
+            message=f"Se actualizaron {actualizados} de {len(resultados)} notas del curso {codigo}"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al actualizar notas: {str(e)}")
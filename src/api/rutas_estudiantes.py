@@ -1,13 +1,35 @@
 from database.neo4jdriver import Neo4jDriver
-from fastapi import APIRouter, HTTPException, Body
+from neo4j.exceptions import ConstraintError
+from fastapi import APIRouter, HTTPException, Body, Query, Request, Depends
+from pydantic import ValidationError
 from typing import List, Optional
 
 from models.estudiante import Estudiante
 from services.algoritmo_estudiante import AlgoritmoEstudiante
-from utils.helpers import create_response, validate_learning_style, validate_class_style
+from services.algoritmo_de_recomendacion import AlgoritmoRecomendacion
+from utils.helpers import (
+    create_response, validate_learning_style, validate_class_style, construir_actualizacion, eliminar_en_cascada,
+    resolver_campos, decodificar_cursor, paginar, proyectar
+)
+from utils.importacion import leer_filas
+from utils.seguridad import (
+    crear_token, es_hash, hashear_password_async, hashear_passwords_async,
+    verificar_password_async, usuario_autenticado
+)
+from utils.serializacion import RespuestaJSON, responder, a_nativo
+from models.respuestas import RespuestaLista
+from config import IMPORT_CHUNK_SIZE
 
 router = APIRouter()
 
+def mensaje_duplicado(error):
+    """Traduce una violación de unicidad de Neo4j al mensaje de la API"""
+    if "`email`" in str(error.message):
+        return "El email ya está registrado"
+    if "`nombre`" in str(error.message):
+        return "El nombre ya está registrado"
+    return "El carnet ya está registrado"
+
 @router.post("/", status_code=201)
 async def crear_estudiante(estudiante: Estudiante):
     """
@@ -20,32 +42,14 @@ async def crear_estudiante(estudiante: Estudiante):
         Datos del estudiante creado
     """
     try:
-        # Calcular puntuación
+        # Calcular puntuación para guardarla en la misma escritura
         estudiante.calcular_puntuacion()
         
-        # Verificar si el estudiante ya existe por carnet
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar carnet
-            query_existe = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            RETURN e
-            """
-            result_carnet = session.run(query_existe, carnet=estudiante.carnet)
-            if result_carnet.single():
-                raise HTTPException(status_code=400, detail="El carnet ya está registrado")
-            
-            # Verificar email
-            query_email = """
-            MATCH (e:Estudiante {email: $email})
-            RETURN e
-            """
-            result_email = session.run(query_email, email=estudiante.email)
-            if result_email.single():
-                raise HTTPException(status_code=400, detail="El email ya está registrado")
-            
-            # Crear el estudiante
+            # Crear el estudiante; las restricciones de unicidad de carnet y email
+            # detectan duplicados sin consultas previas
             query_crear = """
             CREATE (e:Estudiante {
                 nombre: $nombre,
@@ -69,10 +73,14 @@ async def crear_estudiante(estudiante: Estudiante):
             RETURN e
             """
             
-            # Convertir el modelo a diccionario
+            # Convertir el modelo a diccionario y guardar solo el hash de la contraseña
             datos_estudiante = estudiante.dict()
+            datos_estudiante["password"] = await hashear_password_async(estudiante.password)
             
-            result = session.run(query_crear, **datos_estudiante)
+            try:
+                result = session.run(query_crear, **datos_estudiante)
+            except ConstraintError as e:
+                raise HTTPException(status_code=400, detail=mensaje_duplicado(e))
             nuevo_estudiante = result.single()
             
             if not nuevo_estudiante:
@@ -96,36 +104,173 @@ async def crear_estudiante(estudiante: Estudiante):
         print(f"Error detallado: {str(e)}")  # Para debugging
         raise HTTPException(status_code=500, detail=f"Error al crear estudiante: {str(e)}")
 
-@router.get("/")
-async def listar_estudiantes():
+async def escribir_lote_estudiantes(session, lote, vistos, resumen):
+    """
+    Valida un lote de filas, calcula sus puntuaciones y crea los estudiantes con UNWIND
+    
+    Args:
+        session: Sesión abierta de Neo4j
+        lote: Lista de (número de fila, datos)
+        vistos: Carnets, emails y nombres ya importados en este archivo
+        resumen: Conteo de creados y lista de errores por fila a actualizar
+    """
+    filas = []
+    for fila, datos in lote:
+        try:
+            estudiante = Estudiante(**datos)
+        except ValidationError as e:
+            errores = "; ".join(f"{'.'.join(str(x) for x in err['loc'])}: {err['msg']}" for err in e.errors())
+            resumen["errores"].append({"fila": fila, "carnet": datos.get("carnet"), "error": errores})
+            continue
+        
+        repetido = next((campo for campo in ("carnet", "email", "nombre")
+                         if (campo, getattr(estudiante, campo)) in vistos), None)
+        if repetido:
+            resumen["errores"].append({"fila": fila, "carnet": estudiante.carnet,
+                                       "error": f"El {repetido} está repetido en el archivo"})
+            continue
+        vistos.update((campo, getattr(estudiante, campo)) for campo in ("carnet", "email", "nombre"))
+        
+        estudiante.calcular_puntuacion()
+        filas.append({"fila": fila, "datos": estudiante.dict()})
+    
+    if not filas:
+        return
+    
+    hashes = await hashear_passwords_async([f["datos"]["password"] for f in filas])
+    for f, password in zip(filas, hashes):
+        f["datos"]["password"] = password
+    
+    # Las filas que ya existen se reportan y no se crean; las restricciones
+    # protegen contra inserciones concurrentes
+    query = """
+    UNWIND $filas AS f
+    OPTIONAL MATCH (c:Estudiante {carnet: f.datos.carnet})
+    OPTIONAL MATCH (m:Estudiante {email: f.datos.email})
+    OPTIONAL MATCH (n:Estudiante {nombre: f.datos.nombre})
+    WITH f, CASE
+        WHEN c IS NOT NULL THEN 'carnet'
+        WHEN m IS NOT NULL THEN 'email'
+        WHEN n IS NOT NULL THEN 'nombre'
+    END AS duplicado
+    FOREACH (_ IN CASE WHEN duplicado IS NULL THEN [1] ELSE [] END |
+        CREATE (e:Estudiante)
+        SET e = f.datos, e.fecha_registro = datetime()
+    )
+    RETURN f.fila AS fila, f.datos.carnet AS carnet, duplicado
+    """
+    try:
+        result = session.run(query, filas=filas)
+    except ConstraintError as e:
+        for f in filas:
+            resumen["errores"].append({"fila": f["fila"], "carnet": f["datos"]["carnet"],
+                                       "error": f"Lote rechazado: {mensaje_duplicado(e)}"})
+        return
+    
+    for record in result:
+        if record["duplicado"]:
+            resumen["errores"].append({"fila": record["fila"], "carnet": record["carnet"],
+                                       "error": f"El {record['duplicado']} ya está registrado"})
+        else:
+            resumen["creados"] += 1
+
+@router.post("/importar")
+async def importar_estudiantes(
+    request: Request,
+    formato: Optional[str] = Query(None, description="ndjson o csv; por defecto se toma del Content-Type")
+):
+    """
+    Importa estudiantes en masa desde un cuerpo NDJSON o CSV leído en streaming
+    
+    Args:
+        request: Solicitud cuyo cuerpo tiene un estudiante por línea (CSV con encabezado)
+        formato: ndjson o csv
+        
+    Returns:
+        Conteo de filas procesadas y creadas, y el error de cada fila rechazada
+    """
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    if formato not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="El formato debe ser ndjson o csv")
+    
+    try:
+        driver = Neo4jDriver()
+        session = driver.get_session()
+        try:
+            resumen = {"procesadas": 0, "creados": 0, "errores": []}
+            vistos = set()
+            lote = []
+            async for fila, datos, error in leer_filas(request.stream(), formato):
+                resumen["procesadas"] += 1
+                if error:
+                    resumen["errores"].append({"fila": fila, "carnet": None, "error": error})
+                    continue
+                lote.append((fila, datos))
+                if len(lote) >= IMPORT_CHUNK_SIZE:
+                    await escribir_lote_estudiantes(session, lote, vistos, resumen)
+                    lote = []
+            if lote:
+                await escribir_lote_estudiantes(session, lote, vistos, resumen)
+        finally:
+            session.close()
+        
+        resumen["errores"].sort(key=lambda e: e["fila"])
+        return create_response(
+            data=resumen,
+            message=f"Se importaron {resumen['creados']} de {resumen['procesadas']} estudiantes"
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al importar estudiantes: {str(e)}")
+
+@router.get("/", response_model=RespuestaLista, response_class=RespuestaJSON)
+async def listar_estudiantes(
+    limite: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en paginacion.siguiente_cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas")
+):
     """
-    Lista todos los estudiantes
+    Lista los estudiantes ordenados por nombre, paginados por cursor
     
+    Args:
+        limite: Tamaño de página
+        cursor: Cursor de la página siguiente
+        fields: Campos a devolver separados por comas
+        
     Returns:
-        Lista de todos los estudiantes
+        Página de estudiantes y cursor de la siguiente
     """
+    try:
+        campos = resolver_campos("Estudiante", fields)
+        despues = decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
+            # Paginación por clave sobre el índice de nombre; solo se leen los campos pedidos
             query = """
             MATCH (e:Estudiante)
-            RETURN e
+            WHERE e.nombre > $despues
+            RETURN e.nombre AS clave, [campo IN $campos | e[campo]] AS valores
             ORDER BY e.nombre
+            LIMIT $limite
             """
-            result = session.run(query)
-            estudiantes = []
-            
-            for record in result:
-                estudiante_data = dict(record["e"])
-                estudiante_data.pop("password", None)  # No incluir password
-                estudiantes.append(estudiante_data)
+            result = session.run(query, despues=despues, campos=campos, limite=limite + 1)
+            pagina, siguiente = paginar(result, limite)
+            estudiantes = [proyectar(campos, record["valores"]) for record in pagina]
             
-            return {
+            return responder({
                 "success": True,
                 "message": f"Se encontraron {len(estudiantes)} estudiantes",
-                "data": estudiantes
-            }
+                "data": estudiantes,
+                "paginacion": {"limite": limite, "siguiente_cursor": siguiente}
+            })
         finally:
             session.close()
     
@@ -246,40 +391,36 @@ async def actualizar_estudiante(
     Returns:
         Datos del estudiante actualizado
     """
+    # Validar estilos si se van a actualizar
+    if "estilo_aprendizaje" in datos_actualizados:
+        if not validate_learning_style(datos_actualizados["estilo_aprendizaje"]):
+            raise HTTPException(status_code=400, detail="Estilo de aprendizaje no válido")
+        
+    if "estilo_clase" in datos_actualizados:
+        if not validate_class_style(datos_actualizados["estilo_clase"]):
+            raise HTTPException(status_code=400, detail="Estilo de clase no válido")
+    
+    try:
+        # El carnet no se puede cambiar
+        query_update, props = construir_actualizacion("Estudiante", datos_actualizados)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if "password" in props:
+        props["password"] = await hashear_password_async(str(props["password"]))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el estudiante existe
-            query_existe = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            RETURN e
-            """
-            result = session.run(query_existe, carnet=carnet)
-            estudiante_existente = result.single()
-            
-            if not estudiante_existente:
-                raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
-            
-            # Validar estilos si se van a actualizar
-            if "estilo_aprendizaje" in datos_actualizados:
-                if not validate_learning_style(datos_actualizados["estilo_aprendizaje"]):
-                    raise HTTPException(status_code=400, detail="Estilo de aprendizaje no válido")
-                
-            if "estilo_clase" in datos_actualizados:
-                if not validate_class_style(datos_actualizados["estilo_clase"]):
-                    raise HTTPException(status_code=400, detail="Estilo de clase no válido")
-            
-            # Construir la consulta para actualizar sólo los campos proporcionados
-            update_fields = []
-            params = {"carnet": carnet}
-            
-            for key, value in datos_actualizados.items():
-                if key not in ["carnet"]:  # No permitir cambiar el carnet
-                    update_fields.append(f"e.{key} = ${key}")
-                    params[key] = value
-            
-            if not update_fields:
+            if not props:
+                query_existe = """
+                MATCH (e:Estudiante {carnet: $carnet})
+                RETURN e
+                """
+                estudiante_existente = session.run(query_existe, carnet=carnet).single()
+                if not estudiante_existente:
+                    raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
                 estudiante_data = dict(estudiante_existente["e"])
                 estudiante_data.pop("password", None)
                 return {
@@ -288,21 +429,14 @@ async def actualizar_estudiante(
                     "data": estudiante_data
                 }
             
-            # Ejecutar la actualización
-            query_update = f"""
-            MATCH (e:Estudiante {{carnet: $carnet}})
-            SET {', '.join(update_fields)}
-            RETURN e
-            """
-            
-            result_update = session.run(query_update, **params)
-            updated_record = result_update.single()
+            # Actualizar solo los campos proporcionados; sin resultado el estudiante no existe
+            updated_record = session.run(query_update, clave=carnet, props=props).single()
             
             if not updated_record:
-                raise HTTPException(status_code=500, detail="Error al actualizar el estudiante")
+                raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
             
             # Preparar respuesta
-            estudiante_data = dict(updated_record["e"])
+            estudiante_data = dict(updated_record["n"])
             estudiante_data.pop("password", None)
             
             return {
@@ -333,40 +467,15 @@ async def eliminar_estudiante(carnet: str):
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el estudiante existe
-            query_existe = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            RETURN e
-            """
-            result = session.run(query_existe, carnet=carnet)
-            if not result.single():
+            # Una sola sentencia: relaciones en lotes y luego el estudiante
+            resultado = eliminar_en_cascada(session, "Estudiante", carnet)
+            if resultado is None:
                 raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
             
-            # PRIMERO: Eliminar todas las relaciones del estudiante
-            query_eliminar_relaciones = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r]-()
-            DELETE r
-            RETURN COUNT(r) as relaciones_eliminadas
-            """
-            result_relaciones = session.run(query_eliminar_relaciones, carnet=carnet)
-            relaciones_eliminadas = result_relaciones.single()["relaciones_eliminadas"]
-            
-            # LUEGO: Eliminar el estudiante
-            query_delete = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            DELETE e
-            RETURN COUNT(e) as deleted_count
-            """
-            result_delete = session.run(query_delete, carnet=carnet)
-            deleted = result_delete.single()
-            
-            if deleted["deleted_count"] == 0:
-                raise HTTPException(status_code=500, detail="Error al eliminar el estudiante")
-            
             return {
                 "success": True,
-                "message": f"Estudiante con carnet {carnet} eliminado exitosamente (se eliminaron {relaciones_eliminadas} relaciones)",
-                "relaciones_eliminadas": relaciones_eliminadas
+                "message": f"Estudiante con carnet {carnet} eliminado exitosamente (se eliminaron {resultado['relaciones_eliminadas']} relaciones)",
+                **resultado
             }
         finally:
             session.close()
@@ -397,33 +506,45 @@ async def login_estudiante(credenciales: dict = Body(...)):
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Buscar por carnet o email
+            # Buscar por carnet o email; la contraseña se verifica fuera de la base de datos
             if "carnet" in credenciales:
                 query = """
-                MATCH (e:Estudiante {carnet: $identifier, password: $password})
+                MATCH (e:Estudiante {carnet: $identifier})
                 RETURN e
                 """
                 identifier = credenciales["carnet"]
             else:
                 query = """
-                MATCH (e:Estudiante {email: $identifier, password: $password})
+                MATCH (e:Estudiante {email: $identifier})
                 RETURN e
                 """
                 identifier = credenciales["email"]
             
-            result = session.run(query, identifier=identifier, password=credenciales["password"])
+            result = session.run(query, identifier=identifier)
             record = result.single()
             
-            if not record:
+            almacenado = record["e"].get("password") if record else None
+            if not record or not await verificar_password_async(str(credenciales["password"]), almacenado):
                 raise HTTPException(status_code=401, detail="Credenciales inválidas")
             
             estudiante_data = dict(record["e"])
             estudiante_data.pop("password", None)  # No incluir password en respuesta
             
+            # Migrar contraseñas guardadas en texto plano
+            if not es_hash(almacenado):
+                query_hash = """
+                MATCH (e:Estudiante {carnet: $carnet})
+                SET e.password = $password
+                """
+                session.run(query_hash, carnet=estudiante_data["carnet"],
+                            password=await hashear_password_async(str(credenciales["password"])))
+            
             return {
                 "success": True,
                 "message": "Login exitoso",
-                "data": estudiante_data
+                "data": estudiante_data,
+                "token": crear_token(estudiante_data["carnet"], estudiante_data.get("role", "estudiante")),
+                "tipo_token": "bearer"
             }
         finally:
             session.close()
@@ -433,6 +554,64 @@ async def login_estudiante(credenciales: dict = Body(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error en login: {str(e)}")
 
+@router.get("/sesion/actual")
+async def obtener_sesion_actual(principal: dict = Depends(usuario_autenticado)):
+    """
+    Devuelve los datos del token de la sesión sin consultar la base de datos
+    
+    Args:
+        principal: Usuario autenticado con el header Authorization: Bearer <token>
+        
+    Returns:
+        Carnet, rol y expiración del token
+    """
+    return create_response(
+        data={"carnet": principal["sub"], "role": principal["role"], "expira": principal["exp"]},
+        message="Sesión válida"
+    )
+
+# Inscripción validada en una sola consulta; devuelve "inscrito" o el motivo del rechazo.
+# MERGE bloquea estudiante y curso al crear la relación, así que dos solicitudes
+# simultáneas no pueden crear dos INSCRITO_EN; la marca nueva distingue si esta la creó
+QUERY_INSCRIBIR = """
+OPTIONAL MATCH (e:Estudiante {carnet: $carnet})
+OPTIONAL MATCH (c:Curso {codigo: $codigo_curso})
+OPTIONAL MATCH (p:Profesor {nombre: $nombre_profesor})
+WITH e, c, CASE
+    WHEN e IS NULL THEN 'sin_estudiante'
+    WHEN c IS NULL THEN 'sin_curso'
+    WHEN p IS NULL THEN 'sin_profesor'
+    WHEN NOT EXISTS { (p)-[:IMPARTE]->(c) } THEN 'no_imparte'
+    ELSE 'valida'
+END AS validacion
+FOREACH (_ IN CASE WHEN validacion = 'valida' THEN [1] ELSE [] END |
+    MERGE (e)-[r:INSCRITO_EN]->(c)
+    ON CREATE SET r.fecha_inscripcion = datetime(),
+                  r.profesor = $nombre_profesor,
+                  r.estado = 'activo',
+                  r.nueva = true
+)
+WITH e, c, validacion
+OPTIONAL MATCH (e)-[r:INSCRITO_EN]->(c)
+WITH validacion, r, coalesce(r.nueva, false) AS creada
+ORDER BY creada DESC
+LIMIT 1
+REMOVE r.nueva
+RETURN CASE
+    WHEN validacion <> 'valida' THEN validacion
+    WHEN creada THEN 'inscrito'
+    ELSE 'ya_inscrito'
+END AS estado, r.profesor AS profesor_actual, r.fecha_inscripcion AS fecha_inscripcion
+"""
+
+ERRORES_INSCRIPCION = {
+    "sin_estudiante": (404, "No se encontró al estudiante con carnet {carnet}"),
+    "sin_curso": (404, "No se encontró el curso con código {codigo_curso}"),
+    "sin_profesor": (404, "No se encontró al profesor {nombre_profesor}"),
+    "no_imparte": (400, "El profesor {nombre_profesor} no imparte el curso {codigo_curso}"),
+    "ya_inscrito": (400, "El estudiante ya está inscrito en el curso {codigo_curso} con el profesor {profesor_actual}. No se puede cambiar de profesor una vez inscrito.")
+}
+
 # Asignar estudiante a un curso con un profesor específico
 @router.post("/{carnet}/asignar-curso")
 async def asignar_estudiante_a_curso(
@@ -464,82 +643,12 @@ async def asignar_estudiante_a_curso(
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el estudiante existe
-            query_estudiante = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            RETURN e
-            """
-            result_estudiante = session.run(query_estudiante, carnet=carnet)
-            estudiante = result_estudiante.single()
-            
-            if not estudiante:
-                raise HTTPException(status_code=404, detail=f"No se encontró al estudiante con carnet {carnet}")
-            
-            # Verificar que el curso existe
-            query_curso = """
-            MATCH (c:Curso {codigo: $codigo_curso})
-            RETURN c
-            """
-            result_curso = session.run(query_curso, codigo_curso=codigo_curso)
-            curso = result_curso.single()
-            
-            if not curso:
-                raise HTTPException(status_code=404, detail=f"No se encontró el curso con código {codigo_curso}")
-            
-            # Verificar que el profesor existe
-            query_profesor = """
-            MATCH (p:Profesor {nombre: $nombre_profesor})
-            RETURN p
-            """
-            result_profesor = session.run(query_profesor, nombre_profesor=nombre_profesor)
-            profesor = result_profesor.single()
-            
-            if not profesor:
-                raise HTTPException(status_code=404, detail=f"No se encontró al profesor {nombre_profesor}")
-            
-            # Verificar que el profesor imparte el curso
-            query_imparte = """
-            MATCH (p:Profesor {nombre: $nombre_profesor})-[:IMPARTE]->(c:Curso {codigo: $codigo_curso})
-            RETURN p, c
-            """
-            result_imparte = session.run(query_imparte, nombre_profesor=nombre_profesor, codigo_curso=codigo_curso)
-            imparte = result_imparte.single()
-            
-            if not imparte:
-                raise HTTPException(status_code=400, detail=f"El profesor {nombre_profesor} no imparte el curso {codigo_curso}")
-            
-            # NUEVA VALIDACIÓN: Verificar si el estudiante ya está inscrito en el curso (con cualquier profesor)
-            query_ya_inscrito = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo_curso})
-            RETURN r.profesor as profesor_actual, r.fecha_inscripcion as fecha_inscripcion
-            """
-            result_ya_inscrito = session.run(query_ya_inscrito, carnet=carnet, codigo_curso=codigo_curso)
-            inscripcion_existente = result_ya_inscrito.single()
-            
-            if inscripcion_existente:
-                profesor_actual = inscripcion_existente["profesor_actual"]
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"El estudiante ya está inscrito en el curso {codigo_curso} con el profesor {profesor_actual}. No se puede cambiar de profesor una vez inscrito."
-                )
-            
-            # Si llegamos aquí, el estudiante NO está inscrito en el curso, proceder con la inscripción
-            query_inscribir = """
-            MATCH (e:Estudiante {carnet: $carnet})
-            MATCH (c:Curso {codigo: $codigo_curso})
-            MATCH (p:Profesor {nombre: $nombre_profesor})
-            CREATE (e)-[:INSCRITO_EN {
-                fecha_inscripcion: datetime(),
-                profesor: $nombre_profesor,
-                estado: 'activo'
-            }]->(c)
-            RETURN e, c, p
-            """
-            
+            # Validar estudiante, curso, profesor, que el profesor imparta el curso y que
+            # el estudiante no esté inscrito (con cualquier profesor), e inscribir en una sola escritura
             result_inscribir = session.run(
-                query_inscribir, 
-                carnet=carnet, 
-                codigo_curso=codigo_curso, 
+                QUERY_INSCRIBIR,
+                carnet=carnet,
+                codigo_curso=codigo_curso,
                 nombre_profesor=nombre_profesor
             )
             inscripcion = result_inscribir.single()
@@ -547,6 +656,18 @@ async def asignar_estudiante_a_curso(
             if not inscripcion:
                 raise HTTPException(status_code=500, detail="Error al inscribir al estudiante en el curso")
             
+            if inscripcion["estado"] != "inscrito":
+                status_code, detalle = ERRORES_INSCRIPCION[inscripcion["estado"]]
+                raise HTTPException(
+                    status_code=status_code,
+                    detail=detalle.format(
+                        carnet=carnet,
+                        codigo_curso=codigo_curso,
+                        nombre_profesor=nombre_profesor,
+                        profesor_actual=inscripcion["profesor_actual"]
+                    )
+                )
+            
             return {
                 "success": True,
                 "message": f"Estudiante {carnet} inscrito exitosamente en el curso {codigo_curso} con el profesor {nombre_profesor}",
@@ -554,7 +675,7 @@ async def asignar_estudiante_a_curso(
                     "carnet_estudiante": carnet,
                     "codigo_curso": codigo_curso,
                     "nombre_profesor": nombre_profesor,
-                    "fecha_inscripcion": "datetime()",
+                    "fecha_inscripcion": a_nativo(inscripcion["fecha_inscripcion"]),
                     "estado": "activo"
                 }
             }
@@ -626,8 +747,12 @@ async def verificar_inscripcion_curso(carnet: str, codigo_curso: str):
 
 
 # Obtener profesores disponibles para un curso (que no sean el actual del estudiante)
-@router.get("/{carnet}/curso/{codigo_curso}/profesores-disponibles")
-async def obtener_profesores_disponibles_para_curso(carnet: str, codigo_curso: str):
+@router.get("/{carnet}/curso/{codigo_curso}/profesores-disponibles", response_class=RespuestaJSON)
+async def obtener_profesores_disponibles_para_curso(
+    carnet: str,
+    codigo_curso: str,
+    incluir_porcentaje: bool = Query(False, description="Incluye el porcentaje de recomendación de cada profesor")
+):
     """
     Obtiene la lista de profesores que imparten un curso específico.
     Si el estudiante ya está inscrito, muestra todos los profesores pero indica cuál es el actual.
@@ -635,59 +760,68 @@ async def obtener_profesores_disponibles_para_curso(carnet: str, codigo_curso: s
     Args:
         carnet: Carnet del estudiante
         codigo_curso: Código del curso
+        incluir_porcentaje: Si es True, calcula la recomendación solo para los profesores del curso
         
     Returns:
         Lista de profesores que imparten el curso con información de disponibilidad
+        y, opcionalmente, ordenada por porcentaje de recomendación
     """
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar si el estudiante ya está inscrito en el curso
-            query_inscripcion_actual = """
-            MATCH (e:Estudiante {carnet: $carnet})-[r:INSCRITO_EN]->(c:Curso {codigo: $codigo_curso})
-            RETURN r.profesor as profesor_actual
-            """
-            result_inscripcion = session.run(query_inscripcion_actual, carnet=carnet, codigo_curso=codigo_curso)
-            inscripcion_record = result_inscripcion.single()
-            profesor_actual = inscripcion_record["profesor_actual"] if inscripcion_record else None
-            
-            # Obtener todos los profesores que imparten el curso
-            query_profesores = """
-            MATCH (p:Profesor)-[:IMPARTE]->(c:Curso {codigo: $codigo_curso})
-            RETURN p.nombre as nombre,
-                   p.departamento as departamento,
-                   p.email as email,
-                   p.especializacion as especializacion
+            # Inscripción actual, estudiante y profesores del curso en una sola consulta
+            query = """
+            OPTIONAL MATCH (e:Estudiante {carnet: $carnet})
+            OPTIONAL MATCH (e)-[r:INSCRITO_EN]->(:Curso {codigo: $codigo_curso})
+            WITH e, head(collect(r.profesor)) AS profesor_actual
+            OPTIONAL MATCH (p:Profesor)-[:IMPARTE]->(:Curso {codigo: $codigo_curso})
+            WITH e, profesor_actual, p
             ORDER BY p.nombre
+            RETURN e, profesor_actual, [x IN collect(p) WHERE x IS NOT NULL] AS profesores
             """
-            result_profesores = session.run(query_profesores, codigo_curso=codigo_curso)
-            profesores = []
-            
-            for record in result_profesores:
-                profesor_info = {
-                    "nombre": record["nombre"],
-                    "departamento": record["departamento"],
-                    "email": record["email"],
-                    "especializacion": record["especializacion"],
-                    "es_profesor_actual": record["nombre"] == profesor_actual,
-                    "disponible_para_inscripcion": profesor_actual is None  # Solo disponible si no está inscrito
-                }
-                profesores.append(profesor_info)
-            
-            return {
-                "success": True,
-                "message": f"Se encontraron {len(profesores)} profesores para el curso {codigo_curso}",
-                "data": {
-                    "codigo_curso": codigo_curso,
-                    "carnet_estudiante": carnet,
-                    "ya_inscrito": profesor_actual is not None,
-                    "profesor_actual": profesor_actual,
-                    "profesores": profesores
-                }
-            }
+            record = session.run(query, carnet=carnet, codigo_curso=codigo_curso).single()
+            estudiante = record["e"] if record else None
+            profesor_actual = record["profesor_actual"] if record else None
+            candidatos = record["profesores"] if record else []
         finally:
             session.close()
+        
+        # Una sola pasada del algoritmo sobre los profesores del curso
+        porcentajes = {}
+        if incluir_porcentaje and estudiante is not None and candidatos:
+            algoritmo = AlgoritmoRecomendacion()
+            for recomendacion in algoritmo.puntuar_profesores(estudiante, candidatos):
+                porcentajes[recomendacion["profesor"]] = recomendacion["porcentaje_recomendacion"]
+        
+        profesores = []
+        for profesor in candidatos:
+            profesor_info = {
+                "nombre": profesor.get("nombre"),
+                "departamento": profesor.get("departamento"),
+                "email": profesor.get("email"),
+                "especializacion": profesor.get("especializacion"),
+                "es_profesor_actual": profesor.get("nombre") == profesor_actual,
+                "disponible_para_inscripcion": profesor_actual is None  # Solo disponible si no está inscrito
+            }
+            if incluir_porcentaje:
+                profesor_info["porcentaje_recomendacion"] = porcentajes.get(profesor.get("nombre"))
+            profesores.append(profesor_info)
+        
+        if porcentajes:
+            profesores.sort(key=lambda p: p["porcentaje_recomendacion"] or 0, reverse=True)
+        
+        return responder({
+            "success": True,
+            "message": f"Se encontraron {len(profesores)} profesores para el curso {codigo_curso}",
+            "data": {
+                "codigo_curso": codigo_curso,
+                "carnet_estudiante": carnet,
+                "ya_inscrito": profesor_actual is not None,
+                "profesor_actual": profesor_actual,
+                "profesores": profesores
+            }
+        })
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener profesores disponibles: {str(e)}")
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Body
+from fastapi import APIRouter, HTTPException, Body, Query, Request
 from typing import List, Optional
 
 from models.profesor import Profesor
+from models.respuestas import RespuestaLista
 from database.neo4jdriver import Neo4jDriver
-from utils.helpers import create_response
+from utils.serializacion import RespuestaJSON, responder
+from utils.cache_http import version_catalogo, calcular_etag, encabezados_cache, no_modificado
+from utils.helpers import (
+    create_response, construir_actualizacion, eliminar_en_cascada, resolver_campos, decodificar_cursor, paginar, proyectar
+)
 
 router = APIRouter()
 
@@ -63,6 +68,7 @@ async def crear_profesor(profesor: Profesor):
             # Preparar respuesta
             datos_respuesta = dict(nuevo_profesor["p"])
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": "Profesor registrado exitosamente",
@@ -77,29 +83,48 @@ async def crear_profesor(profesor: Profesor):
         print(f"Error detallado: {str(e)}")  # Para debugging
         raise HTTPException(status_code=500, detail=f"Error al crear profesor: {str(e)}")
 
-@router.get("/")
+@router.get("/", response_model=RespuestaLista, response_class=RespuestaJSON)
 async def listar_profesores(
+    request: Request,
     estilo_enseñanza: Optional[str] = None,
-    estilo_clase: Optional[str] = None
+    estilo_clase: Optional[str] = None,
+    limite: int = Query(100, ge=1, le=1000, description="Tamaño de página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en paginacion.siguiente_cursor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver separados por comas")
 ):
     """
-    Lista todos los profesores, opcionalmente filtrados por estilo
+    Lista los profesores ordenados por nombre, opcionalmente filtrados por estilo y paginados por cursor
     
     Args:
         estilo_enseñanza: Filtrar por estilo de enseñanza
         estilo_clase: Filtrar por estilo de clase
+        limite: Tamaño de página
+        cursor: Cursor de la página siguiente
+        fields: Campos a devolver separados por comas
         
     Returns:
-        Lista de profesores
+        Página de profesores y cursor de la siguiente
     """
+    # El catálogo no cambió desde la copia del cliente: 304 sin consultar Neo4j
+    etag = calcular_etag(request)
+    respuesta_304 = no_modificado(request, etag)
+    if respuesta_304:
+        return respuesta_304
+    
+    try:
+        campos = resolver_campos("Profesor", fields)
+        despues = decodificar_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
             # Construir la consulta con filtros opcionales
             query = "MATCH (p:Profesor)"
-            where_clauses = []
-            params = {}
+            where_clauses = ["p.nombre > $despues"]
+            params = {"despues": despues, "campos": campos, "limite": limite + 1}
             
             if estilo_enseñanza:
                 where_clauses.append("p.estilo_enseñanza = $estilo_enseñanza")
@@ -109,24 +134,19 @@ async def listar_profesores(
                 where_clauses.append("p.estilo_clase = $estilo_clase")
                 params["estilo_clase"] = estilo_clase.lower()
             
-            # Añadir cláusula WHERE si hay filtros
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
-                
-            query += " RETURN p ORDER BY p.nombre"
+            query += " WHERE " + " AND ".join(where_clauses)
+            query += " RETURN p.nombre AS clave, [campo IN $campos | p[campo]] AS valores ORDER BY p.nombre LIMIT $limite"
             
             result = session.run(query, **params)
-            profesores = []
-            
-            for record in result:
-                profesor_data = dict(record["p"])
-                profesores.append(profesor_data)
+            pagina, siguiente = paginar(result, limite)
+            profesores = [proyectar(campos, record["valores"]) for record in pagina]
             
-            return {
+            return responder({
                 "success": True,
                 "message": f"Se encontraron {len(profesores)} profesores",
-                "data": profesores
-            }
+                "data": profesores,
+                "paginacion": {"limite": limite, "siguiente_cursor": siguiente}
+            }, headers=encabezados_cache(etag))
         finally:
             session.close()
     
@@ -188,55 +208,40 @@ async def actualizar_profesor(
     Returns:
         Datos del profesor actualizado
     """
+    try:
+        # El nombre no se puede cambiar
+        query_update, props = construir_actualizacion("Profesor", datos_actualizados)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el profesor existe
-            query_existe = """
-            MATCH (p:Profesor {nombre: $nombre})
-            RETURN p
-            """
-            result = session.run(query_existe, nombre=nombre)
-            profesor_existente = result.single()
-            
-            if not profesor_existente:
-                raise HTTPException(status_code=404, detail=f"No se encontró al profesor con nombre {nombre}")
-            
-            # Construir la consulta para actualizar sólo los campos proporcionados
-            update_fields = []
-            params = {"nombre": nombre}
-            
-            for key, value in datos_actualizados.items():
-                if key not in ["nombre"]:  # No permitir cambiar el nombre
-                    update_fields.append(f"p.{key} = ${key}")
-                    params[key] = value
-            
-            if not update_fields:
-                profesor_data = dict(profesor_existente["p"])
+            if not props:
+                query_existe = """
+                MATCH (p:Profesor {nombre: $nombre})
+                RETURN p
+                """
+                profesor_existente = session.run(query_existe, nombre=nombre).single()
+                if not profesor_existente:
+                    raise HTTPException(status_code=404, detail=f"No se encontró al profesor con nombre {nombre}")
                 return {
                     "success": True,
                     "message": "No se proporcionaron campos para actualizar",
-                    "data": profesor_data
+                    "data": dict(profesor_existente["p"])
                 }
             
-            # Ejecutar la actualización
-            query_update = f"""
-            MATCH (p:Profesor {{nombre: $nombre}})
-            SET {', '.join(update_fields)}
-            RETURN p
-            """
-            
-            result_update = session.run(query_update, **params)
-            updated_record = result_update.single()
+            # Actualizar solo los campos proporcionados; sin resultado el profesor no existe
+            updated_record = session.run(query_update, clave=nombre, props=props).single()
             
             if not updated_record:
-                raise HTTPException(status_code=500, detail="Error al actualizar el profesor")
+                raise HTTPException(status_code=404, detail=f"No se encontró al profesor con nombre {nombre}")
             
             # Recalcular puntuación si se actualizaron campos relevantes
             relevant_fields = {"años_experiencia", "evaluacion_docente", "porcentaje_aprobados", "disponibilidad"}
             if any(field in datos_actualizados for field in relevant_fields):
-                updated_data = dict(updated_record["p"])
+                updated_data = dict(updated_record["n"])
                 
                 # Crear un objeto Profesor para recalcular puntuación
                 profesor_temp = Profesor(
@@ -265,8 +270,9 @@ async def actualizar_profesor(
                 final_record = result_puntuacion.single()
                 profesor_data = dict(final_record["p"])
             else:
-                profesor_data = dict(updated_record["p"])
+                profesor_data = dict(updated_record["n"])
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": f"Profesor {nombre} actualizado exitosamente",
@@ -283,7 +289,7 @@ async def actualizar_profesor(
 @router.delete("/{nombre}")
 async def eliminar_profesor(nombre: str):
     """
-    Elimina un profesor por su nombre (solo si no tiene relaciones)
+    Elimina un profesor por su nombre junto con todas sus relaciones
     
     Args:
         nombre: Nombre del profesor a eliminar
@@ -295,30 +301,16 @@ async def eliminar_profesor(nombre: str):
         driver = Neo4jDriver()
         session = driver.get_session()
         try:
-            # Verificar que el profesor existe
-            query_existe = """
-            MATCH (p:Profesor {nombre: $nombre})
-            RETURN p
-            """
-            result = session.run(query_existe, nombre=nombre)
-            if not result.single():
+            # Una sola sentencia: relaciones en lotes y luego el profesor
+            resultado = eliminar_en_cascada(session, "Profesor", nombre)
+            if resultado is None:
                 raise HTTPException(status_code=404, detail=f"No se encontró al profesor con nombre {nombre}")
             
-            # Eliminar el profesor y sus relaciones automaticamente
-            query_delete = """
-            MATCH (p:Profesor {nombre: $nombre})
-            DETACH DELETE p
-            RETURN COUNT(p) as deleted_count
-            """
-            result_delete = session.run(query_delete, nombre=nombre)
-            deleted = result_delete.single()
-            
-            if deleted["deleted_count"] == 0:
-                raise HTTPException(status_code=500, detail="Error al eliminar el profesor")
-            
+            version_catalogo.incrementar()
             return {
                 "success": True,
-                "message": f"Profesor {nombre} eliminado exitosamente junto con todas sus relaciones"
+                "message": f"Profesor {nombre} eliminado exitosamente junto con {resultado['relaciones_eliminadas']} relaciones",
+                **resultado
             }
         finally:
             session.close()
@@ -388,6 +380,7 @@ async def asignar_curso_a_profesor(nombre_profesor: str, codigo_curso: str):
             if not result.single():
                 raise HTTPException(status_code=500, detail="Error al crear la relación")
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": f"Se asignó el curso {codigo_curso} al profesor {nombre_profesor}"
@@ -442,6 +435,7 @@ async def desasignar_curso_de_profesor(nombre_profesor: str, codigo_curso: str):
             if deleted["deleted_count"] == 0:
                 raise HTTPException(status_code=500, detail="Error al eliminar la relación")
             
+            version_catalogo.incrementar()
             return {
                 "success": True,
                 "message": f"Se desasignó el curso {codigo_curso} del profesor {nombre_profesor}"
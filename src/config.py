@@ -11,4 +11,52 @@ NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "123456789")
 
 # Configuración de API
 API_PREFIX = "/api/v1"
-DEBUG = os.getenv("DEBUG", "False").lower() == "true"
\ No newline at end of file
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
+
+# Instrumentación de consultas
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+# Presupuesto de consultas por solicitud HTTP (detector de N+1)
+DB_QUERY_BUDGET = int(os.getenv("DB_QUERY_BUDGET", "10"))
+DB_TIME_BUDGET_MS = float(os.getenv("DB_TIME_BUDGET_MS", "500"))
+
+# Perfilado bajo demanda (requiere el header X-Admin-Token)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", "perfiles")
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+
+# Importación masiva de estudiantes
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "500"))
+
+# Autenticación (tokens firmados con HMAC y contraseñas con PBKDF2)
+AUTH_SECRET = os.getenv("AUTH_SECRET", "")
+AUTH_TOKEN_TTL_S = int(os.getenv("AUTH_TOKEN_TTL_S", "3600"))
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "120000"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL_S = int(os.getenv("AUTH_CACHE_TTL_S", "60"))
+
+# Eliminaciones en cascada: relaciones borradas por transacción
+DELETE_BATCH_SIZE = int(os.getenv("DELETE_BATCH_SIZE", "1000"))
+
+# Retención de relaciones RECOMENDADO (compactación periódica en segundo plano)
+RECOMMENDATION_MAX_AGE_DAYS = int(os.getenv("RECOMMENDATION_MAX_AGE_DAYS", "90"))
+RECOMMENDATION_TOP_N = int(os.getenv("RECOMMENDATION_TOP_N", "20"))
+RECOMMENDATION_COMPACTION_INTERVAL_S = int(os.getenv("RECOMMENDATION_COMPACTION_INTERVAL_S", "3600"))
+RECOMMENDATION_COMPACTION_BATCH = int(os.getenv("RECOMMENDATION_COMPACTION_BATCH", "5000"))
+
+# Escritura de recomendaciones: solo se reescriben índices que cambian al menos el umbral
+# (en puntos de 0 a 100) o que no se han tocado en RECOMMENDATION_REFRESH_S segundos
+RECOMMENDATION_WRITE_THRESHOLD = float(os.getenv("RECOMMENDATION_WRITE_THRESHOLD", "0.5"))
+RECOMMENDATION_REFRESH_S = int(os.getenv("RECOMMENDATION_REFRESH_S", "86400"))
+RECOMMENDATION_FINGERPRINT_CACHE_SIZE = int(os.getenv("RECOMMENDATION_FINGERPRINT_CACHE_SIZE", "4096"))
+
+# Cache HTTP del catálogo (cursos y profesores): max-age de Cache-Control en segundos
+CATALOG_MAX_AGE_S = int(os.getenv("CATALOG_MAX_AGE_S", "0"))
+
+# Compresión gzip de respuestas (solo cuerpos de al menos GZIP_MINIMUM_SIZE bytes)
+GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1000"))
+GZIP_COMPRESS_LEVEL = int(os.getenv("GZIP_COMPRESS_LEVEL", "6"))
+
+# Sondas de salud: segundos durante los que se reutiliza el último estado de Neo4j
+HEALTH_CACHE_TTL_S = float(os.getenv("HEALTH_CACHE_TTL_S", "5"))
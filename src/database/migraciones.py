@@ -0,0 +1,89 @@
+"""
+Migraciones versionadas del esquema de Neo4j (restricciones e índices)
+
+Cada migración es idempotente (IF NOT EXISTS) y la versión aplicada se guarda en
+el nodo (:MigracionEsquema {id: 'esquema'}). Para agregar un índice nuevo se
+agrega una migración al final de MIGRACIONES; nunca se modifican las existentes.
+"""
+from datetime import datetime
+
+# (versión, descripción, [(nombre, sentencia)])
+MIGRACIONES = [
+    (1, "Restricciones de unicidad iniciales", [
+        ("estudiante_nombre", "CREATE CONSTRAINT estudiante_nombre IF NOT EXISTS FOR (e:Estudiante) REQUIRE e.nombre IS UNIQUE"),
+        ("profesor_nombre", "CREATE CONSTRAINT profesor_nombre IF NOT EXISTS FOR (p:Profesor) REQUIRE p.nombre IS UNIQUE"),
+        ("curso_codigo", "CREATE CONSTRAINT curso_codigo IF NOT EXISTS FOR (c:Curso) REQUIRE c.codigo IS UNIQUE"),
+    ]),
+    (2, "Unicidad de carnet y email de estudiantes", [
+        ("estudiante_carnet_unico", "CREATE CONSTRAINT estudiante_carnet_unico IF NOT EXISTS FOR (e:Estudiante) REQUIRE e.carnet IS UNIQUE"),
+        ("estudiante_email_unico", "CREATE CONSTRAINT estudiante_email_unico IF NOT EXISTS FOR (e:Estudiante) REQUIRE e.email IS UNIQUE"),
+    ]),
+    (3, "Índices de filtros de profesores y cursos", [
+        ("profesor_estilo_ensenanza", "CREATE INDEX profesor_estilo_ensenanza IF NOT EXISTS FOR (p:Profesor) ON (p.estilo_enseñanza)"),
+        ("profesor_estilo_clase", "CREATE INDEX profesor_estilo_clase IF NOT EXISTS FOR (p:Profesor) ON (p.estilo_clase)"),
+        ("curso_departamento", "CREATE INDEX curso_departamento IF NOT EXISTS FOR (c:Curso) ON (c.departamento)"),
+    ]),
+    (4, "Índices de propiedades de relaciones", [
+        ("recomendado_fecha", "CREATE INDEX recomendado_fecha IF NOT EXISTS FOR ()-[r:RECOMENDADO]-() ON (r.fecha_recomendacion)"),
+        ("inscrito_en_estado", "CREATE INDEX inscrito_en_estado IF NOT EXISTS FOR ()-[r:INSCRITO_EN]-() ON (r.estado)"),
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+def version_aplicada(driver):
+    """Devuelve la versión del esquema registrada en la base de datos (0 si no hay)"""
+    result = driver.execute_read(
+        "MATCH (m:MigracionEsquema {id: 'esquema'}) RETURN m.version AS version"
+    )
+    return result[0]["version"] if result else 0
+
+def aplicar_migraciones(driver):
+    """
+    Aplica en orden las migraciones pendientes
+
+    Una migración con errores (p. ej. datos duplicados que impiden una restricción)
+    detiene el proceso sin registrar su versión, para reintentarla en el siguiente arranque.
+
+    Args:
+        driver: Instancia de Neo4jDriver
+
+    Returns:
+        int: Versión del esquema después de aplicar las migraciones
+    """
+    actual = version_aplicada(driver)
+    for version, descripcion, sentencias in MIGRACIONES:
+        if version <= actual:
+            continue
+        try:
+            for _, sentencia in sentencias:
+                driver.execute_write(sentencia)
+        except Exception as e:
+            print(f"🔥 Error en la migración {version} ({descripcion}): {str(e)}")
+            break
+        driver.execute_write(
+            """
+            MERGE (m:MigracionEsquema {id: 'esquema'})
+            SET m.version = $version, m.descripcion = $descripcion, m.fecha_aplicacion = $fecha
+            """,
+            version=version, descripcion=descripcion, fecha=datetime.now().isoformat()
+        )
+        actual = version
+        print(f"🗂️ Migración {version} aplicada: {descripcion}")
+    return actual
+
+def verificar_esquema(driver):
+    """
+    Compara las restricciones e índices existentes con los esperados
+
+    Returns:
+        dict: version, version_esperada y lista de índices/restricciones faltantes
+    """
+    existentes = {registro["name"] for registro in driver.execute_read("SHOW INDEXES YIELD name RETURN name")}
+    existentes |= {registro["name"] for registro in driver.execute_read("SHOW CONSTRAINTS YIELD name RETURN name")}
+    esperados = [nombre for _, _, sentencias in MIGRACIONES for nombre, _ in sentencias]
+    return {
+        "version": version_aplicada(driver),
+        "version_esperada": VERSION_ESQUEMA,
+        "faltantes": [nombre for nombre in esperados if nombre not in existentes]
+    }
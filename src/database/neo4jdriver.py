@@ -1,50 +1,363 @@
+import hashlib
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
 from neo4j import GraphDatabase
-from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from src.utils.serializacion import convertir_registro
+from src.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE, HEALTH_CACHE_TTL_S
 
-class Neo4jDriver:
-    """Clase mejorada para manejar la conexión con Neo4j"""
-    def __init__(self):
+# Conteo de consultas de la solicitud HTTP en curso (None fuera de una solicitud)
+_conteo_solicitud = ContextVar("conteo_consultas_solicitud", default=None)
+
+def iniciar_conteo_consultas():
+    """
+    Empieza a contar las consultas ejecutadas en el contexto actual
+
+    Returns:
+        tuple: (conteo, token) donde conteo es un dict con consultas y tiempo_ms
+    """
+    conteo = {"consultas": 0, "tiempo_ms": 0.0}
+    return conteo, _conteo_solicitud.set(conteo)
+
+def finalizar_conteo_consultas(token):
+    """Deja de contar consultas en el contexto actual"""
+    _conteo_solicitud.reset(token)
+
+class EstadisticasConsultas:
+    """Acumula métricas de ejecución agrupadas por huella de consulta"""
+    # Límites superiores (en segundos) de los buckets del histograma de latencia
+    BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self, umbral_lenta_ms=SLOW_QUERY_MS, max_lentas=SLOW_QUERY_LOG_SIZE):
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self._lock = threading.Lock()
+        self._consultas = {}
+        self._lentas = deque(maxlen=max_lentas)
+
+    @staticmethod
+    def normalizar(query):
+        """Colapsa espacios y reemplaza literales para agrupar consultas equivalentes"""
+        texto = re.sub(r"//[^\n]*", " ", query)
+        texto = re.sub(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", "?", texto)
+        texto = re.sub(r"(?<![\w$])\d+(?:\.\d+)?", "?", texto)
+        return " ".join(texto.split())
+
+    @classmethod
+    def huella(cls, query):
+        """Devuelve un identificador corto y estable para una consulta"""
+        return hashlib.sha1(cls.normalizar(query).encode("utf-8")).hexdigest()[:12]
+
+    def registrar(self, query, duracion, filas=0, error=False, tipo="lectura"):
+        """
+        Registra una ejecución de consulta
+
+        Args:
+            query: Texto Cypher ejecutado
+            duracion: Duración en segundos
+            filas: Número de registros devueltos
+            error: Si la consulta terminó con excepción
+            tipo: lectura, escritura, sesion o conexion
+        """
+        normalizada = self.normalizar(query)
+        huella = hashlib.sha1(normalizada.encode("utf-8")).hexdigest()[:12]
+        duracion_ms = duracion * 1000
+
+        conteo = _conteo_solicitud.get()
+        if conteo is not None:
+            conteo["consultas"] += 1
+            conteo["tiempo_ms"] += duracion_ms
+
+        with self._lock:
+            stats = self._consultas.get(huella)
+            if stats is None:
+                stats = {
+                    "huella": huella,
+                    "consulta": normalizada,
+                    "tipo": tipo,
+                    "ejecuciones": 0,
+                    "errores": 0,
+                    "filas_totales": 0,
+                    "tiempo_total_ms": 0.0,
+                    "tiempo_max_ms": 0.0,
+                    "buckets": [0] * (len(self.BUCKETS_LATENCIA) + 1)
+                }
+                self._consultas[huella] = stats
+
+            stats["ejecuciones"] += 1
+            stats["errores"] += 1 if error else 0
+            stats["filas_totales"] += filas
+            stats["tiempo_total_ms"] += duracion_ms
+            stats["tiempo_max_ms"] = max(stats["tiempo_max_ms"], duracion_ms)
+
+            indice = len(self.BUCKETS_LATENCIA)
+            for i, limite in enumerate(self.BUCKETS_LATENCIA):
+                if duracion <= limite:
+                    indice = i
+                    break
+            stats["buckets"][indice] += 1
+
+            if duracion_ms >= self.umbral_lenta_ms:
+                self._lentas.append({
+                    "huella": huella,
+                    "consulta": normalizada,
+                    "duracion_ms": round(duracion_ms, 2),
+                    "filas": filas,
+                    "error": error,
+                    "fecha": datetime.now().isoformat()
+                })
+
+        if duracion_ms >= self.umbral_lenta_ms:
+            print(f"🐢 Consulta lenta ({duracion_ms:.1f} ms, {filas} filas) [{huella}]: {normalizada[:120]}")
+
+    def obtener(self, ordenar_por="tiempo_total_ms", limite=None):
+        """
+        Devuelve una copia de las métricas por huella
+
+        Args:
+            ordenar_por: Campo por el cual ordenar de mayor a menor
+            limite: Número máximo de consultas a devolver
+
+        Returns:
+            list: Métricas por consulta
+        """
+        with self._lock:
+            consultas = [dict(stats, buckets=list(stats["buckets"])) for stats in self._consultas.values()]
+
+        resultado = []
+        for stats in consultas:
+            acumulado = 0
+            histograma = {}
+            for limite_bucket, cantidad in zip(self.BUCKETS_LATENCIA, stats["buckets"]):
+                acumulado += cantidad
+                histograma[f"le_{limite_bucket}"] = acumulado
+            histograma["le_inf"] = acumulado + stats["buckets"][-1]
+
+            stats["histograma"] = histograma
+            stats["tiempo_promedio_ms"] = round(stats["tiempo_total_ms"] / stats["ejecuciones"], 3)
+            stats["tiempo_total_ms"] = round(stats["tiempo_total_ms"], 3)
+            stats["tiempo_max_ms"] = round(stats["tiempo_max_ms"], 3)
+            del stats["buckets"]
+            resultado.append(stats)
+
+        resultado.sort(key=lambda s: s.get(ordenar_por, 0), reverse=True)
+        return resultado[:limite] if limite else resultado
+
+    def consultas_lentas(self):
+        """Devuelve el registro de consultas lentas, de la más reciente a la más antigua"""
+        with self._lock:
+            return list(reversed(self._lentas))
+
+    def reiniciar(self):
+        """Elimina todas las métricas acumuladas"""
+        with self._lock:
+            self._consultas.clear()
+            self._lentas.clear()
+
+# Métricas compartidas por todas las instancias de Neo4jDriver del proceso
+estadisticas_consultas = EstadisticasConsultas()
+
+class ResultadoInstrumentado:
+    """Resultado ya materializado con la misma interfaz de lectura que neo4j.Result"""
+    def __init__(self, keys, records, summary):
+        self._keys = keys
+        self._records = records
+        self._summary = summary
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def keys(self):
+        return self._keys
+
+    def single(self, strict=False):
+        if not self._records:
+            if strict:
+                raise ValueError("No se encontraron registros")
+            return None
+        if strict and len(self._records) > 1:
+            raise ValueError("Se esperaba un único registro")
+        return self._records[0]
+
+    def peek(self):
+        return self._records[0] if self._records else None
+
+    def fetch(self, n):
+        return self._records[:n]
+
+    def data(self, *keys):
+        return [record.data(*keys) for record in self._records]
+
+    def value(self, key=0, default=None):
+        return [record.value(key, default) for record in self._records]
+
+    def values(self, *keys):
+        return [record.values(*keys) for record in self._records]
+
+    def consume(self):
+        return self._summary
+
+class SesionInstrumentada:
+    """Envuelve una sesión de Neo4j para medir cada consulta ejecutada con run()"""
+    def __init__(self, session):
+        self._session = session
+        self._cerrada = False
+        Neo4jDriver._registrar_sesion(1)
+
+    def run(self, query, parameters=None, **params):
+        inicio = time.perf_counter()
         try:
-            self.driver = GraphDatabase.driver(
-                NEO4J_URI, 
-                auth=(NEO4J_USER, NEO4J_PASSWORD),
-                max_connection_lifetime=3600,
-                connection_timeout=30
-            )
-            with self.driver.session() as session:
-                session.run("RETURN 1").single()
-            print("✅ Conexión exitosa a Neo4j")
-        except Exception as e:
-            print(f"🔥 Error de conexión a Neo4j: {e}")
+            result = self._session.run(query, parameters, **params)
+            records = [convertir_registro(r) for r in result]
+            summary = result.consume()
+        except Exception:
+            estadisticas_consultas.registrar(query, time.perf_counter() - inicio, error=True, tipo="sesion")
             raise
+        estadisticas_consultas.registrar(query, time.perf_counter() - inicio, len(records), tipo="sesion")
+        return ResultadoInstrumentado(result.keys(), records, summary)
 
     def close(self):
-        """Cierra la conexión con Neo4j"""
-        if hasattr(self, 'driver'):
-            self.driver.close()
+        if not self._cerrada:
+            self._cerrada = True
+            Neo4jDriver._registrar_sesion(-1)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._session, nombre)
+
+class Neo4jDriver:
+    """
+    Clase mejorada para manejar la conexión con Neo4j
+
+    Todas las instancias del proceso comparten un único driver (y su pool de conexiones),
+    así que crear un Neo4jDriver por solicitud no abre conexiones nuevas.
+    """
+    # Uso de conexiones compartido por todas las instancias del proceso
+    _lock_pool = threading.Lock()
+    _lock_driver = threading.Lock()
+    _driver_compartido = None
+    _drivers_abiertos = 0
+    _sesiones_activas = 0
+    _sesiones_total = 0
+
+    def __init__(self):
+        # Crea el pool compartido (y comprueba la conexión) solo la primera vez
+        Neo4jDriver.obtener_driver()
+
+    @property
+    def driver(self):
+        return Neo4jDriver.obtener_driver()
+
+    @classmethod
+    def obtener_driver(cls):
+        """Devuelve el driver compartido del proceso, creándolo si no existe o se cerró"""
+        driver = cls._driver_compartido
+        if driver is not None:
+            return driver
+        with cls._lock_driver:
+            if cls._driver_compartido is None:
+                driver = None
+                try:
+                    driver = GraphDatabase.driver(
+                        NEO4J_URI,
+                        auth=(NEO4J_USER, NEO4J_PASSWORD),
+                        max_connection_lifetime=3600,
+                        connection_timeout=30
+                    )
+                    inicio = time.perf_counter()
+                    with driver.session() as session:
+                        session.run("RETURN 1").single()
+                    estadisticas_consultas.registrar("RETURN 1", time.perf_counter() - inicio, 1, tipo="conexion")
+                except Exception as e:
+                    print(f"🔥 Error de conexión a Neo4j: {e}")
+                    if driver is not None:
+                        driver.close()
+                    raise
+                cls._driver_compartido = driver
+                with cls._lock_pool:
+                    cls._drivers_abiertos += 1
+                print("✅ Conexión exitosa a Neo4j")
+            return cls._driver_compartido
+
+    def close(self):
+        """Cierra el pool compartido; la siguiente instancia lo vuelve a abrir"""
+        Neo4jDriver.cerrar_pool()
+
+    @classmethod
+    def cerrar_pool(cls):
+        """Cierra el driver compartido del proceso (al apagar la aplicación o al final de un script)"""
+        with cls._lock_driver:
+            driver, cls._driver_compartido = cls._driver_compartido, None
+        if driver is not None:
+            driver.close()
+            with cls._lock_pool:
+                cls._drivers_abiertos -= 1
             print("🔌 Conexión a Neo4j cerrada")
 
+    @classmethod
+    def _registrar_sesion(cls, delta):
+        with cls._lock_pool:
+            cls._sesiones_activas += delta
+            if delta > 0:
+                cls._sesiones_total += delta
+
+    @classmethod
+    def estado_pool(cls):
+        """Devuelve el uso de conexiones de todas las instancias del proceso"""
+        with cls._lock_pool:
+            return {
+                "drivers_abiertos": cls._drivers_abiertos,
+                "sesiones_activas": cls._sesiones_activas,
+                "sesiones_total": cls._sesiones_total
+            }
+
+    @contextmanager
+    def _sesion(self):
+        """Sesión interna contabilizada en el uso del pool"""
+        Neo4jDriver._registrar_sesion(1)
+        try:
+            with self.driver.session() as session:
+                yield session
+        finally:
+            Neo4jDriver._registrar_sesion(-1)
+
     def execute_read(self, query, **params):
         """Ejecuta una consulta de lectura con manejo de errores mejorado"""
+        inicio = time.perf_counter()
         try:
-            with self.driver.session() as session:
+            with self._sesion() as session:
                 result = session.run(query, **params)
-                return list(result)
+                records = [convertir_registro(r) for r in result]
         except Exception as e:
+            estadisticas_consultas.registrar(query, time.perf_counter() - inicio, error=True)
             print(f"📖 Error en lectura: {query[:50]}... - {str(e)}")
             raise
+        estadisticas_consultas.registrar(query, time.perf_counter() - inicio, len(records))
+        return records
 
     def execute_write(self, query, **params):
         """Ejecuta una consulta de escritura con confirmación explícita"""
+        inicio = time.perf_counter()
         try:
-            with self.driver.session() as session:
+            with self._sesion() as session:
                 result = session.run(query, **params)
-                records = list(result)
-                session.close()
-                return records
+                records = [convertir_registro(r) for r in result]
         except Exception as e:
+            estadisticas_consultas.registrar(query, time.perf_counter() - inicio, error=True, tipo="escritura")
             print(f"✍️ Error en escritura: {query[:50]}... - {str(e)}")
             raise
+        estadisticas_consultas.registrar(query, time.perf_counter() - inicio, len(records), tipo="escritura")
+        return records
 
     def execute_transaction(self, tx_func, *args, **kwargs):
         """Ejecuta una función compleja en una transacción explícita"""
@@ -58,7 +371,43 @@ class Neo4jDriver:
                 return bool(session.run("RETURN 1").single())
         except Exception:
             return False
-            
+
     def get_session(self):
-        """Devuelve una nueva sesión de la base de datos"""
-        return self.driver.session()
\ No newline at end of file
+        """Devuelve una nueva sesión de la base de datos instrumentada"""
+        return SesionInstrumentada(self.driver.session())
+
+class EstadoConexion:
+    """
+    Último estado conocido de la conexión con Neo4j, reutilizado durante `ttl` segundos
+    para que las sondas de readiness no consulten la base de datos en cada llamada
+    """
+    def __init__(self, ttl=HEALTH_CACHE_TTL_S):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._estado = None
+        self._verificado = 0.0
+
+    def obtener(self):
+        """
+        Devuelve el estado en cache o lo verifica con el pool compartido si expiró.
+        Bloquea mientras verifica; desde código async llamarlo con asyncio.to_thread.
+
+        Returns:
+            dict: conectada, latencia_ms, error y edad_s (antigüedad del dato)
+        """
+        with self._lock:
+            ahora = time.monotonic()
+            if self._estado is None or ahora - self._verificado >= self.ttl:
+                self._estado = self._verificar()
+                self._verificado = ahora = time.monotonic()
+            return {**self._estado, "edad_s": round(ahora - self._verificado, 3)}
+
+    def _verificar(self):
+        inicio = time.perf_counter()
+        try:
+            Neo4jDriver.obtener_driver().verify_connectivity()
+            return {"conectada": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2), "error": None}
+        except Exception as e:
+            return {"conectada": False, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2), "error": str(e)}
+
+estado_conexion = EstadoConexion()
@@ -1,24 +1,48 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
 
 from api.rutas_estudiantes import router as estudiantes_router
 from api.rutas_profesores import router as profesores_router
 from api.rutas_cursos import router as cursos_router
 from api.rutas import router as rutas_generales
+from api.rutas_admin import router as admin_router
+from api.middleware import (
+    medir_solicitudes, contar_consultas, perfilar_solicitud, negociar_formato, registrar_plantillas
+)
 from database.neo4jdriver import Neo4jDriver
-from config import API_PREFIX, DEBUG
+from database.migraciones import aplicar_migraciones
+from services.compactacion import ciclo_compactacion
+from config import (
+    API_PREFIX, DEBUG, RECOMMENDATION_COMPACTION_INTERVAL_S, GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+)
+from utils.metricas import registro
 
 # Manejador de contexto para inicializar y cerrar recursos
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    compactacion = None
     # Inicializar la conexión con Neo4j
     try:
         driver = Neo4jDriver()
         print("Conexión a Neo4j inicializada en el lifespan de la aplicación")
+        # Crear o verificar las restricciones e índices que usan las consultas
+        try:
+            version = aplicar_migraciones(driver)
+            print(f"Esquema de Neo4j en la versión {version}")
+        except Exception as e:
+            print(f"🔥 No se pudieron aplicar las migraciones del esquema: {str(e)}")
+        # Retención de recomendaciones en segundo plano (0 la desactiva)
+        if RECOMMENDATION_COMPACTION_INTERVAL_S > 0:
+            compactacion = asyncio.create_task(ciclo_compactacion(driver))
         yield
     finally:
+        if compactacion:
+            compactacion.cancel()
         # Cerrar la conexión cuando la aplicación se cierra
         driver.close()
         print("Conexión a Neo4j cerrada correctamente")
@@ -39,13 +63,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permite todos los métodos
     allow_headers=["*"],  # Permite todos los headers
+    expose_headers=["X-DB-Queries", "X-DB-Time-Ms"],  # Headers del conteo de consultas
 )
 
-# Incluir los routers
-app.include_router(estudiantes_router, prefix=f"{API_PREFIX}/estudiantes", tags=["Estudiantes"])
-app.include_router(profesores_router, prefix=f"{API_PREFIX}/profesores", tags=["Profesores"])
-app.include_router(cursos_router, prefix=f"{API_PREFIX}/cursos", tags=["Cursos"])
-app.include_router(rutas_generales, prefix=API_PREFIX, tags=["General"])
+# Métricas por ruta (conteo, latencia y solicitudes en curso)
+app.middleware("http")(medir_solicitudes)
+
+# Conteo de consultas a Neo4j por solicitud (detector de N+1)
+app.middleware("http")(contar_consultas)
+
+# Perfilado bajo demanda de una solicitud (X-Profile + X-Admin-Token)
+app.middleware("http")(perfilar_solicitud)
+
+# JSON o MessagePack según el header Accept
+app.middleware("http")(negociar_formato)
+
+# Compresión gzip negociada con Accept-Encoding para respuestas grandes
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
+# Incluir los routers y registrar la plantilla completa de sus rutas para las métricas
+for router, prefijo, etiqueta in (
+    (estudiantes_router, f"{API_PREFIX}/estudiantes", "Estudiantes"),
+    (profesores_router, f"{API_PREFIX}/profesores", "Profesores"),
+    (cursos_router, f"{API_PREFIX}/cursos", "Cursos"),
+    (rutas_generales, API_PREFIX, "General"),
+    (admin_router, f"{API_PREFIX}/admin", "Administración"),
+):
+    app.include_router(router, prefix=prefijo, tags=[etiqueta])
+    registrar_plantillas(router, prefijo)
 
 # Ruta raíz
 @app.get("/", tags=["Root"])
@@ -56,6 +101,11 @@ async def root():
         "documentación": "/docs"
     }
 
+# Métricas en formato de exposición de texto de Prometheus
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4")
+
 # Código para ejecutar la aplicación directamente
 if __name__ == "__main__":
     uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=DEBUG)
@@ -0,0 +1,68 @@
+"""
+Modelos de respuesta de las rutas que devuelven una Response ya serializada (responder)
+
+FastAPI no valida ni filtra esas respuestas contra response_model: los modelos solo
+documentan el esquema de OpenAPI. tests/test_respuestas.py valida cada payload contra
+su modelo para que no se desvíen.
+"""
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+
+class Paginacion(BaseModel):
+    """Datos para pedir la página siguiente de un listado"""
+    limite: int
+    siguiente_cursor: Optional[str] = None
+
+class RespuestaLista(BaseModel):
+    """Respuesta de los listados (estudiantes, profesores, cursos)"""
+    success: bool
+    message: str
+    data: List[Dict[str, Any]]
+    paginacion: Optional[Paginacion] = None
+
+class Recomendacion(BaseModel):
+    """Recomendación de un profesor para un estudiante"""
+    profesor: str
+    indice_compatibilidad: float
+    porcentaje_recomendacion: float
+    factor_confianza: float
+    compatibilidad_estilos: float
+    calidad_profesor: float
+    afinidad: float
+    departamento: Optional[str] = None
+    evaluacion_docente: Optional[float] = None
+    porcentaje_aprobados: Optional[float] = None
+    años_experiencia: Optional[int] = None
+    estilo_enseñanza: Optional[str] = None
+    estilo_clase: Optional[str] = None
+    detalles_calculo: Optional[Dict[str, float]] = None
+
+class MetadatosRecomendaciones(BaseModel):
+    total_encontradas: int
+    estudiante: str
+    curso_filtrado: Optional[str] = None
+    limite_aplicado: Optional[int] = None
+    mejor_compatibilidad: float
+    promedio_compatibilidad: float
+
+class DatosRecomendaciones(BaseModel):
+    recomendaciones: List[Recomendacion]
+    metadatos: MetadatosRecomendaciones
+
+class RespuestaRecomendaciones(BaseModel):
+    """Respuesta de /recomendaciones/{nombre_estudiante}"""
+    success: bool
+    message: str
+    data: DatosRecomendaciones
+
+class DatosCompatibilidad(BaseModel):
+    # Con summary_only cada rango trae solo los nombres de los profesores
+    matriz_compatibilidad: Dict[str, Union[List[Recomendacion], List[str]]]
+    resumen: Dict[str, int]
+    estudiante: str
+
+class RespuestaCompatibilidad(BaseModel):
+    """Respuesta de /compatibilidad/{nombre_estudiante}"""
+    success: bool
+    message: str
+    data: DatosCompatibilidad
@@ -1,8 +1,97 @@
 from database.neo4jdriver import Neo4jDriver
 from services.algoritmo_estudiante import AlgoritmoEstudiante
 from services.algoritmo_profesor import AlgoritmoProfesor
+from utils.metricas import duracion_etapa_recomendacion, registrar_acceso_cache
+from config import (
+    RECOMMENDATION_WRITE_THRESHOLD, RECOMMENDATION_REFRESH_S, RECOMMENDATION_FINGERPRINT_CACHE_SIZE,
+    RECOMMENDATION_TOP_N
+)
+from collections import OrderedDict
 import math
 import random
+import threading
+import time
+
+# Escribe solo las recomendaciones nuevas, con un índice que cambió al menos $umbral
+# o más antiguas que $refresco segundos; devuelve el índice que queda guardado
+QUERY_REGISTRAR_RECOMENDACIONES = """
+MATCH (e:Estudiante {nombre: $nombre_estudiante})
+UNWIND $filas AS f
+MATCH (p:Profesor {nombre: f.profesor})
+OPTIONAL MATCH (e)-[previa:RECOMENDADO]->(p)
+WITH e, p, f, previa,
+     previa IS NULL
+     OR previa.indice_compatibilidad IS NULL
+     OR previa.fecha_recomendacion IS NULL
+     OR abs(previa.indice_compatibilidad - f.indice) >= $umbral
+     OR previa.fecha_recomendacion < datetime() - duration({seconds: $refresco}) AS escribir
+FOREACH (_ IN CASE WHEN escribir THEN [1] ELSE [] END |
+    MERGE (e)-[r:RECOMENDADO]->(p)
+    SET r.indice_compatibilidad = f.indice,
+        r.fecha_recomendacion = datetime()
+)
+RETURN f.profesor AS profesor, escribir,
+       CASE WHEN escribir THEN f.indice ELSE previa.indice_compatibilidad END AS indice
+"""
+
+class HuellasRecomendacion:
+    """
+    Cache LRU de los índices guardados por estudiante ({profesor: índice})
+
+    Si todos los índices recalculados están dentro del umbral de los guardados y la huella
+    tiene menos de RECOMMENDATION_REFRESH_S segundos, no hace falta ir a la base de datos.
+    """
+    def __init__(self, max_entradas=RECOMMENDATION_FINGERPRINT_CACHE_SIZE, ttl=RECOMMENDATION_REFRESH_S):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+
+    def sin_cambios(self, nombre_estudiante, indices, umbral):
+        """Indica si los índices coinciden (dentro del umbral) con la huella vigente"""
+        with self._lock:
+            entrada = self._entradas.get(nombre_estudiante)
+            vigente = entrada is not None and entrada[0] > time.time()
+            if vigente:
+                self._entradas.move_to_end(nombre_estudiante)
+        sin_cambios = vigente and all(
+            profesor in entrada[1] and abs(entrada[1][profesor] - indice) < umbral
+            for profesor, indice in indices.items()
+        )
+        registrar_acceso_cache("huellas_recomendacion", sin_cambios)
+        return sin_cambios
+
+    def guardar(self, nombre_estudiante, indices):
+        with self._lock:
+            entrada = self._entradas.get(nombre_estudiante)
+            guardados = dict(entrada[1]) if entrada else {}
+            guardados.update(indices)
+            self._entradas[nombre_estudiante] = (time.time() + self.ttl, guardados)
+            self._entradas.move_to_end(nombre_estudiante)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def descartar_estudiante(self, nombre_estudiante):
+        """Elimina la huella de un estudiante (p. ej. al borrarlo con sus RECOMENDADO)"""
+        with self._lock:
+            self._entradas.pop(nombre_estudiante, None)
+
+    def descartar_profesor(self, nombre_profesor):
+        """Quita a un profesor de todas las huellas (p. ej. al borrarlo con sus RECOMENDADO)"""
+        with self._lock:
+            for nombre_estudiante, (expira, guardados) in list(self._entradas.items()):
+                if nombre_profesor in guardados:
+                    restantes = {p: i for p, i in guardados.items() if p != nombre_profesor}
+                    self._entradas[nombre_estudiante] = (expira, restantes)
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+huellas_recomendacion = HuellasRecomendacion()
 
 class AlgoritmoRecomendacion:
     """Clase mejorada para ejecutar el algoritmo de recomendación de profesores con rangos amplios"""
@@ -16,6 +105,10 @@ class AlgoritmoRecomendacion:
         """
         Recomienda profesores para un estudiante específico, opcionalmente para un curso específico
         """
+        # Tiempo acumulado por etapa del algoritmo (en segundos)
+        tiempos = {"candidatos": 0.0, "afinidad": 0.0, "puntuacion": 0.0, "persistencia": 0.0}
+        inicio = time.perf_counter()
+        
         # Verificar si el estudiante existe
         estudiante = self.algoritmo_estudiante.obtener_estudiante(nombre_estudiante)
         if not estudiante:
@@ -37,17 +130,49 @@ class AlgoritmoRecomendacion:
             profesores = self.driver.execute_read(query_profesores)
             if not profesores:
                 return []
+        
+        tiempos["candidatos"] += time.perf_counter() - inicio
 
+        recomendaciones = self.puntuar_profesores(estudiante, [record["p"] for record in profesores], tiempos)
+        
+        for etapa, duracion in tiempos.items():
+            duracion_etapa_recomendacion.observe(duracion, etapa=etapa)
+        
+        # Ordenar recomendaciones por índice de compatibilidad (de mayor a menor)
+        return sorted(recomendaciones, key=lambda x: x["indice_compatibilidad"], reverse=True)
+    
+    def puntuar_profesores(self, estudiante, profesores, tiempos=None):
+        """
+        Calcula y registra el índice de recomendación de cada profesor candidato
+        
+        Args:
+            estudiante: Nodo o dict del estudiante (debe incluir nombre)
+            profesores: Nodos o dicts de los profesores candidatos
+            tiempos: Dict opcional donde acumular el tiempo por etapa
+            
+        Returns:
+            list: Recomendaciones sin ordenar, una por profesor
+        """
+        if tiempos is None:
+            tiempos = {"candidatos": 0.0, "afinidad": 0.0, "puntuacion": 0.0, "persistencia": 0.0}
+        nombre_estudiante = estudiante["nombre"]
+        
         recomendaciones = []
+        indices = {}
         
-        for record in profesores:
-            profesor = record["p"]
+        for profesor in profesores:
             
             # 1. Compatibilidad de estilos (35% peso - reducido para dar más variabilidad)
+            inicio = time.perf_counter()
             compatibilidad = self.calcular_compatibilidad_estilos(estudiante, profesor)
+            tiempos["puntuacion"] += time.perf_counter() - inicio
             
             # 2. Afinidad basada en estudiantes similares (25% peso)
+            inicio = time.perf_counter()
             afinidad, confianza = self.calcular_afinidad(nombre_estudiante, profesor["nombre"])
+            tiempos["afinidad"] += time.perf_counter() - inicio
+            
+            inicio = time.perf_counter()
             
             # 3. Calidad del profesor (25% peso - aumentado)
             calidad_profesor = self.calcular_calidad_profesor(profesor)
@@ -83,8 +208,8 @@ class AlgoritmoRecomendacion:
             # Permitir rangos amplios pero distribuidos suavemente
             indice_ajustado = max(5, min(95, indice_final * 100))
             
-            # Crear relación de recomendación en la base de datos
-            self.registrar_recomendacion(nombre_estudiante, profesor["nombre"], indice_ajustado)
+            tiempos["puntuacion"] += time.perf_counter() - inicio
+            indices[profesor["nombre"]] = indice_ajustado
             
             # Agregar a la lista de recomendaciones
             recomendaciones.append({
@@ -112,8 +237,13 @@ class AlgoritmoRecomendacion:
                 }
             })
         
-        # Ordenar recomendaciones por índice de compatibilidad (de mayor a menor)
-        return sorted(recomendaciones, key=lambda x: x["indice_compatibilidad"], reverse=True)
+        # Crear o refrescar las relaciones de recomendación en una sola escritura; solo se
+        # persisten las RECOMMENDATION_TOP_N mejores, la misma regla que aplica la compactación
+        inicio = time.perf_counter()
+        self.registrar_recomendaciones(nombre_estudiante, self.mejores_indices(indices))
+        tiempos["persistencia"] += time.perf_counter() - inicio
+        
+        return recomendaciones
     
     def aplicar_multiplicadores_dinamicos(self, indice_base, compatibilidad, afinidad, 
                                         calidad_profesor, rendimiento_estudiante, confianza):
@@ -392,23 +522,52 @@ class AlgoritmoRecomendacion:
         
         return max(0.05, min(1.0, rendimiento))
     
+    def mejores_indices(self, indices, top_n=None):
+        """
+        Filtra los índices a los top_n más altos (RECOMMENDATION_TOP_N por defecto; 0 sin límite)
+        
+        Args:
+            indices: {nombre_profesor: índice de compatibilidad}
+            top_n: Número de índices a conservar
+            
+        Returns:
+            dict: Los índices conservados
+        """
+        top_n = RECOMMENDATION_TOP_N if top_n is None else top_n
+        if top_n <= 0 or len(indices) <= top_n:
+            return indices
+        return dict(sorted(indices.items(), key=lambda item: item[1], reverse=True)[:top_n])
+    
     def registrar_recomendacion(self, nombre_estudiante, nombre_profesor, indice):
         """Registra la recomendación en la base de datos"""
+        return self.registrar_recomendaciones(nombre_estudiante, {nombre_profesor: indice})
+    
+    def registrar_recomendaciones(self, nombre_estudiante, indices):
+        """
+        Registra los índices de un estudiante, escribiendo solo los que cambiaron
+        
+        Args:
+            nombre_estudiante: Nombre del estudiante
+            indices: {nombre_profesor: índice de compatibilidad}
+            
+        Returns:
+            int: Relaciones RECOMENDADO escritas (0 si no hubo cambios)
+        """
+        if not indices or huellas_recomendacion.sin_cambios(nombre_estudiante, indices, RECOMMENDATION_WRITE_THRESHOLD):
+            return 0
         try:
-            self.driver.execute_write(
-                """
-                MATCH (e:Estudiante {nombre: $nombre_estudiante})
-                MATCH (p:Profesor {nombre: $nombre_profesor})
-                MERGE (e)-[r:RECOMENDADO]->(p)
-                SET r.indice_compatibilidad = $indice,
-                    r.fecha_recomendacion = datetime()
-                """,
+            result = self.driver.execute_write(
+                QUERY_REGISTRAR_RECOMENDACIONES,
                 nombre_estudiante=nombre_estudiante,
-                nombre_profesor=nombre_profesor,
-                indice=indice
+                filas=[{"profesor": profesor, "indice": indice} for profesor, indice in indices.items()],
+                umbral=RECOMMENDATION_WRITE_THRESHOLD,
+                refresco=RECOMMENDATION_REFRESH_S
             )
         except Exception as e:
             print(f"Error al registrar recomendación: {e}")
+            return 0
+        huellas_recomendacion.guardar(nombre_estudiante, {r["profesor"]: r["indice"] for r in result})
+        return sum(1 for r in result if r["escribir"])
     
     def registrar_aprobacion_curso(self, nombre_estudiante, nombre_profesor, codigo_curso):
         """
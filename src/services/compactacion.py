@@ -0,0 +1,138 @@
+"""
+Retención y compactación de las relaciones de recomendación
+
+El cálculo de recomendaciones solo escribe las RECOMMENDATION_TOP_N mejores de cada
+estudiante, pero las que dejan de estar entre ellas permanecen, así que sin limpieza el
+grafo crece hacia estudiantes × profesores aristas. La compactación aplica la política
+de retención en lotes acotados:
+
+- Elimina las RECOMENDADO más antiguas que RECOMMENDATION_MAX_AGE_DAYS
+- Conserva solo las RECOMMENDATION_TOP_N de mayor índice por estudiante
+- Elimina una sola vez las RECOMENDACION heredadas de versiones anteriores de los scripts de
+  datos de prueba (no las lee ninguna consulta ni las crea ya ningún script)
+"""
+import asyncio
+import time
+
+from database.neo4jdriver import Neo4jDriver
+from services.algoritmo_de_recomendacion import huellas_recomendacion
+from utils.metricas import relaciones_compactadas
+from config import (
+    RECOMMENDATION_MAX_AGE_DAYS, RECOMMENDATION_TOP_N,
+    RECOMMENDATION_COMPACTION_INTERVAL_S, RECOMMENDATION_COMPACTION_BATCH
+)
+
+# Usa el índice recomendado_fecha
+QUERY_ANTIGUAS = """
+MATCH ()-[r:RECOMENDADO]->()
+WHERE r.fecha_recomendacion < datetime() - duration({days: $dias})
+WITH r LIMIT $lote
+DELETE r
+RETURN count(*) AS eliminadas
+"""
+
+# Procesa hasta $lote estudiantes con más de $maximo recomendaciones por transacción
+QUERY_EXCEDENTES = """
+MATCH (e:Estudiante)
+WHERE COUNT { (e)-[:RECOMENDADO]->() } > $maximo
+WITH e LIMIT $lote
+MATCH (e)-[r:RECOMENDADO]->()
+WITH e, r ORDER BY r.indice_compatibilidad DESC
+WITH e, collect(r) AS recomendaciones
+UNWIND recomendaciones[$maximo..] AS sobrante
+DELETE sobrante
+RETURN count(*) AS eliminadas
+"""
+
+QUERY_HEREDADAS = """
+MATCH ()-[r:RECOMENDACION]->()
+WITH r LIMIT $lote
+DELETE r
+RETURN count(*) AS eliminadas
+"""
+
+# Se vuelve False cuando ya no quedan RECOMENDACION heredadas en la base de datos
+_heredadas_pendientes = True
+
+def _eliminar_en_lotes(driver, query, **params):
+    """Repite una consulta de borrado acotado hasta que no elimine nada"""
+    total = 0
+    while True:
+        eliminadas = driver.execute_write(query, **params)[0]["eliminadas"]
+        if not eliminadas:
+            return total
+        total += eliminadas
+
+def compactar_recomendaciones(driver=None, max_dias=RECOMMENDATION_MAX_AGE_DAYS,
+                              top_n=RECOMMENDATION_TOP_N, tamano_lote=RECOMMENDATION_COMPACTION_BATCH):
+    """
+    Aplica la política de retención de recomendaciones
+
+    Args:
+        driver: Instancia de Neo4jDriver (se crea una si no se indica)
+        max_dias: Antigüedad máxima de una RECOMENDADO (0 desactiva el límite)
+        top_n: Recomendaciones conservadas por estudiante (0 desactiva el límite)
+        tamano_lote: Relaciones (o estudiantes, para top_n) por transacción
+
+    Returns:
+        dict: Relaciones eliminadas por motivo y duración en segundos
+    """
+    global _heredadas_pendientes
+    driver = driver or Neo4jDriver()
+    inicio = time.perf_counter()
+    resultado = {"antiguas": 0, "excedentes": 0, "heredadas": 0}
+
+    if max_dias > 0:
+        resultado["antiguas"] = _eliminar_en_lotes(driver, QUERY_ANTIGUAS, dias=max_dias, lote=tamano_lote)
+    if top_n > 0:
+        # Cada estudiante tiene a lo sumo tantas recomendaciones como profesores
+        lote_estudiantes = max(1, tamano_lote // max(top_n, 1))
+        resultado["excedentes"] = _eliminar_en_lotes(driver, QUERY_EXCEDENTES, maximo=top_n, lote=lote_estudiantes)
+    if _heredadas_pendientes:
+        # Limpieza única de datos heredados: ya nada crea RECOMENDACION
+        resultado["heredadas"] = _eliminar_en_lotes(driver, QUERY_HEREDADAS, lote=tamano_lote)
+        _heredadas_pendientes = False
+
+    if any(resultado.values()):
+        # Las huellas pueden apuntar a relaciones que ya no existen
+        huellas_recomendacion.limpiar()
+    for motivo, cantidad in resultado.items():
+        if cantidad:
+            relaciones_compactadas.inc(cantidad, motivo=motivo)
+    resultado["duracion_s"] = round(time.perf_counter() - inicio, 3)
+    return resultado
+
+def contar_relaciones_por_tipo(driver=None):
+    """
+    Cuenta las relaciones de cada tipo
+
+    Cada conteo usa un tipo fijo en el patrón, que Neo4j resuelve con su almacén de conteos
+    sin recorrer las relaciones.
+
+    Returns:
+        dict: {tipo: cantidad} ordenado de mayor a menor
+    """
+    driver = driver or Neo4jDriver()
+    tipos = [r["tipo"] for r in driver.execute_read(
+        "CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType AS tipo"
+    )]
+    conteos = {}
+    for tipo in tipos:
+        etiqueta = tipo.replace("`", "``")
+        conteos[tipo] = driver.execute_read(
+            f"MATCH ()-[r:`{etiqueta}`]->() RETURN count(r) AS cantidad"
+        )[0]["cantidad"]
+    return dict(sorted(conteos.items(), key=lambda item: item[1], reverse=True))
+
+async def ciclo_compactacion(driver, intervalo=RECOMMENDATION_COMPACTION_INTERVAL_S):
+    """
+    Tarea en segundo plano que compacta las recomendaciones cada `intervalo` segundos.
+    La compactación corre en un hilo para no bloquear el event loop.
+    """
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            resultado = await asyncio.to_thread(compactar_recomendaciones, driver)
+            print(f"🧹 Compactación de recomendaciones: {resultado}")
+        except Exception as e:
+            print(f"🔥 Error en la compactación de recomendaciones: {str(e)}")
@@ -0,0 +1,68 @@
+"""
+GET condicionales con ETag para el catálogo de cursos y profesores
+
+El ETag se deriva de un contador de versión que incrementan las escrituras de
+rutas_cursos y rutas_profesores. Cada proceso tiene su propia época, así que un reinicio
+(o una carga con init_db seguida de reinicio) invalida los ETag anteriores. Con varios
+workers cada uno lleva su propio contador: las escrituras hechas en otro worker solo se
+ven aquí al reiniciar, por lo que el ETag asume un único worker.
+"""
+import hashlib
+import secrets
+import threading
+
+from fastapi import Request, Response
+
+from config import CATALOG_MAX_AGE_S
+
+class VersionCatalogo:
+    """Contador de versión del catálogo, incrementado en cada escritura"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valor = 0
+        self.epoca = secrets.token_hex(4)
+
+    @property
+    def valor(self):
+        return self._valor
+
+    def incrementar(self):
+        with self._lock:
+            self._valor += 1
+            return self._valor
+
+version_catalogo = VersionCatalogo()
+
+def calcular_etag(request: Request):
+    """
+    ETag débil de la representación pedida: versión del catálogo, ruta, parámetros y Accept
+
+    Returns:
+        str: Valor para el header ETag
+    """
+    representacion = f"{request.url.path}?{request.url.query}|{request.headers.get('accept', '')}"
+    huella = hashlib.blake2b(representacion.encode("utf-8"), digest_size=6).hexdigest()
+    return f'W/"{version_catalogo.epoca}-{version_catalogo.valor}-{huella}"'
+
+def encabezados_cache(etag):
+    """Headers ETag y Cache-Control de una respuesta del catálogo"""
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={CATALOG_MAX_AGE_S}, must-revalidate"
+    }
+
+def no_modificado(request: Request, etag):
+    """
+    Devuelve una respuesta 304 si el If-None-Match de la solicitud coincide con el ETag
+
+    Returns:
+        Response: 304 sin cuerpo, o None si hay que generar la respuesta completa
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    # Comparación débil: se ignora el prefijo W/
+    etiquetas = {etiqueta.strip().removeprefix("W/") for etiqueta in if_none_match.split(",")}
+    if "*" in etiquetas or etag.removeprefix("W/") in etiquetas:
+        return Response(status_code=304, headers=encabezados_cache(etag))
+    return None
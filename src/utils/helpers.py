@@ -79,3 +79,210 @@ def create_response(data=None, message="", success=True):
         "message": message,
         "data": data
     }
+
+def token_admin_valido(token):
+    """
+    Verifica el token de administración configurado en ADMIN_TOKEN
+    
+    Args:
+        token: Token recibido en la solicitud
+        
+    Returns:
+        bool: True si coincide, False si no o si no hay token configurado
+    """
+    import hmac
+    from config import ADMIN_TOKEN
+    
+    if not ADMIN_TOKEN or not token:
+        return False
+        
+    return hmac.compare_digest(str(token), ADMIN_TOKEN)
+
+# Propiedades que se pueden actualizar por etiqueta; la clave de búsqueda,
+# el rol y las puntuaciones calculadas quedan fuera
+PROPIEDADES_ACTUALIZABLES = {
+    "Curso": ("codigo", {"nombre", "departamento", "creditos"}),
+    "Estudiante": ("carnet", {
+        "nombre", "carrera", "pensum", "email", "password", "estilo_aprendizaje", "estilo_clase",
+        "promedio", "grado", "carga_maxima", "cursos_zona_minima", "asistencias", "veces_curso"
+    }),
+    "Profesor": ("nombre", {
+        "estilo_enseñanza", "estilo_clase", "años_experiencia", "evaluacion_docente",
+        "porcentaje_aprobados", "disponibilidad"
+    })
+}
+
+def construir_actualizacion(etiqueta, datos):
+    """
+    Construye una actualización parcial con texto de consulta estable por etiqueta
+    (SET n += $props) para que Neo4j reutilice el plan en caché
+    
+    Args:
+        etiqueta: Curso, Estudiante o Profesor
+        datos: Campos a actualizar; se ignoran la clave de búsqueda y los valores None
+        
+    Returns:
+        tuple: (query, props) con parámetros $clave y $props
+        
+    Raises:
+        ValueError: Si hay campos que no se pueden actualizar
+    """
+    clave, permitidas = PROPIEDADES_ACTUALIZABLES[etiqueta]
+    props = {k: v for k, v in datos.items() if k != clave and v is not None}
+    
+    no_permitidas = sorted(set(props) - permitidas)
+    if no_permitidas:
+        raise ValueError(f"Campos no actualizables: {', '.join(no_permitidas)}")
+        
+    query = f"""
+    MATCH (n:{etiqueta} {{{clave}: $clave}})
+    SET n += $props
+    RETURN n
+    """
+    return query, props
+
+def construir_eliminacion(etiqueta):
+    """
+    Construye la eliminación en cascada de un nodo en una sola sentencia.
+    Las relaciones se borran en transacciones de $lote filas (CALL {} IN TRANSACTIONS)
+    para que un curso o profesor con miles de relaciones no genere una transacción enorme.
+    Requiere una transacción implícita (session.run).
+    
+    Args:
+        etiqueta: Curso, Estudiante o Profesor
+        
+    Returns:
+        str: Query con parámetros $clave y $lote que devuelve eliminados, nombre y relaciones por tipo
+    """
+    clave, _ = PROPIEDADES_ACTUALIZABLES[etiqueta]
+    return f"""
+    OPTIONAL MATCH (n:{etiqueta} {{{clave}: $clave}})
+    OPTIONAL MATCH (n)-[r]-()
+    WITH n, n.nombre AS nombre, r, type(r) AS tipo
+    CALL {{
+        WITH r
+        DELETE r
+    }} IN TRANSACTIONS OF $lote ROWS
+    WITH n, nombre, tipo, count(tipo) AS cantidad
+    WITH n, nombre, collect(CASE WHEN tipo IS NOT NULL THEN {{tipo: tipo, cantidad: cantidad}} END) AS relaciones
+    DETACH DELETE n
+    RETURN count(n) AS eliminados, nombre, relaciones
+    """
+
+def eliminar_en_cascada(session, etiqueta, clave):
+    """
+    Elimina un nodo y todas sus relaciones con construir_eliminacion
+    
+    Args:
+        session: Sesión de Neo4j
+        etiqueta: Curso, Estudiante o Profesor
+        clave: Valor de la clave del nodo (codigo, carnet o nombre)
+        
+    Returns:
+        dict: relaciones_eliminadas y relaciones_por_tipo, o None si el nodo no existe
+    """
+    from config import DELETE_BATCH_SIZE
+    
+    registro = session.run(construir_eliminacion(etiqueta), clave=clave, lote=DELETE_BATCH_SIZE).single()
+    if not registro or not registro["eliminados"]:
+        return None
+    # Las huellas de recomendación de un nodo borrado harían omitir las RECOMENDADO
+    # de otro que se cree con el mismo nombre
+    from services.algoritmo_de_recomendacion import huellas_recomendacion
+    if etiqueta == "Estudiante":
+        huellas_recomendacion.descartar_estudiante(registro["nombre"])
+    elif etiqueta == "Profesor":
+        huellas_recomendacion.descartar_profesor(registro["nombre"])
+    
+    por_tipo = {r["tipo"]: r["cantidad"] for r in registro["relaciones"]}
+    return {
+        "relaciones_eliminadas": sum(por_tipo.values()),
+        "relaciones_por_tipo": por_tipo
+    }
+
+# Propiedades que pueden devolver los listados (nunca password)
+CAMPOS_VISIBLES = {
+    "Curso": ["codigo", "nombre", "departamento", "creditos"],
+    "Estudiante": [
+        "carnet", "nombre", "carrera", "pensum", "email", "estilo_aprendizaje", "estilo_clase", "promedio",
+        "grado", "carga_maxima", "cursos_zona_minima", "asistencias", "veces_curso", "puntuacion_total",
+        "role", "fecha_registro"
+    ],
+    "Profesor": [
+        "nombre", "estilo_enseñanza", "estilo_clase", "años_experiencia", "evaluacion_docente",
+        "porcentaje_aprobados", "disponibilidad", "puntuacion_total"
+    ]
+}
+
+def resolver_campos(etiqueta, fields=None):
+    """
+    Convierte el parámetro fields (separado por comas) en la lista de propiedades a devolver
+    
+    Args:
+        etiqueta: Curso, Estudiante o Profesor
+        fields: Campos pedidos o None para todos los visibles
+        
+    Returns:
+        list: Propiedades a proyectar en el RETURN
+        
+    Raises:
+        ValueError: Si se pide un campo que no existe o no es visible
+    """
+    visibles = CAMPOS_VISIBLES[etiqueta]
+    if not fields:
+        return list(visibles)
+        
+    campos = [campo.strip() for campo in fields.split(",") if campo.strip()]
+    invalidos = [campo for campo in campos if campo not in visibles]
+    if invalidos:
+        raise ValueError(f"Campos no válidos: {', '.join(invalidos)}. Disponibles: {', '.join(visibles)}")
+    return campos
+
+def proyectar(campos, valores):
+    """Arma el diccionario de una fila proyectada omitiendo propiedades inexistentes"""
+    return {campo: valor for campo, valor in zip(campos, valores) if valor is not None}
+
+def codificar_cursor(valor):
+    """Codifica la última clave de una página como cursor opaco"""
+    import base64
+    import json
+    
+    return base64.urlsafe_b64encode(json.dumps(valor).encode("utf-8")).decode("ascii")
+
+def decodificar_cursor(cursor):
+    """
+    Decodifica un cursor de paginación
+    
+    Returns:
+        La clave a partir de la cual continuar ("" para la primera página)
+        
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    import base64
+    import binascii
+    import json
+    
+    if not cursor:
+        return ""
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Cursor de paginación no válido")
+
+def paginar(registros, limite):
+    """
+    Recorta los registros consultados con LIMIT $limite + 1 a una página
+    
+    Args:
+        registros: Registros con la clave de orden en "clave"
+        limite: Tamaño de página
+        
+    Returns:
+        tuple: (registros de la página, cursor de la siguiente página o None)
+    """
+    registros = list(registros)
+    if len(registros) <= limite:
+        return registros, None
+    pagina = registros[:limite]
+    return pagina, codificar_cursor(pagina[-1]["clave"])
@@ -0,0 +1,100 @@
+"""
+Lectura en streaming de archivos NDJSON o CSV para importaciones masivas
+
+El cuerpo se separa en registros sin decodificar; cada registro se decodifica como UTF-8
+dentro del manejo de errores por fila, así que un byte inválido solo rechaza su fila.
+"""
+import csv
+import io
+import json
+
+async def leer_lineas(flujo):
+    """
+    Convierte un flujo de bytes en líneas sin cargar todo el cuerpo en memoria
+
+    Args:
+        flujo: Iterador asíncrono de bytes (p. ej. request.stream())
+
+    Yields:
+        bytes: Cada línea sin decodificar y sin el salto de línea final
+    """
+    pendiente = b""
+    async for bloque in flujo:
+        pendiente += bloque
+        *lineas, pendiente = pendiente.split(b"\n")
+        for linea in lineas:
+            yield linea
+    if pendiente:
+        yield pendiente
+
+async def leer_registros(flujo, formato):
+    """
+    Agrupa las líneas en registros completos
+
+    En CSV un campo entre comillas puede contener saltos de línea: las líneas se acumulan
+    hasta que las comillas quedan balanceadas. El byte de la comilla nunca forma parte de
+    un carácter multibyte en UTF-8, así que se cuentan antes de decodificar.
+
+    Yields:
+        bytes: Cada registro sin decodificar
+    """
+    partes = []
+    comillas = 0
+    async for linea in leer_lineas(flujo):
+        if formato != "csv":
+            yield linea
+            continue
+        partes.append(linea)
+        comillas += linea.count(b'"')
+        if comillas % 2 == 0:
+            yield b"\n".join(partes)
+            partes = []
+            comillas = 0
+    if partes:
+        # Comillas sin cerrar al final del cuerpo: csv.reader informa el error de la fila
+        yield b"\n".join(partes)
+
+def parsear_csv(texto):
+    """Interpreta un registro CSV completo (admite saltos de línea entre comillas)"""
+    return next(csv.reader(io.StringIO(texto, newline=""), strict=True), [])
+
+async def leer_filas(flujo, formato):
+    """
+    Interpreta cada registro como una fila
+
+    Args:
+        flujo: Iterador asíncrono de bytes
+        formato: "ndjson" o "csv" (el primer registro del CSV es el encabezado)
+
+    Yields:
+        tuple: (número de fila, dict con los datos o None, mensaje de error o None)
+    """
+    encabezado = None
+    fila = 0
+    async for registro in leer_registros(flujo, formato):
+        if not registro.strip():
+            continue
+        if formato == "csv" and encabezado is None:
+            try:
+                encabezado = parsear_csv(registro.decode("utf-8-sig").rstrip("\r"))
+            except (ValueError, csv.Error) as e:
+                yield 0, None, f"Encabezado inválido: {str(e)}"
+                return
+            continue
+        fila += 1
+        try:
+            # UnicodeDecodeError es un ValueError: el byte inválido rechaza solo esta fila
+            texto = registro.decode("utf-8-sig").rstrip("\r")
+            if formato == "csv":
+                valores = parsear_csv(texto)
+                if len(valores) != len(encabezado):
+                    raise ValueError(f"se esperaban {len(encabezado)} columnas y hay {len(valores)}")
+                # Las celdas vacías usan el valor por defecto del modelo
+                datos = {k: v for k, v in zip(encabezado, valores) if v != ""}
+            else:
+                datos = json.loads(texto)
+                if not isinstance(datos, dict):
+                    raise ValueError("cada línea debe ser un objeto JSON")
+            yield fila, datos, None
+        except (ValueError, csv.Error) as e:
+            yield fila, None, f"Formato inválido: {str(e)}"
@@ -0,0 +1,252 @@
+"""
+Registro de métricas del proceso en formato de exposición de texto de Prometheus
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS_POR_DEFECTO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _formatear_etiquetas(nombres, valores, extra=None):
+    """Convierte etiquetas en la forma {a="x",b="y"}"""
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares) + "}"
+
+def _formatear_valor(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nombre, descripcion, etiquetas=()):
+        self.nombre = nombre
+        self.descripcion = descripcion
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        self._valores = {}
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(nombre, "")) for nombre in self.etiquetas)
+
+    def valores(self):
+        """Devuelve una copia de los valores por combinación de etiquetas"""
+        with self._lock:
+            return dict(self._valores)
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} {self.tipo}"]
+        for clave, valor in sorted(self.valores().items()):
+            lineas.append(f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_valor(valor)}")
+        return lineas
+
+class Contador(_Metrica):
+    """Métrica que solo aumenta"""
+    tipo = "counter"
+
+    def inc(self, valor=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+class Medidor(_Metrica):
+    """Métrica que puede subir y bajar"""
+    tipo = "gauge"
+
+    def set(self, valor, **etiquetas):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+    def inc(self, valor=1, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def dec(self, valor=1, **etiquetas):
+        self.inc(-valor, **etiquetas)
+
+class Histograma(_Metrica):
+    """Distribución de valores (latencias en segundos) por buckets acumulativos"""
+    tipo = "histogram"
+
+    def __init__(self, nombre, descripcion, etiquetas=(), buckets=BUCKETS_POR_DEFECTO):
+        super().__init__(nombre, descripcion, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observe(self, valor, **etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            datos = self._valores.get(clave)
+            if datos is None:
+                datos = {"buckets": [0] * len(self.buckets), "suma": 0.0, "cuenta": 0}
+                self._valores[clave] = datos
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    datos["buckets"][i] += 1
+            datos["suma"] += valor
+            datos["cuenta"] += 1
+
+    @contextmanager
+    def medir(self, **etiquetas):
+        """Observa la duración del bloque"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **etiquetas)
+
+    def valores(self):
+        with self._lock:
+            return {
+                clave: {"buckets": list(datos["buckets"]), "suma": datos["suma"], "cuenta": datos["cuenta"]}
+                for clave, datos in self._valores.items()
+            }
+
+    def exportar(self):
+        lineas = [f"# HELP {self.nombre} {self.descripcion}", f"# TYPE {self.nombre} {self.tipo}"]
+        for clave, datos in sorted(self.valores().items()):
+            for limite, cantidad in zip(self.buckets, datos["buckets"]):
+                etiquetas = _formatear_etiquetas(self.etiquetas, clave, ("le", _formatear_valor(limite)))
+                lineas.append(f"{self.nombre}_bucket{etiquetas} {cantidad}")
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave, ("le", "+Inf"))
+            lineas.append(f"{self.nombre}_bucket{etiquetas} {datos['cuenta']}")
+            lineas.append(f"{self.nombre}_sum{_formatear_etiquetas(self.etiquetas, clave)} {_formatear_valor(datos['suma'])}")
+            lineas.append(f"{self.nombre}_count{_formatear_etiquetas(self.etiquetas, clave)} {datos['cuenta']}")
+        return lineas
+
+class RegistroMetricas:
+    """Agrupa las métricas del proceso y las exporta en formato de texto"""
+    def __init__(self):
+        self._metricas = []
+        self._recolectores = []
+
+    def contador(self, nombre, descripcion, etiquetas=()):
+        return self._registrar(Contador(nombre, descripcion, etiquetas))
+
+    def medidor(self, nombre, descripcion, etiquetas=()):
+        return self._registrar(Medidor(nombre, descripcion, etiquetas))
+
+    def histograma(self, nombre, descripcion, etiquetas=(), buckets=BUCKETS_POR_DEFECTO):
+        return self._registrar(Histograma(nombre, descripcion, etiquetas, buckets))
+
+    def _registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def agregar_recolector(self, recolector):
+        """Registra una función que devuelve líneas adicionales al momento de exportar"""
+        self._recolectores.append(recolector)
+
+    def exportar(self):
+        lineas = []
+        for metrica in self._metricas:
+            lineas.extend(metrica.exportar())
+        for recolector in self._recolectores:
+            lineas.extend(recolector())
+        return "\n".join(lineas) + "\n"
+
+registro = RegistroMetricas()
+
+solicitudes_http_total = registro.contador(
+    "http_requests_total", "Solicitudes HTTP atendidas", ("metodo", "ruta", "estado")
+)
+duracion_solicitudes_http = registro.histograma(
+    "http_request_duration_seconds", "Latencia de las solicitudes HTTP por ruta", ("metodo", "ruta")
+)
+solicitudes_en_curso = registro.medidor(
+    "http_requests_in_progress", "Solicitudes HTTP en curso"
+)
+duracion_etapa_recomendacion = registro.histograma(
+    "recomendacion_etapa_duracion_seconds",
+    "Duración de cada etapa del algoritmo de recomendación por solicitud",
+    ("etapa",)
+)
+consultas_por_solicitud = registro.histograma(
+    "db_consultas_por_solicitud", "Consultas a Neo4j por solicitud HTTP", ("ruta",),
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250)
+)
+presupuesto_consultas_excedido = registro.contador(
+    "db_presupuesto_excedido_total", "Solicitudes que superaron el presupuesto de consultas o tiempo de BD", ("ruta",)
+)
+operaciones_cache = registro.contador(
+    "cache_operaciones_total", "Consultas a caches internos por resultado (hit/miss)", ("cache", "resultado")
+)
+
+relaciones_compactadas = registro.contador(
+    "recomendaciones_compactadas_total", "Relaciones eliminadas por la compactación de recomendaciones", ("motivo",)
+)
+
+def registrar_acceso_cache(cache, acierto):
+    """Registra un acierto o fallo en el cache indicado"""
+    operaciones_cache.inc(cache=cache, resultado="hit" if acierto else "miss")
+
+def tasas_acierto_cache():
+    """Calcula la tasa de aciertos por cache"""
+    totales = {}
+    for (cache, resultado), cantidad in operaciones_cache.valores().items():
+        totales.setdefault(cache, {"hit": 0, "miss": 0})[resultado] = cantidad
+    return {
+        cache: conteos["hit"] / (conteos["hit"] + conteos["miss"])
+        for cache, conteos in totales.items()
+        if conteos["hit"] + conteos["miss"] > 0
+    }
+
+def _recolectar_tasas_cache():
+    lineas = [
+        "# HELP cache_tasa_aciertos Proporción de aciertos por cache",
+        "# TYPE cache_tasa_aciertos gauge"
+    ]
+    for cache, tasa in sorted(tasas_acierto_cache().items()):
+        lineas.append(f"cache_tasa_aciertos{_formatear_etiquetas(('cache',), (cache,))} {_formatear_valor(tasa)}")
+    return lineas
+
+def _recolectar_neo4j():
+    from database.neo4jdriver import Neo4jDriver, estadisticas_consultas
+
+    pool = Neo4jDriver.estado_pool()
+    lineas = [
+        "# HELP neo4j_drivers_abiertos Pools de conexión de Neo4j abiertos (uno compartido por proceso)",
+        "# TYPE neo4j_drivers_abiertos gauge",
+        f"neo4j_drivers_abiertos {pool['drivers_abiertos']}",
+        "# HELP neo4j_sesiones_activas Sesiones de Neo4j en uso",
+        "# TYPE neo4j_sesiones_activas gauge",
+        f"neo4j_sesiones_activas {pool['sesiones_activas']}",
+        "# HELP neo4j_sesiones_total Sesiones de Neo4j abiertas desde el inicio del proceso",
+        "# TYPE neo4j_sesiones_total counter",
+        f"neo4j_sesiones_total {pool['sesiones_total']}"
+    ]
+
+    consultas = estadisticas_consultas.obtener()
+    lineas += [
+        "# HELP neo4j_consultas_total Ejecuciones por huella de consulta",
+        "# TYPE neo4j_consultas_total counter"
+    ]
+    for stats in consultas:
+        etiquetas = _formatear_etiquetas(("huella", "tipo"), (stats["huella"], stats["tipo"]))
+        lineas.append(f"neo4j_consultas_total{etiquetas} {stats['ejecuciones']}")
+    lineas += [
+        "# HELP neo4j_consulta_duracion_seconds Latencia por huella de consulta",
+        "# TYPE neo4j_consulta_duracion_seconds histogram"
+    ]
+    for stats in consultas:
+        for limite, cantidad in stats["histograma"].items():
+            le = "+Inf" if limite == "le_inf" else limite[3:]
+            etiquetas = _formatear_etiquetas(("huella",), (stats["huella"],), ("le", le))
+            lineas.append(f"neo4j_consulta_duracion_seconds_bucket{etiquetas} {cantidad}")
+        etiquetas = _formatear_etiquetas(("huella",), (stats["huella"],))
+        lineas.append(f"neo4j_consulta_duracion_seconds_sum{etiquetas} {_formatear_valor(stats['tiempo_total_ms'] / 1000)}")
+        lineas.append(f"neo4j_consulta_duracion_seconds_count{etiquetas} {stats['ejecuciones']}")
+    return lineas
+
+registro.agregar_recolector(_recolectar_tasas_cache)
+registro.agregar_recolector(_recolectar_neo4j)
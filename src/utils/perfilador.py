@@ -0,0 +1,126 @@
+"""
+Perfilado bajo demanda de solicitudes individuales con cProfile
+"""
+import cProfile
+import os
+import pstats
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from config import PROFILE_DIR, PROFILE_MAX_STORED
+
+class AlmacenPerfiles:
+    """Guarda los últimos perfiles capturados en memoria y como archivos .prof"""
+    def __init__(self, max_perfiles=PROFILE_MAX_STORED, directorio=PROFILE_DIR):
+        self.max_perfiles = max_perfiles
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._perfiles = OrderedDict()
+        # cProfile no admite perfiles simultáneos en el mismo hilo
+        self._en_uso = threading.Lock()
+
+    def intentar_iniciar(self):
+        """
+        Inicia un perfil si no hay otro en curso
+
+        Returns:
+            cProfile.Profile o None si ya hay un perfil activo
+        """
+        if not self._en_uso.acquire(blocking=False):
+            return None
+        perfil = cProfile.Profile()
+        perfil.enable()
+        return perfil
+
+    def detener(self, perfil):
+        perfil.disable()
+        self._en_uso.release()
+
+    def guardar(self, perfil, metodo, ruta, duracion):
+        """
+        Guarda un perfil ya detenido
+
+        Args:
+            perfil: cProfile.Profile detenido
+            metodo: Método HTTP de la solicitud
+            ruta: Ruta solicitada
+            duracion: Duración total de la solicitud en segundos
+
+        Returns:
+            str: Identificador del perfil
+        """
+        id_perfil = uuid.uuid4().hex[:12]
+        archivo = None
+        if self.directorio:
+            os.makedirs(self.directorio, exist_ok=True)
+            archivo = os.path.join(self.directorio, f"{id_perfil}.prof")
+            perfil.dump_stats(archivo)
+
+        estadisticas = pstats.Stats(perfil)
+        funciones = []
+        for (ruta_archivo, linea, funcion), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+            funciones.append({
+                "funcion": funcion,
+                "archivo": ruta_archivo,
+                "linea": linea,
+                "llamadas": llamadas,
+                "tiempo_propio_ms": round(propio * 1000, 3),
+                "tiempo_acumulado_ms": round(acumulado * 1000, 3)
+            })
+
+        with self._lock:
+            self._perfiles[id_perfil] = {
+                "id": id_perfil,
+                "metodo": metodo,
+                "ruta": ruta,
+                "duracion_ms": round(duracion * 1000, 2),
+                "fecha": datetime.now().isoformat(),
+                "archivo": archivo,
+                "funciones": funciones
+            }
+            while len(self._perfiles) > self.max_perfiles:
+                _, antiguo = self._perfiles.popitem(last=False)
+                if antiguo["archivo"] and os.path.exists(antiguo["archivo"]):
+                    os.remove(antiguo["archivo"])
+
+        return id_perfil
+
+    def listar(self):
+        """Devuelve los metadatos de los perfiles guardados, del más reciente al más antiguo"""
+        with self._lock:
+            return [
+                {clave: valor for clave, valor in perfil.items() if clave != "funciones"}
+                for perfil in reversed(self._perfiles.values())
+            ]
+
+    def obtener(self, id_perfil, limite=50, filtro=None, ordenar_por="tiempo_acumulado_ms"):
+        """
+        Devuelve un perfil con sus funciones ordenadas por tiempo
+
+        Args:
+            id_perfil: Identificador del perfil
+            limite: Número máximo de funciones a devolver
+            filtro: Texto que debe aparecer en el nombre de la función o archivo
+            ordenar_por: tiempo_acumulado_ms, tiempo_propio_ms o llamadas
+
+        Returns:
+            dict: Perfil o None si no existe
+        """
+        with self._lock:
+            perfil = self._perfiles.get(id_perfil)
+        if perfil is None:
+            return None
+
+        funciones = perfil["funciones"]
+        if filtro:
+            filtro = filtro.lower()
+            funciones = [
+                f for f in funciones
+                if filtro in f["funcion"].lower() or filtro in f["archivo"].lower()
+            ]
+        funciones = sorted(funciones, key=lambda f: f[ordenar_por], reverse=True)[:limite]
+        return dict(perfil, funciones=funciones)
+
+almacen_perfiles = AlmacenPerfiles()
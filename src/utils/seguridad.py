@@ -0,0 +1,201 @@
+"""
+Contraseñas con PBKDF2, tokens firmados con HMAC y cache de usuarios autenticados
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from config import AUTH_SECRET, AUTH_TOKEN_TTL_S, PASSWORD_HASH_ITERATIONS, AUTH_CACHE_SIZE, AUTH_CACHE_TTL_S
+from utils.metricas import registrar_acceso_cache
+
+PREFIJO_HASH = "pbkdf2_sha256"
+
+if AUTH_SECRET:
+    _secreto = AUTH_SECRET.encode("utf-8")
+else:
+    # Sin AUTH_SECRET los tokens dejan de ser válidos al reiniciar y no se comparten entre procesos
+    print("⚠️ AUTH_SECRET no está configurado; se usará un secreto temporal")
+    _secreto = secrets.token_bytes(32)
+
+# hashlib libera el GIL al derivar la clave, así que los hilos sí trabajan en paralelo
+HILOS_HASH = os.cpu_count() or 1
+_executor = ThreadPoolExecutor(max_workers=HILOS_HASH, thread_name_prefix="hash")
+
+def _b64(datos):
+    return base64.urlsafe_b64encode(datos).rstrip(b"=").decode("ascii")
+
+def _desde_b64(texto):
+    return base64.urlsafe_b64decode(texto + "=" * (-len(texto) % 4))
+
+def hashear_password(password, iteraciones=PASSWORD_HASH_ITERATIONS):
+    """
+    Deriva el hash de una contraseña con PBKDF2-SHA256 y sal aleatoria
+    
+    Returns:
+        str: pbkdf2_sha256$iteraciones$sal$hash
+    """
+    sal = secrets.token_bytes(16)
+    clave = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), sal, iteraciones)
+    return f"{PREFIJO_HASH}${iteraciones}${_b64(sal)}${_b64(clave)}"
+
+def es_hash(valor):
+    """Indica si un valor almacenado ya es un hash de contraseña"""
+    return isinstance(valor, str) and valor.startswith(f"{PREFIJO_HASH}$")
+
+def verificar_password(password, almacenado):
+    """
+    Compara una contraseña con el valor almacenado
+    
+    Los estudiantes creados antes de guardar hashes tienen la contraseña en texto plano;
+    se aceptan para poder migrarlos en su siguiente login
+    
+    Returns:
+        bool: True si la contraseña coincide
+    """
+    if not almacenado:
+        return False
+    if not es_hash(almacenado):
+        return hmac.compare_digest(str(password), str(almacenado))
+    try:
+        _, iteraciones, sal, clave = almacenado.split("$")
+        calculada = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _desde_b64(sal), int(iteraciones))
+    except ValueError:
+        return False
+    return hmac.compare_digest(calculada, _desde_b64(clave))
+
+async def hashear_password_async(password):
+    """Calcula el hash en el pool de hilos para no bloquear el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, hashear_password, password)
+
+def hashear_passwords(passwords):
+    """Calcula el hash de cada contraseña en serie"""
+    return [hashear_password(password) for password in passwords]
+
+async def hashear_passwords_async(passwords):
+    """
+    Calcula varios hashes en el pool de hilos con una llamada por hilo (no una por contraseña)
+    
+    Cada PBKDF2 cuesta decenas de ms, así que una importación queda limitada a unas
+    decenas de contraseñas por segundo y por núcleo.
+    """
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    tramo = -(-len(passwords) // HILOS_HASH)
+    loop = asyncio.get_running_loop()
+    resultados = await asyncio.gather(*(
+        loop.run_in_executor(_executor, hashear_passwords, passwords[inicio:inicio + tramo])
+        for inicio in range(0, len(passwords), tramo)
+    ))
+    return [hash_ for parte in resultados for hash_ in parte]
+
+async def verificar_password_async(password, almacenado):
+    """Verifica la contraseña en el pool de hilos para no bloquear el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, verificar_password, password, almacenado)
+
+def crear_token(carnet, role="estudiante", duracion=AUTH_TOKEN_TTL_S):
+    """
+    Emite un token firmado con HMAC-SHA256
+    
+    Args:
+        carnet: Carnet del estudiante autenticado
+        role: Rol del estudiante
+        duracion: Segundos de validez
+        
+    Returns:
+        str: Token con el formato contenido.firma
+    """
+    contenido = _b64(json.dumps(
+        {"sub": carnet, "role": role, "exp": int(time.time()) + duracion},
+        separators=(",", ":")
+    ).encode("utf-8"))
+    firma = _b64(hmac.new(_secreto, contenido.encode("ascii"), hashlib.sha256).digest())
+    return f"{contenido}.{firma}"
+
+def verificar_token(token):
+    """
+    Verifica la firma y la expiración de un token sin consultar la base de datos
+    
+    Returns:
+        dict: Datos del token (sub, role, exp) o None si no es válido
+    """
+    try:
+        contenido, firma = token.split(".")
+        esperada = hmac.new(_secreto, contenido.encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(esperada, _desde_b64(firma)):
+            return None
+        datos = json.loads(_desde_b64(contenido))
+    except (ValueError, UnicodeError):
+        return None
+    if datos.get("exp", 0) < time.time():
+        return None
+    return datos
+
+class CachePrincipales:
+    """Cache LRU con expiración de los tokens ya verificados"""
+    def __init__(self, max_entradas=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL_S):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()
+
+    def obtener(self, token):
+        """
+        Devuelve el usuario autenticado de un token, verificándolo solo si no está en cache
+        
+        Returns:
+            dict: Datos del token o None si no es válido
+        """
+        ahora = time.time()
+        with self._lock:
+            entrada = self._entradas.get(token)
+            if entrada and entrada[0] > ahora:
+                self._entradas.move_to_end(token)
+                registrar_acceso_cache("principales", True)
+                return entrada[1]
+        
+        registrar_acceso_cache("principales", False)
+        principal = verificar_token(token)
+        if principal is None:
+            return None
+        
+        with self._lock:
+            self._entradas[token] = (min(ahora + self.ttl, principal["exp"]), principal)
+            self._entradas.move_to_end(token)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return principal
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def __len__(self):
+        return len(self._entradas)
+
+cache_principales = CachePrincipales()
+
+async def usuario_autenticado(authorization: Optional[str] = Header(None)):
+    """
+    Dependencia de FastAPI que exige un header Authorization: Bearer <token> válido
+    
+    Returns:
+        dict: Datos del token (sub = carnet, role)
+    """
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise HTTPException(status_code=401, detail="Se requiere un token de autenticación")
+    principal = cache_principales.obtener(authorization[7:].strip())
+    if principal is None:
+        raise HTTPException(status_code=401, detail="Token inválido o expirado")
+    return principal
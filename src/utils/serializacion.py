@@ -0,0 +1,116 @@
+"""
+Conversión de tipos de Neo4j a tipos nativos y respuestas JSON / MessagePack
+
+Los resultados se convierten una sola vez en la capa de datos (Neo4jDriver), de modo que
+las rutas solo manejan dicts, listas, números, cadenas y fechas ISO 8601.
+"""
+import json
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse, Response
+from neo4j import Record
+from neo4j.graph import Node, Path, Relationship
+from neo4j.time import Date, DateTime, Duration, Time
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se usa json de la biblioteca estándar
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack es opcional; sin él Accept: application/msgpack recibe JSON
+    msgpack = None
+
+TIPOS_MSGPACK = ("application/msgpack", "application/x-msgpack")
+
+# Formato negociado para la solicitud en curso (lo fija el middleware negociar_formato)
+_formato_respuesta = ContextVar("formato_respuesta", default="json")
+
+TIPOS_NATIVOS = (str, int, float, bool, type(None))
+TIPOS_TEMPORALES = (DateTime, Date, Time, Duration)
+
+def a_nativo(valor):
+    """
+    Convierte un valor devuelto por Neo4j a tipos nativos serializables
+
+    Nodos y relaciones pasan a dict con sus propiedades, caminos a la lista de sus nodos
+    y los valores temporales a cadenas ISO 8601.
+    """
+    if isinstance(valor, TIPOS_NATIVOS):
+        return valor
+    if isinstance(valor, (Node, Relationship)):
+        return {clave: a_nativo(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [a_nativo(v) for v in valor]
+    if isinstance(valor, dict):
+        return {clave: a_nativo(v) for clave, v in valor.items()}
+    if isinstance(valor, TIPOS_TEMPORALES):
+        return valor.iso_format()
+    if isinstance(valor, Path):
+        return [a_nativo(nodo) for nodo in valor.nodes]
+    return valor
+
+def convertir_registro(registro):
+    """Devuelve un Record con los mismos campos y valores convertidos con a_nativo"""
+    valores = registro.values()
+    if all(isinstance(v, TIPOS_NATIVOS) for v in valores):
+        return registro
+    return Record(zip(registro.keys(), (a_nativo(v) for v in valores)))
+
+def _por_defecto(valor):
+    """Serializa los tipos que no conoce el codificador JSON"""
+    convertido = a_nativo(valor)
+    if convertido is valor:
+        if hasattr(valor, "dict"):
+            return valor.dict()
+        return str(valor)
+    return convertido
+
+class RespuestaJSON(JSONResponse):
+    """
+    JSONResponse que serializa con orjson cuando está instalado
+
+    Las rutas que devuelven esta respuesta directamente omiten jsonable_encoder;
+    el contenido debe ser ya de tipos nativos (lo es si viene de Neo4jDriver).
+    """
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, default=_por_defecto, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=_por_defecto, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+
+class RespuestaMsgpack(Response):
+    """Respuesta codificada con MessagePack (requiere el paquete msgpack)"""
+    media_type = TIPOS_MSGPACK[0]
+
+    def render(self, content):
+        return msgpack.packb(content, default=_por_defecto, use_bin_type=True)
+
+def iniciar_formato(accept):
+    """
+    Elige el formato de respuesta según el header Accept
+
+    Returns:
+        Token para restaurar el formato con finalizar_formato
+    """
+    formato = "json"
+    if msgpack is not None and accept and any(tipo in accept for tipo in TIPOS_MSGPACK):
+        formato = "msgpack"
+    return _formato_respuesta.set(formato)
+
+def finalizar_formato(token):
+    _formato_respuesta.reset(token)
+
+def responder(contenido, **kwargs):
+    """
+    Crea la respuesta en el formato negociado (MessagePack o JSON)
+
+    Args:
+        contenido: Datos de tipos nativos
+        **kwargs: status_code, headers, etc. de la respuesta
+    """
+    if _formato_respuesta.get() == "msgpack":
+        return RespuestaMsgpack(contenido, **kwargs)
+    return RespuestaJSON(contenido, **kwargs)
@@ -0,0 +1,253 @@
+"""
+Benchmark del algoritmo de recomendación a distintas escalas de datos
+
+Genera estudiantes, profesores, cursos y aprobaciones sintéticas con
+scripts/generar_datos.py y mide cada etapa de AlgoritmoRecomendacion.
+Las etapas puras (compatibilidad, calidad, rendimiento, multiplicadores) se miden
+en memoria; afinidad, persistencia y los endpoints solo con --usar-neo4j.
+
+Uso:
+    python -m tests.algoritmo_recomendacion --escalas 1000 10000 100000
+    python -m tests.algoritmo_recomendacion --salida resultados.json --baseline baseline.json
+    python -m tests.algoritmo_recomendacion --usar-neo4j --escalas 1000   # ¡limpia la base de datos!
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for ruta in (RAIZ, os.path.join(RAIZ, "src")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from services.algoritmo_de_recomendacion import AlgoritmoRecomendacion
+from scripts.generar_datos import (
+    generar_dataset, limpiar_en_lotes, preparar_esquema, cargar_catalogo, cargar_shard
+)
+
+ESCALAS_POR_DEFECTO = [1000, 10000, 100000]
+SEMILLA = 2025
+
+def generar_datos(num_estudiantes, semilla=SEMILLA):
+    """
+    Genera un conjunto de datos sintético con scripts/generar_datos.py
+
+    Args:
+        num_estudiantes: Número de estudiantes a generar
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        dict: cursos, profesores, imparte, estudiantes y aprobaciones
+    """
+    # Al menos el catálogo de init_db (12 cursos, 20 profesores), creciendo con la escala
+    num_cursos = max(12, num_estudiantes // 100)
+    num_profesores = max(20, num_estudiantes // 50)
+    return generar_dataset(num_estudiantes, num_profesores, num_cursos, semilla=semilla,
+                           procesos=os.cpu_count() or 1)
+
+def resumir(tiempos):
+    """Resume una lista de duraciones en segundos"""
+    ordenados = sorted(tiempos)
+    return {
+        "n": len(ordenados),
+        "total_ms": round(sum(ordenados) * 1000, 3),
+        "media_us": round(statistics.fmean(ordenados) * 1e6, 3),
+        "p50_us": round(ordenados[len(ordenados) // 2] * 1e6, 3),
+        "p95_us": round(ordenados[min(len(ordenados) - 1, int(len(ordenados) * 0.95))] * 1e6, 3)
+    }
+
+def medir(funcion, argumentos):
+    """Ejecuta la función con cada tupla de argumentos y devuelve el resumen de tiempos"""
+    tiempos = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for args in argumentos:
+            inicio = time.perf_counter()
+            funcion(*args)
+            tiempos.append(time.perf_counter() - inicio)
+    return resumir(tiempos)
+
+def algoritmo_sin_conexion():
+    """Instancia el algoritmo sin abrir conexiones para medir las etapas puras"""
+    return AlgoritmoRecomendacion.__new__(AlgoritmoRecomendacion)
+
+def benchmark_etapas_puras(algoritmo, datos, max_pares, rng):
+    """Mide las etapas que no consultan la base de datos"""
+    estudiantes = datos["estudiantes"]
+    profesores = datos["profesores"]
+    pares = [(rng.choice(estudiantes), rng.choice(profesores)) for _ in range(max_pares)]
+
+    factores = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for estudiante, profesor in pares:
+            compatibilidad = algoritmo.calcular_compatibilidad_estilos(estudiante, profesor)
+            calidad = algoritmo.calcular_calidad_profesor(profesor)
+            rendimiento = algoritmo.calcular_rendimiento_estudiante(estudiante)
+            afinidad = rng.uniform(0.1, 0.95)
+            confianza = rng.uniform(0.1, 0.9)
+            indice_base = (
+                0.35 * compatibilidad +
+                0.25 * (afinidad * 0.8 + confianza * 0.2) +
+                0.25 * calidad +
+                0.15 * rendimiento
+            )
+            factores.append((indice_base, compatibilidad, afinidad, calidad, rendimiento, confianza))
+
+    return {
+        "compatibilidad": medir(algoritmo.calcular_compatibilidad_estilos, pares),
+        "calidad": medir(algoritmo.calcular_calidad_profesor, [(p,) for _, p in pares]),
+        "rendimiento": medir(algoritmo.calcular_rendimiento_estudiante, [(e,) for e, _ in pares]),
+        "multiplicadores": medir(algoritmo.aplicar_multiplicadores_dinamicos, factores)
+    }
+
+def cargar_en_neo4j(driver, datos, lote=5000):
+    """Limpia la base de datos y carga los datos sintéticos en lotes con UNWIND"""
+    limpiar_en_lotes(driver)
+    preparar_esquema(driver)
+    cargar_catalogo(driver, datos, lote)
+    cargar_shard(driver, datos, lote)
+    # El algoritmo lee veces_que_llevo_curso al calcular el rendimiento
+    driver.execute_write("MATCH (e:Estudiante) SET e.veces_que_llevo_curso = e.veces_curso")
+
+def benchmark_etapas_neo4j(algoritmo, datos, muestras, rng):
+    """Mide afinidad y persistencia contra Neo4j"""
+    pares = [
+        (rng.choice(datos["estudiantes"])["nombre"], rng.choice(datos["profesores"])["nombre"])
+        for _ in range(muestras)
+    ]
+    return {
+        "afinidad": medir(algoritmo.calcular_afinidad, pares),
+        "persistencia": medir(algoritmo.registrar_recomendacion, [(e, p, 50.0) for e, p in pares])
+    }
+
+def benchmark_endpoints(datos, muestras, rng):
+    """Mide los endpoints de recomendación de extremo a extremo (sin la capa HTTP)"""
+    from fastapi import HTTPException
+    from api import rutas
+
+    nombres = [rng.choice(datos["estudiantes"])["nombre"] for _ in range(muestras)]
+    profesor = datos["profesores"][0]["nombre"]
+    curso = datos["cursos"][0]["codigo"]
+
+    # Llamadas como funciones Python: los parámetros con Query(...) por defecto se pasan
+    # explícitamente, porque el objeto Query es truthy y activaría otras ramas
+    endpoints = {
+        "recomendaciones": lambda nombre: rutas.obtener_recomendaciones(
+            nombre, curso=None, limite=None, incluir_detalles=False),
+        "recomendaciones_por_curso": lambda nombre: rutas.obtener_recomendaciones(
+            nombre, curso=curso, limite=None, incluir_detalles=False),
+        "porcentaje": lambda nombre: rutas.obtener_porcentaje_recomendacion(nombre, profesor),
+        "compatibilidad": lambda nombre: rutas.obtener_matriz_compatibilidad(
+            nombre, incluir_todos=False, summary_only=False),
+    }
+
+    def ejecutar(endpoint, nombre):
+        try:
+            asyncio.run(endpoint(nombre))
+        except HTTPException as e:
+            # Un 404 (p. ej. sin recomendación para el par) también es una medición válida
+            if e.status_code != 404:
+                raise
+
+    return {
+        nombre_endpoint: medir(ejecutar, [(endpoint, nombre) for nombre in nombres])
+        for nombre_endpoint, endpoint in endpoints.items()
+    }
+
+def comparar_con_baseline(resultados, baseline, tolerancia):
+    """
+    Compara la media de cada etapa con el baseline
+
+    Returns:
+        list: Regresiones encontradas (etapas más lentas que baseline * (1 + tolerancia))
+    """
+    regresiones = []
+    for escala, actual in resultados["escalas"].items():
+        previo = baseline.get("escalas", {}).get(escala)
+        if not previo:
+            continue
+        for grupo in ("etapas", "endpoints"):
+            for etapa, medicion in actual.get(grupo, {}).items():
+                referencia = previo.get(grupo, {}).get(etapa)
+                if not referencia or not referencia["media_us"]:
+                    continue
+                cambio = medicion["media_us"] / referencia["media_us"] - 1
+                medicion["cambio_vs_baseline"] = round(cambio, 4)
+                if cambio > tolerancia:
+                    regresiones.append(f"{escala} {grupo}.{etapa}: {cambio:+.1%}")
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del algoritmo de recomendación")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_POR_DEFECTO, help="Número de estudiantes por escala")
+    parser.add_argument("--pares", type=int, default=20000, help="Pares estudiante-profesor para las etapas puras")
+    parser.add_argument("--muestras", type=int, default=50, help="Muestras para etapas y endpoints con Neo4j")
+    parser.add_argument("--usar-neo4j", action="store_true", help="Carga los datos en Neo4j (LIMPIA la base de datos)")
+    parser.add_argument("--salida", default="bench_output.json", help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", help="Archivo JSON de resultados previos para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Aumento relativo permitido antes de marcar regresión")
+    args = parser.parse_args(argv)
+
+    resultados = {
+        "fecha": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "semilla": SEMILLA,
+        "escalas": {}
+    }
+
+    for escala in args.escalas:
+        rng = random.Random(SEMILLA)
+        inicio = time.perf_counter()
+        datos = generar_datos(escala)
+        generacion = time.perf_counter() - inicio
+        print(f"📦 Escala {escala}: {len(datos['profesores'])} profesores, {len(datos['cursos'])} cursos, "
+              f"{len(datos['aprobaciones'])} aprobaciones ({generacion:.2f} s)")
+
+        resultado = {
+            "estudiantes": escala,
+            "profesores": len(datos["profesores"]),
+            "cursos": len(datos["cursos"]),
+            "aprobaciones": len(datos["aprobaciones"]),
+            "etapas": benchmark_etapas_puras(algoritmo_sin_conexion(), datos, args.pares, rng)
+        }
+
+        if args.usar_neo4j:
+            algoritmo = AlgoritmoRecomendacion()
+            inicio = time.perf_counter()
+            cargar_en_neo4j(algoritmo.driver, datos)
+            resultado["carga_neo4j_s"] = round(time.perf_counter() - inicio, 3)
+            resultado["etapas"].update(benchmark_etapas_neo4j(algoritmo, datos, args.muestras, rng))
+            resultado["endpoints"] = benchmark_endpoints(datos, args.muestras, rng)
+
+        resultados["escalas"][str(escala)] = resultado
+        for grupo in ("etapas", "endpoints"):
+            for etapa, medicion in resultado.get(grupo, {}).items():
+                print(f"   {grupo}.{etapa}: media {medicion['media_us']:.1f} µs, p95 {medicion['p95_us']:.1f} µs")
+
+    regresiones = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as archivo:
+            regresiones = comparar_con_baseline(resultados, json.load(archivo), args.tolerancia)
+        resultados["regresiones"] = regresiones
+
+    with open(args.salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+    print(f"💾 Resultados guardados en {args.salida}")
+
+    if regresiones:
+        print("⚠️ Regresiones respecto al baseline:")
+        for regresion in regresiones:
+            print(f"   {regresion}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for ruta in (RAIZ, os.path.join(RAIZ, "src")):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
@@ -0,0 +1,71 @@
+"""
+La retención top-N de RECOMENDADO se mantiene entre la compactación y nuevas recomendaciones
+"""
+import contextlib
+import io
+
+from services import algoritmo_de_recomendacion as modulo
+from services.algoritmo_de_recomendacion import AlgoritmoRecomendacion, QUERY_REGISTRAR_RECOMENDACIONES
+from services.compactacion import compactar_recomendaciones, QUERY_EXCEDENTES
+
+class GrafoEnMemoria:
+    """Simula en memoria las consultas de registro y compactación de recomendaciones"""
+    def __init__(self):
+        self.recomendados = {}
+
+    def execute_write(self, query, **params):
+        if query == QUERY_REGISTRAR_RECOMENDACIONES:
+            registros = []
+            for fila in params["filas"]:
+                clave = (params["nombre_estudiante"], fila["profesor"])
+                previa = self.recomendados.get(clave)
+                escribir = previa is None or abs(previa - fila["indice"]) >= params["umbral"]
+                if escribir:
+                    self.recomendados[clave] = fila["indice"]
+                registros.append({"profesor": fila["profesor"], "escribir": escribir,
+                                  "indice": self.recomendados[clave]})
+            return registros
+        if query == QUERY_EXCEDENTES:
+            eliminadas = 0
+            for estudiante in {e for e, _ in self.recomendados}:
+                propias = sorted(
+                    (clave for clave in self.recomendados if clave[0] == estudiante),
+                    key=lambda clave: self.recomendados[clave], reverse=True
+                )
+                for clave in propias[params["maximo"]:]:
+                    del self.recomendados[clave]
+                    eliminadas += 1
+            return [{"eliminadas": eliminadas}]
+        return [{"eliminadas": 0}]
+
+    def aristas(self, estudiante):
+        return sum(1 for e, _ in self.recomendados if e == estudiante)
+
+def crear_algoritmo(grafo):
+    algoritmo = AlgoritmoRecomendacion.__new__(AlgoritmoRecomendacion)
+    algoritmo.driver = grafo
+    algoritmo.calcular_afinidad = lambda estudiante, profesor: (0.5, 0.5)
+    return algoritmo
+
+def test_top_n_se_mantiene_tras_compactar_y_recomendar():
+    top_n = modulo.RECOMMENDATION_TOP_N
+    grafo = GrafoEnMemoria()
+    algoritmo = crear_algoritmo(grafo)
+    modulo.huellas_recomendacion.limpiar()
+
+    estudiante = {"nombre": "Ana", "promedio": 80, "estilo_aprendizaje": "visual", "estilo_clase": "presencial"}
+    profesores = [
+        {"nombre": f"Profesor {i}", "evaluacion_docente": 1 + i % 5, "porcentaje_aprobados": 40 + i,
+         "años_experiencia": i, "estilo_enseñanza": "visual", "estilo_clase": "presencial"}
+        for i in range(top_n + 15)
+    ]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        algoritmo.puntuar_profesores(estudiante, profesores)
+        assert grafo.aristas("Ana") == top_n
+
+        compactar_recomendaciones(grafo, max_dias=0, top_n=top_n)
+        assert grafo.aristas("Ana") == top_n
+
+        algoritmo.puntuar_profesores(estudiante, profesores)
+    assert grafo.aristas("Ana") == top_n
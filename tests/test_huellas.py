@@ -0,0 +1,60 @@
+"""
+Las huellas de recomendación se descartan al eliminar estudiantes o profesores
+"""
+import contextlib
+import io
+
+from services import algoritmo_de_recomendacion as modulo
+from utils.helpers import eliminar_en_cascada
+from tests.test_compactacion import GrafoEnMemoria, crear_algoritmo
+
+class SesionEliminacion:
+    """Simula la eliminación en cascada sobre el grafo en memoria"""
+    def __init__(self, grafo, etiqueta):
+        self.grafo = grafo
+        self.etiqueta = etiqueta
+
+    def run(self, query, clave, lote):
+        posicion = 0 if self.etiqueta == "Estudiante" else 1
+        borradas = [c for c in self.grafo.recomendados if c[posicion] == clave]
+        for c in borradas:
+            del self.grafo.recomendados[c]
+        registro = {"eliminados": 1, "nombre": clave,
+                    "relaciones": [{"tipo": "RECOMENDADO", "cantidad": len(borradas)}]}
+        return type("Resultado", (), {"single": lambda _: registro})()
+
+ESTUDIANTE = {"nombre": "Ana", "promedio": 80, "estilo_aprendizaje": "visual", "estilo_clase": "presencial"}
+PROFESORES = [
+    {"nombre": f"Profesor {i}", "evaluacion_docente": 4, "porcentaje_aprobados": 70,
+     "años_experiencia": 5, "estilo_enseñanza": "visual", "estilo_clase": "presencial"}
+    for i in range(3)
+]
+
+def recomendar(algoritmo):
+    with contextlib.redirect_stdout(io.StringIO()):
+        algoritmo.puntuar_profesores(ESTUDIANTE, PROFESORES)
+
+def test_estudiante_recreado_recibe_sus_recomendaciones():
+    grafo = GrafoEnMemoria()
+    algoritmo = crear_algoritmo(grafo)
+    modulo.huellas_recomendacion.limpiar()
+    recomendar(algoritmo)
+
+    # El estudiante se elimina por carnet; la consulta devuelve su nombre
+    eliminar_en_cascada(SesionEliminacion(grafo, "Estudiante"), "Estudiante", "Ana")
+    assert grafo.aristas("Ana") == 0
+
+    recomendar(algoritmo)
+    assert grafo.aristas("Ana") == len(PROFESORES)
+
+def test_profesor_recreado_recibe_sus_recomendaciones():
+    grafo = GrafoEnMemoria()
+    algoritmo = crear_algoritmo(grafo)
+    modulo.huellas_recomendacion.limpiar()
+    recomendar(algoritmo)
+
+    eliminar_en_cascada(SesionEliminacion(grafo, "Profesor"), "Profesor", "Profesor 0")
+    assert ("Ana", "Profesor 0") not in grafo.recomendados
+
+    recomendar(algoritmo)
+    assert ("Ana", "Profesor 0") in grafo.recomendados
@@ -0,0 +1,32 @@
+"""
+Lectura en streaming de importaciones: UTF-8 inválido y campos CSV con saltos de línea
+"""
+import asyncio
+
+from utils.importacion import leer_filas
+
+async def trozos(cuerpo, tamano=7):
+    for i in range(0, len(cuerpo), tamano):
+        yield cuerpo[i:i + tamano]
+
+def filas(cuerpo, formato):
+    async def recolectar():
+        return [f async for f in leer_filas(trozos(cuerpo), formato)]
+    return asyncio.run(recolectar())
+
+def test_csv_con_salto_de_linea_entre_comillas():
+    cuerpo = 'carnet,nombre\r\n1,"Ana\nMaría"\r\n2,"Luis ""Lucho"""\r\n'.encode("utf-8")
+    assert filas(cuerpo, "csv") == [
+        (1, {"carnet": "1", "nombre": "Ana\nMaría"}, None),
+        (2, {"carnet": "2", "nombre": 'Luis "Lucho"'}, None),
+    ]
+
+def test_utf8_invalido_rechaza_solo_su_fila():
+    cuerpo = b'{"carnet": "1"}\n{"carnet": "\xff"}\n{"carnet": "3"}\n'
+    resultado = filas(cuerpo, "ndjson")
+    assert [(f, d) for f, d, _ in resultado] == [(1, {"carnet": "1"}), (2, None), (3, {"carnet": "3"})]
+    assert resultado[1][2].startswith("Formato inválido")
+
+    cuerpo = b'carnet,nombre\n1,Ana\n2,\xc3\n3,Luis\n'
+    resultado = filas(cuerpo, "csv")
+    assert [d for _, d, _ in resultado] == [{"carnet": "1", "nombre": "Ana"}, None, {"carnet": "3", "nombre": "Luis"}]
@@ -0,0 +1,32 @@
+"""
+Las métricas por ruta usan la plantilla completa, incluido el prefijo del router
+"""
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from api.middleware import plantilla_ruta, registrar_plantillas
+
+def crear_router():
+    router = APIRouter()
+
+    @router.get("/")
+    async def listar(request: Request):
+        return {"ruta": plantilla_ruta(request)}
+
+    @router.get("/{codigo}")
+    async def obtener(codigo: str, request: Request):
+        return {"ruta": plantilla_ruta(request)}
+
+    return router
+
+def test_rutas_con_prefijo_tienen_etiquetas_distintas():
+    app = FastAPI()
+    for prefijo in ("/api/v1/cursos", "/api/v1/profesores"):
+        router = crear_router()
+        app.include_router(router, prefix=prefijo)
+        registrar_plantillas(router, prefijo)
+    cliente = TestClient(app)
+
+    assert cliente.get("/api/v1/cursos/").json()["ruta"] == "/api/v1/cursos/"
+    assert cliente.get("/api/v1/profesores/").json()["ruta"] == "/api/v1/profesores/"
+    assert cliente.get("/api/v1/cursos/CI-0101").json()["ruta"] == "/api/v1/cursos/{codigo}"
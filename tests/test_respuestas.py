@@ -0,0 +1,73 @@
+"""
+Las rutas con response_model devuelven una Response ya serializada, así que FastAPI no
+valida su contenido; estas pruebas validan cada payload contra su modelo
+"""
+import contextlib
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from api import rutas, rutas_cursos, rutas_estudiantes, rutas_profesores
+from models.respuestas import RespuestaLista, RespuestaRecomendaciones, RespuestaCompatibilidad
+from tests.test_compactacion import GrafoEnMemoria, crear_algoritmo
+
+PROFESOR = {"nombre": "Ana Pérez", "estilo_enseñanza": "practico", "estilo_clase": "mixto",
+            "años_experiencia": 8, "evaluacion_docente": 4.5, "porcentaje_aprobados": 82,
+            "disponibilidad": 3, "puntuacion_total": 70}
+
+class Resultado(list):
+    def single(self):
+        return self[0] if self else None
+
+class SesionCatalogo:
+    """Devuelve filas con la forma que esperan las consultas de los listados"""
+    def run(self, query, **params):
+        campos = params.get("campos", [])
+        return Resultado([{
+            "clave": f"clave{i}", "valores": [f"{campo}{i}" for campo in campos],
+            "c": {"codigo": "CC1"}, "p": dict(PROFESOR, nombre=f"Profesor {i}"),
+            "fecha_inscripcion": "2025-01-01T00:00:00", "profesor": "Profesor 0", "estado": "activo",
+            "nota_final": None, "aprobado": None
+        } for i in range(3)])
+
+    def close(self):
+        pass
+
+class DriverCatalogo:
+    def get_session(self):
+        return SesionCatalogo()
+
+class AlgoritmoEnMemoria:
+    """Calcula recomendaciones reales sobre un grafo en memoria"""
+    def recomendar_profesores(self, nombre_estudiante, codigo_curso=None):
+        estudiante = {"nombre": nombre_estudiante, "promedio": 80, "estilo_aprendizaje": "practico",
+                      "estilo_clase": "mixto"}
+        profesores = [dict(PROFESOR, nombre=f"Profesor {i}", evaluacion_docente=1 + i) for i in range(4)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            recomendaciones = crear_algoritmo(GrafoEnMemoria()).puntuar_profesores(estudiante, profesores)
+        return sorted(recomendaciones, key=lambda r: r["indice_compatibilidad"], reverse=True)
+
+@pytest.fixture
+def cliente(monkeypatch):
+    for modulo in (rutas_cursos, rutas_estudiantes, rutas_profesores):
+        monkeypatch.setattr(modulo, "Neo4jDriver", DriverCatalogo)
+    monkeypatch.setattr(rutas, "AlgoritmoRecomendacion", AlgoritmoEnMemoria)
+    return TestClient(main.app)
+
+@pytest.mark.parametrize("ruta, modelo", [
+    ("/api/v1/cursos/", RespuestaLista),
+    ("/api/v1/cursos/CC1/profesores", RespuestaLista),
+    ("/api/v1/cursos/CC1/estudiantes", RespuestaLista),
+    ("/api/v1/estudiantes/", RespuestaLista),
+    ("/api/v1/profesores/", RespuestaLista),
+    ("/api/v1/recomendaciones/Luis", RespuestaRecomendaciones),
+    ("/api/v1/recomendaciones/Luis?incluir_detalles=true", RespuestaRecomendaciones),
+    ("/api/v1/compatibilidad/Luis", RespuestaCompatibilidad),
+    ("/api/v1/compatibilidad/Luis?summary_only=true", RespuestaCompatibilidad),
+])
+def test_payload_cumple_su_modelo(cliente, ruta, modelo):
+    respuesta = cliente.get(ruta)
+    assert respuesta.status_code == 200, respuesta.text
+    modelo(**respuesta.json())